@@ -13,7 +13,8 @@ module.exports = {
         TRADING_TIMEFRAME: '15m',
         USE_REAL_TRADING: 'True',
         USE_REAL_BALANCE: 'True',
-        USE_BINANCE_TESTNET: 'False'
+        USE_BINANCE_TESTNET: 'False',
+        METRICS_PORT: '9101'            // GET 127.0.0.1:9101/metrics
       }
     },
     {
@@ -83,7 +84,9 @@ module.exports = {
         // RSI_LOOKBACK_GRID: '6,8,12',
 
         // === Intérprete del subproceso ===
-        PYTHON_BIN: '/home/ubuntu/quant-bot/.venv/bin/python'
+        PYTHON_BIN: '/home/ubuntu/quant-bot/.venv/bin/python',
+
+        METRICS_PORT: '9102'            // GET 127.0.0.1:9102/metrics
       }
     },
     {
@@ -94,19 +97,26 @@ module.exports = {
       interpreter: 'none',
       env: {
         PYTHONUNBUFFERED: '1',
-        PYTHONPATH: '/home/ubuntu/quant-bot'
+        PYTHONPATH: '/home/ubuntu/quant-bot',
+        METRICS_PORT: '9103'            // GET 127.0.0.1:9103/metrics
       }
     },
     {
       name: 'dashboard',
       script: '.venv/bin/python',
-      args: '-m src.web_dashboard',
+      args: '-m src.wsgi',
       cwd: '/home/ubuntu/quant-bot',
       interpreter: 'none',
       env: {
-        FLASK_ENV: 'development',
+        FLASK_ENV: 'production',
         PYTHONUNBUFFERED: '1',
-        PYTHONPATH: '/home/ubuntu/quant-bot'
+        PYTHONPATH: '/home/ubuntu/quant-bot',
+
+        // === Servidor (gunicorn gthread; fallback waitress / Flask multihilo) ===
+        DASHBOARD_PORT: '5001',
+        DASHBOARD_WORKERS: '2',
+        DASHBOARD_THREADS: '16',
+        DASHBOARD_CACHE_TTL: '2'        // segundos que se reutiliza una respuesta sin mirar los journals
       }
     }
   ]
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# monitoring/log_index.py
+"""
+Índice incremental de logs de los bots.
+
+Para cada log se guarda (en logs/.log_index/<nombre>.json):
+  - el offset en bytes hasta donde se ha leído (solo líneas completas)
+  - por cada hora ("YYYY-MM-DDTHH"): el offset donde empieza y cuántas líneas
+    coinciden con cada patrón
+
+Cada ejecución del monitor solo lee los bytes nuevos. "¿Cuántas señales desde T?"
+se responde sumando las horas completas posteriores a T y releyendo únicamente
+el tramo de la hora que contiene T.
+
+Los timestamps de logging (asctime) están en hora local: se interpretan en la
+zona del sistema y las horas del índice se guardan en UTC.
+"""
+
+import os
+import re
+import json
+from datetime import datetime, timezone
+
+INDEX_DIR = os.getenv("LOG_INDEX_DIR", "logs/.log_index")
+CHUNK_BYTES = 1 << 20
+
+# nombre → subcadenas (basta con que aparezca una)
+SIGNAL_PATTERNS = {"signals": ("COMPRA", "VENTA")}
+
+# "2025-08-06 13:22:01,123 [INFO] ..." (logging) o "2025-08-06T13:22:01..." (ISO), en hora local
+# Cambia si cambia cómo se interpretan los timestamps → los índices antiguos se reconstruyen
+INDEX_FORMAT = 2
+_TS_RE = re.compile(rb"^\[?(\d{4}-\d{2}-\d{2})[ T](\d{2}):(\d{2}):(\d{2})")
+
+
+def _line_time(line: bytes):
+    m = _TS_RE.match(line)
+    if not m:
+        return None
+    d, hh, mm, ss = (g.decode() for g in m.groups())
+    return datetime.fromisoformat(f"{d}T{hh}:{mm}:{ss}").astimezone(timezone.utc)
+
+
+def _hour_key(ts: datetime) -> str:
+    return ts.astimezone(timezone.utc).strftime("%Y-%m-%dT%H")
+
+
+def _as_utc(since) -> datetime:
+    if isinstance(since, str):
+        since = datetime.fromisoformat(since.replace("Z", "+00:00"))
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return since.astimezone(timezone.utc)
+
+
+class LogIndex:
+    """Offsets por hora + conteos por patrón de un log que solo crece (o se rota)."""
+
+    def __init__(self, log_path: str, patterns: dict = None, index_dir: str = None):
+        self.log_path = log_path
+        self.patterns = {k: tuple(v) for k, v in (patterns or SIGNAL_PATTERNS).items()}
+        self._needles = {k: tuple(s.encode() for s in v) for k, v in self.patterns.items()}
+        name = os.path.basename(log_path).replace(os.sep, "_")
+        self.state_path = os.path.join(index_dir or INDEX_DIR, f"{name}.json")
+        self._load()
+
+    # ---------------- estado ----------------
+    def _reset(self):
+        self.inode = None
+        self.offset = 0
+        self.hours = {}            # hora → {"offset": int, "counts": {patrón: n}}
+        self.last_hour = None      # hora de la última línea con timestamp
+
+    def _load(self):
+        self._reset()
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("format") != INDEX_FORMAT or state.get("log_path") != self.log_path or state.get("patterns") != {k: list(v) for k, v in self.patterns.items()}:
+            return
+        self.inode = state.get("inode")
+        self.offset = int(state.get("offset", 0))
+        self.hours = state.get("hours", {})
+        self.last_hour = state.get("last_hour")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "format": INDEX_FORMAT, "log_path": self.log_path,
+                "patterns": {k: list(v) for k, v in self.patterns.items()},
+                "inode": self.inode, "offset": self.offset,
+                "last_hour": self.last_hour, "hours": self.hours,
+            }, f)
+        os.replace(tmp, self.state_path)
+
+    # ---------------- actualización ----------------
+    def update(self) -> int:
+        """Indexa lo escrito desde el último offset. Devuelve bytes leídos."""
+        try:
+            st = os.stat(self.log_path)
+        except OSError:
+            return 0
+        if self.inode is not None and (st.st_ino != self.inode or st.st_size < self.offset):
+            self._reset()                       # log rotado o truncado → reindexar
+        self.inode = st.st_ino
+        if st.st_size == self.offset:
+            return 0
+
+        start = self.offset
+        with open(self.log_path, "rb") as f:
+            f.seek(self.offset)
+            pos = self.offset
+            pending = b""
+            while True:
+                chunk = f.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                data = pending + chunk
+                lines = data.split(b"\n")
+                pending = lines.pop()           # línea incompleta (sin \n): se relee la próxima vez
+                for line in lines:
+                    self._index_line(line, pos)
+                    pos += len(line) + 1
+        self.offset = pos
+        self.save()
+        return pos - start
+
+    def _index_line(self, line: bytes, pos: int):
+        ts = _line_time(line)
+        if ts is not None:
+            hour = _hour_key(ts)
+        else:
+            # líneas sin timestamp (trazas, prints) → hora de la última línea fechada
+            hour = self.last_hour or _hour_key(datetime.now(timezone.utc))
+        entry = self.hours.get(hour)
+        if entry is None:
+            entry = self.hours[hour] = {"offset": pos, "counts": {}}
+        self.last_hour = hour
+        for name, needles in self._needles.items():
+            if any(n in line for n in needles):
+                entry["counts"][name] = entry["counts"].get(name, 0) + 1
+
+    # ---------------- consultas ----------------
+    def total(self, pattern: str = "signals") -> int:
+        return sum(e["counts"].get(pattern, 0) for e in self.hours.values())
+
+    def count_since(self, since, pattern: str = "signals") -> int:
+        """Líneas del patrón con timestamp >= since (datetime/ISO; sin zona = UTC)."""
+        since = _as_utc(since)
+        first_hour = _hour_key(since)
+        total = sum(e["counts"].get(pattern, 0) for h, e in self.hours.items() if h > first_hour)
+
+        entry = self.hours.get(first_hour)
+        if entry and entry["counts"].get(pattern):
+            later = [e["offset"] for h, e in self.hours.items() if e["offset"] > entry["offset"]]
+            end = min(later) if later else self.offset
+            total += self._count_range(entry["offset"], end, since, pattern)
+        return total
+
+    def _count_range(self, start: int, end: int, since: datetime, pattern: str) -> int:
+        needles = self._needles[pattern]
+        with open(self.log_path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        count = 0
+        current = None
+        for line in data.split(b"\n"):
+            ts = _line_time(line)
+            if ts is not None:
+                current = ts
+            if current is not None and current >= since and any(n in line for n in needles):
+                count += 1
+        return count
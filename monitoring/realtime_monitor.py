@@ -5,6 +5,11 @@ import os
 import sys
 from datetime import datetime, timezone
 
+try:
+    from monitoring.log_index import LogIndex
+except ImportError:          # ejecutado como script: monitoring/ ya está en sys.path
+    from log_index import LogIndex
+
 def get_current_balances():
     """Obtener balances actuales"""
     try:
@@ -17,33 +22,22 @@ def get_current_balances():
         print(f"Error leyendo balances: {e}")
         return {}, {}
 
-def count_recent_signals():
-    """Contar señales generadas desde la optimización"""
-    optimization_time = "2025-08-06T13:22"
-    
-    signal_count_15m = 0
-    signal_count_5m = 0
-    
-    # Contar señales en logs
-    try:
-        with open("logs/live_trader.log", 'r') as f:
-            lines = f.readlines()
-            for line in lines:
-                if optimization_time in line and ("COMPRA" in line or "VENTA" in line):
-                    signal_count_15m += 1
-    except:
-        pass
-        
-    try:
-        with open("logs/live_trader_5m.log", 'r') as f:
-            lines = f.readlines()
-            for line in lines:
-                if optimization_time in line and ("COMPRA" in line or "VENTA" in line):
-                    signal_count_5m += 1
-    except:
-        pass
-    
-    return signal_count_15m, signal_count_5m
+LOG_15M = "logs/live_trader.log"
+LOG_5M = "logs/live_trader_5m.log"
+DEFAULT_SINCE = "2025-08-06T13:22:00+00:00"
+
+def count_recent_signals(since=DEFAULT_SINCE):
+    """Contar señales (COMPRA/VENTA) generadas desde `since` usando el índice incremental de logs"""
+    counts = []
+    for path in (LOG_15M, LOG_5M):
+        try:
+            index = LogIndex(path)
+            index.update()          # solo los bytes nuevos desde la última ejecución
+            counts.append(index.count_since(since))
+        except Exception as e:
+            print(f"Error indexando {path}: {e}")
+            counts.append(0)
+    return counts[0], counts[1]
 
 def main():
     print("🔬 MONITOREO EN TIEMPO REAL - PARÁMETROS OPTIMIZADOS")
@@ -61,7 +55,7 @@ def main():
     
     # Estado actual
     balance_15m, balance_5m = get_current_balances()
-    signals_15m, signals_5m = count_recent_signals()
+    signals_15m, signals_5m = count_recent_signals(optimization_start)
     
     current_time = datetime.now(timezone.utc).isoformat()
     
@@ -0,0 +1,130 @@
+# src/accounting.py
+# -*- coding: utf-8 -*-
+"""
+Contabilidad vectorizada de las operaciones registradas (sin iterrows).
+
+  - read_trades(path)        → logs/trades*.csv limpio (timestamp UTC, action, price)
+  - read_fills(perf_path)    → fills reales de performance_log*.csv
+                               (líneas "ts,action,price,qty,notional,SUCCESS")
+  - load_fills(trades_path)  → fills con cantidad real si el journal de performance la tiene;
+                               si no, las operaciones de trades.csv con ACCOUNTING_DEFAULT_QTY
+  - equity_curve(fills)      → posición firmada y caja por sumas acumuladas; equity = caja + pos·precio
+  - daily_performance(curve) → una fila por día (retorno y drawdown) en un solo groupby
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+DEFAULT_QTY     = float(os.getenv("ACCOUNTING_DEFAULT_QTY", "0.001"))   # BTC por operación (legacy)
+INITIAL_BALANCE = 10_000.0
+
+FILL_COLUMNS = ["timestamp", "action", "price", "qty", "notional", "status"]
+
+
+def parse_timestamps(values) -> pd.Series:
+    """ISO-8601 con o sin microsegundos/zona → datetime UTC (NaT si no se puede)."""
+    return pd.to_datetime(pd.Series(values).astype(str), utc=True, format="ISO8601", errors="coerce")
+
+
+def _clean(df: pd.DataFrame) -> pd.DataFrame:
+    df["timestamp"] = parse_timestamps(df["timestamp"]).to_numpy()
+    df["price"] = pd.to_numeric(df["price"], errors="coerce")
+    df["action"] = df["action"].astype(str).str.strip().str.upper()
+    df = df.dropna(subset=["timestamp", "price"])
+    df = df[df["action"].isin(("BUY", "SELL"))]
+    return df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+
+def read_trades(trades_path: str) -> pd.DataFrame:
+    """Operaciones de logs/trades*.csv: timestamp, action, price (filas inválidas fuera)."""
+    df = pd.read_csv(trades_path, usecols=lambda c: c in ("timestamp", "action", "price"))
+    return _clean(df)
+
+
+def read_fills(perf_path: str) -> pd.DataFrame:
+    """
+    Fills ejecutados del journal de performance. Conviven líneas de fill sin cabecera
+    (6 campos, status SUCCESS/…) con filas de log_performance (cabecera + equity):
+    solo se quedan las BUY/SELL con status SUCCESS y cantidad numérica.
+    """
+    if not perf_path or not os.path.exists(perf_path) or os.path.getsize(perf_path) == 0:
+        return pd.DataFrame(columns=["timestamp", "action", "price", "qty"])
+    raw = pd.read_csv(perf_path, header=None, names=FILL_COLUMNS + ["_x1", "_x2"],
+                      dtype=str, on_bad_lines="skip", engine="python")
+    raw = raw[raw["status"].str.strip().str.upper() == "SUCCESS"].copy()
+    raw["qty"] = pd.to_numeric(raw["qty"], errors="coerce")
+    fills = _clean(raw[["timestamp", "action", "price", "qty"]].copy())
+    return fills.dropna(subset=["qty"]).reset_index(drop=True)
+
+
+def perf_path_for(trades_path: str) -> str:
+    """logs/trades_15m.csv → logs/performance_log_15m.csv"""
+    folder, name = os.path.split(trades_path)
+    return os.path.join(folder, name.replace("trades", "performance_log", 1))
+
+
+def load_fills(trades_path: str, perf_path: str = None, default_qty: float = DEFAULT_QTY) -> pd.DataFrame:
+    """
+    Fills para la contabilidad: los del journal de performance (cantidad real ejecutada)
+    o, si no hay, las operaciones de trades.csv con `default_qty` cada una.
+    """
+    fills = read_fills(perf_path if perf_path is not None else perf_path_for(trades_path))
+    if len(fills):
+        return fills
+    trades = read_trades(trades_path)
+    trades["qty"] = float(default_qty)
+    return trades
+
+
+def equity_curve(fills: pd.DataFrame, initial_balance: float = INITIAL_BALANCE) -> pd.DataFrame:
+    """
+    Curva de equity marcada al precio de cada fill:
+      position = Σ signo·qty          cash = inicial − Σ signo·qty·precio
+      equity   = cash + position·precio
+    """
+    out = fills[["timestamp", "action", "price", "qty"]].copy()
+    sign = np.where(out["action"].to_numpy() == "BUY", 1.0, -1.0)
+    price = out["price"].to_numpy(dtype=np.float64)
+    signed_qty = sign * out["qty"].to_numpy(dtype=np.float64)
+    out["position"] = np.cumsum(signed_qty)
+    out["cash"] = initial_balance - np.cumsum(signed_qty * price)
+    out["equity"] = out["cash"].to_numpy() + out["position"].to_numpy() * price
+    return out
+
+
+def daily_performance(curve: pd.DataFrame, initial_balance: float = INITIAL_BALANCE) -> pd.DataFrame:
+    """
+    Una fila por día con operaciones:
+      start_equity  = equity al cierre del día anterior (o el capital inicial)
+      end_equity    = equity tras el último fill del día
+      drawdown_pct  = mayor caída de la equity dentro del día desde su máximo (incluido el inicio)
+    """
+    cols = ["date", "start_equity", "end_equity", "net_return_usdt", "net_return_pct", "drawdown_pct", "num_trades"]
+    if curve.empty:
+        return pd.DataFrame(columns=cols)
+
+    date = curve["timestamp"].dt.date
+    equity = curve["equity"]
+
+    # inicio de cada día = equity del último fill anterior (capital inicial para el primero)
+    start = equity.shift(1).fillna(initial_balance)
+    first_of_day = ~date.duplicated()
+    day_start = start.where(first_of_day).ffill()
+
+    peak = np.maximum(equity.groupby(date).cummax(), day_start)
+    dd = (peak - equity) / peak * 100
+
+    daily = pd.DataFrame({"equity": equity, "start": day_start, "dd": dd, "date": date}).groupby("date", sort=True).agg(
+        start_equity=("start", "first"),
+        end_equity=("equity", "last"),
+        drawdown_pct=("dd", "max"),
+        num_trades=("equity", "size"),
+    ).reset_index()
+
+    daily["net_return_usdt"] = daily["end_equity"] - daily["start_equity"]
+    daily["net_return_pct"] = np.where(daily["start_equity"] != 0,
+                                       daily["net_return_usdt"] / daily["start_equity"] * 100, 0.0)
+    for c in ("start_equity", "end_equity", "net_return_usdt", "net_return_pct", "drawdown_pct"):
+        daily[c] = daily[c].round(2)
+    return daily[cols]
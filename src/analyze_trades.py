@@ -1,8 +1,8 @@
 # src/analyze_trades.py
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import os
+
+from src.charts import trades_chart
 
 TRADES_PATH = 'logs/trades.csv'
 PRICE_PATH = 'data/BTCUSDC.csv'
@@ -25,29 +25,15 @@ prices.set_index('timestamp', inplace=True)
 trades = trades.set_index('timestamp').join(prices, how='left', rsuffix='_price')
 trades.reset_index(inplace=True)
 
-# Gráfico
-plt.figure(figsize=(12, 6))
-plt.plot(prices.index, prices['close'], label='BTCUSDC', color='blue', linewidth=1)
-
 # Señales
 buy_trades = trades[trades['action'] == 'BUY']
 sell_trades = trades[trades['action'] == 'SELL']
 
-plt.scatter(buy_trades['timestamp'], buy_trades['price'], color='green', marker='^', label='BUY', zorder=5)
-plt.scatter(sell_trades['timestamp'], sell_trades['price'], color='red', marker='v', label='SELL', zorder=5)
-
-# Estética
-plt.title('Historial de operaciones BTCUSDC')
-plt.xlabel('Fecha')
-plt.ylabel('Precio (USD)')
-plt.legend()
-plt.grid(True)
-
-# Guardado
-os.makedirs('results', exist_ok=True)
-plt.tight_layout()
-plt.savefig(OUTPUT_PATH)
-plt.close()
+# Gráfico (precio reducido con LTTB; cacheado si no hay cambios)
+trades_chart(OUTPUT_PATH, prices.index, prices['close'],
+             buys=(buy_trades['timestamp'], buy_trades['price']),
+             sells=(sell_trades['timestamp'], sell_trades['price']),
+             title='Historial de operaciones BTCUSDC')
 
 # Métricas
 total_ops = len(trades)
@@ -93,7 +93,7 @@ def run_once():
 
     results = []
     for params in grid_candidates():
-        dfx = rsi_sma_strategy(df.copy(), **params)
+        dfx = rsi_sma_strategy(df, **params)
         dfx, capital, metrics = backtest_signals(dfx, timeframe=TIMEFRAME)
         results.append({
             "strategy": "rsi_sma",
@@ -1,8 +1,6 @@
 # src/backtest.py
 import os
 import numpy as np
-import matplotlib.pyplot as plt
-from fpdf import FPDF
 
 # ➊  factor de anualización según la resolución de la vela
 ANNUALIZATION = {
@@ -18,6 +16,88 @@ ANNUALIZATION = {
 FEE_RATE_DEFAULT   = float(os.getenv("BACKTEST_FEE_RATE", os.getenv("REAL_FEE_RATE", "0.001")))   # 0.1%
 SLIPPAGE_DEFAULT   = float(os.getenv("BACKTEST_SLIPPAGE", "0.0005"))                              # 0.05%
 
+def backtest_arrays(close, position, initial_capital=10_000, timeframe="1h",
+                    fee_rate: float = FEE_RATE_DEFAULT,
+                    slippage: float = SLIPPAGE_DEFAULT):
+    """
+    Núcleo de `backtest_signals` sobre arrays (close, position ∈ {1,0,-1}).
+    Solo itera sobre los cambios de estado (entrada → salida), no vela a vela:
+    la equity es constante entre operaciones y se rellena hacia delante.
+    Devuelve (equity ndarray, capital_final, metrics).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signal = np.asarray(position)
+    n = len(close)
+
+    buys  = np.flatnonzero(signal == 1)
+    sells = np.flatnonzero(signal == -1)
+
+    capital = initial_capital
+    ev_idx, ev_cap = [], []
+    i = 0
+    while True:
+        k = np.searchsorted(buys, i)                    # ---- BUY ----
+        if k >= len(buys):
+            break
+        b = buys[k]
+        entry_price = close[b] * (1 + slippage)
+        capital    *= (1 - fee_rate)
+        ev_idx.append(b); ev_cap.append(capital)
+
+        k = np.searchsorted(sells, b, side="right")     # ---- SELL ---
+        if k >= len(sells):
+            break
+        s = sells[k]
+        exit_price = close[s] * (1 - slippage)
+        pnl        = (exit_price - entry_price) / entry_price
+        capital   *= (1 + pnl) * (1 - fee_rate)
+        ev_idx.append(s); ev_cap.append(capital)
+        i = s + 1
+
+    equity = np.full(n, float(initial_capital))
+    if ev_idx:
+        # capital tras cada evento, propagado hasta el siguiente
+        marks = np.zeros(n, dtype=np.intp)
+        marks[ev_idx] = np.arange(1, len(ev_idx) + 1)
+        np.maximum.accumulate(marks, out=marks)
+        values = np.concatenate(([float(initial_capital)], ev_cap))
+        equity = values[marks]
+
+    metrics = equity_metrics(equity, initial_capital, timeframe)
+    return equity, float(capital), metrics
+
+
+def equity_returns(equity) -> np.ndarray:
+    """Retornos por vela de la equity (0 en la primera), como pct_change().fillna(0) sin NaN."""
+    equity = np.asarray(equity, dtype=np.float64)
+    returns = np.zeros(len(equity))
+    returns[1:] = equity[1:] / equity[:-1] - 1
+    return returns
+
+
+def equity_metrics(equity, initial_capital, timeframe="1h"):
+    """total_return / sharpe_ratio (anualizado según TF) / max_drawdown de una curva de equity."""
+    equity = np.asarray(equity, dtype=np.float64)
+    if len(equity) == 0:
+        return {"total_return": 0.0, "sharpe_ratio": 0.0, "max_drawdown": 0.0}
+    returns = equity_returns(equity)
+
+    mean_r = returns.mean()
+    std_r  = returns.std(ddof=1) if len(returns) > 1 else float("nan")
+    ann_factor   = ANNUALIZATION.get(timeframe, 252)
+    sharpe_ratio = 0.0 if std_r == 0 else mean_r / std_r * np.sqrt(ann_factor)
+
+    rolling_max  = np.maximum.accumulate(equity)
+    max_drawdown = ((equity - rolling_max) / rolling_max).min()
+    total_return = equity[-1] / initial_capital - 1
+
+    return {
+        "total_return": float(total_return),
+        "sharpe_ratio": float(sharpe_ratio),
+        "max_drawdown": float(max_drawdown),
+    }
+
+
 def backtest_signals(df, initial_capital=10_000, timeframe="1h",
                      fee_rate: float = FEE_RATE_DEFAULT,
                      slippage: float = SLIPPAGE_DEFAULT):
@@ -27,59 +107,23 @@ def backtest_signals(df, initial_capital=10_000, timeframe="1h",
       * fee_rate: comisión proporcional
       * slippage: deslizamiento proporcional
     """
-    capital, position, entry_price = initial_capital, 0, 0.0
-    equity_curve = []
-
-    for _, row in df.iterrows():
-        price  = float(row["close"])
-        signal = int(row["position"])
-
-        if signal == 1 and position == 0:          # ---- BUY ----
-            fill_price = price * (1 + slippage)
-            capital   *= (1 - fee_rate)
-            position, entry_price = 1, fill_price
-
-        elif signal == -1 and position == 1:       # ---- SELL ---
-            exit_price = price * (1 - slippage)
-            pnl        = (exit_price - entry_price) / entry_price
-            capital   *= (1 + pnl) * (1 - fee_rate)
-            position   = 0
-
-        equity_curve.append(capital)
-
-    df["equity"]  = equity_curve
+    equity, capital, metrics = backtest_arrays(
+        df["close"].to_numpy(dtype=np.float64), df["position"].to_numpy(),
+        initial_capital=initial_capital, timeframe=timeframe,
+        fee_rate=fee_rate, slippage=slippage,
+    )
+    df["equity"]  = equity
     df["returns"] = df["equity"].pct_change().fillna(0)
-
-    # Sharpe ratio con annualization dinámico
-    mean_r, std_r = df["returns"].mean(), df["returns"].std()
-    ann_factor    = ANNUALIZATION.get(timeframe, 252)
-    sharpe_ratio  = 0.0 if std_r == 0 else mean_r / std_r * np.sqrt(ann_factor)
-
-    rolling_max   = df["equity"].cummax()
-    max_drawdown  = ((df["equity"] - rolling_max) / rolling_max).min()
-    total_return  = df["equity"].iloc[-1] / initial_capital - 1
-
-    metrics = {
-        "total_return": float(total_return),
-        "sharpe_ratio": float(sharpe_ratio),
-        "max_drawdown": float(max_drawdown),
-    }
-    return df, float(capital), metrics
+    return df, capital, metrics
 
 
 def generate_equity_plot(df, filename='results/equity_curve.png'):
-    plt.figure(figsize=(10, 5))
-    plt.plot(df['timestamp'], df['equity'], label='Equity Curve')
-    plt.title('Evolución del Capital')
-    plt.xlabel('Fecha')
-    plt.ylabel('Capital ($)')
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(filename)
-    plt.close()
+    from src.charts import equity_chart
+    equity_chart(filename, df['timestamp'], df['equity'], label='Equity Curve')
 
 def generate_pdf_report(df, capital_final, metrics, strategy_name='Estrategia', filename='results/report.pdf'):
+    from fpdf import FPDF   # solo al generar el informe
+
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=12)
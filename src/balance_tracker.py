@@ -4,10 +4,9 @@ import json
 from decimal import Decimal
 from dotenv import load_dotenv
 
-from binance.client import Client
-from binance.exceptions import BinanceAPIException, BinanceRequestException
-
 from src.utils import log_performance
+from src.event_bus import publish
+from src.metrics import track_api
 
 load_dotenv()
 
@@ -28,18 +27,22 @@ BINANCE_BASE_URL = os.getenv("BINANCE_BASE_URL", "").strip()  # e.g. https://api
 API_KEY = os.getenv("BINANCE_API_KEY", "").strip()
 API_SECRET = os.getenv("BINANCE_API_SECRET", "").strip()
 
-print(f"🔍 USE_REAL_BALANCE: {USE_REAL_BALANCE}")
-if USE_REAL_BALANCE:
-    print(f"🔍 USE_BINANCE_TESTNET: {USE_BINANCE_TESTNET}")
-    if BINANCE_BASE_URL:
-        print(f"🔍 BINANCE_BASE_URL: {BINANCE_BASE_URL}")
+def print_config():
+    """Muestra el modo de balance (lo llama el bot al arrancar, no el import)."""
+    print(f"🔍 USE_REAL_BALANCE: {USE_REAL_BALANCE}")
+    if USE_REAL_BALANCE:
+        print(f"🔍 USE_BINANCE_TESTNET: {USE_BINANCE_TESTNET}")
+        if BINANCE_BASE_URL:
+            print(f"🔍 BINANCE_BASE_URL: {BINANCE_BASE_URL}")
 
-def _build_client() -> Client:
+def _build_client():
     """
     Construye el cliente de Binance considerando testnet/base_url si se han definido por ENV.
     - USE_BINANCE_TESTNET=True → usa testnet oficial de spot.
     - BINANCE_BASE_URL → fuerza endpoint (p. ej., binance.us).
     """
+    from binance.client import Client
+
     kwargs = {}
     if USE_BINANCE_TESTNET:
         kwargs["testnet"] = True
@@ -60,6 +63,8 @@ def _explain_2015_hint():
     )
 
 def fetch_binance_balance():
+    from binance.exceptions import BinanceAPIException, BinanceRequestException
+
     if not API_KEY or not API_SECRET:
         raise RuntimeError(
             "Faltan credenciales: define BINANCE_API_KEY y BINANCE_API_SECRET en tu entorno/.env."
@@ -69,7 +74,8 @@ def fetch_binance_balance():
 
     # Prueba rápida de conectividad/estado (no firmada)
     try:
-        _ = client.get_exchange_info()
+        with track_api("get_exchange_info"):
+            _ = client.get_exchange_info()
     except BinanceRequestException as e:
         raise RuntimeError(f"No hay conectividad con el endpoint de Binance ({e}). "
                            f"Revisa internet/firewall/DNS y BINANCE_BASE_URL si aplica.")
@@ -78,7 +84,8 @@ def fetch_binance_balance():
 
     # Llamada firmada: aquí aparecen los -2015 de permisos/IP
     try:
-        account_info = client.get_account()
+        with track_api("get_account"):
+            account_info = client.get_account()
     except BinanceAPIException as e:
         if e.code == -2015:
             hint = _explain_2015_hint()
@@ -132,6 +139,7 @@ def save_balance(balance):
     os.makedirs(os.path.dirname(BALANCE_FILE), exist_ok=True)
     with open(BALANCE_FILE, 'w') as f:
         json.dump(balance, f, indent=2)
+    publish("balance", balance=balance)
 
 def update_balance(action, quantity, price):
     """
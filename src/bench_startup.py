@@ -0,0 +1,100 @@
+# src/bench_startup.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark de arranque en frío de los puntos de entrada (apps PM2 y subprocesos del optimizador).
+
+Cada módulo se importa en un intérprete nuevo (`python -X importtime -c "import m"`), varias
+veces; se reporta la mediana del tiempo de pared y los imports más caros según -X importtime.
+Importar no debe hacer red: si un módulo tarda segundos, algo volvió a ejecutarse al importar.
+
+    python -m src.bench_startup                    # módulos por defecto
+    python -m src.bench_startup src.live_trader -n 7 --json results/startup_bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ENTRY_POINTS = [
+    "src.live_trader",
+    "src.live_trader_5m",
+    "src.reoptimizer",
+    "src.report_scheduler",
+    "src.wsgi",
+    "src.optimize_rsi",
+    "src.run_backtest",
+    "src.ml_strategy",
+]
+
+
+def _parse_importtime(stderr: str) -> list:
+    """Líneas 'import time: self | cumulative | paquete' → [(cumulative_us, profundidad, paquete)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = line[len("import time:"):].split("|", 2)
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            name = parts[2].rstrip()
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            rows.append((int(parts[1]), depth, name.strip()))
+    return rows
+
+
+def measure(module: str, runs: int = 5, python: str = None) -> dict:
+    """Importa `module` `runs` veces en procesos nuevos. Devuelve tiempos y top de imports."""
+    python = python or sys.executable
+    walls, last_err, top = [], "", []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                              capture_output=True, text=True, cwd=os.getcwd())
+        walls.append(time.perf_counter() - t0)
+        if proc.returncode != 0:
+            last_err = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+            break
+        top = _parse_importtime(proc.stderr)
+
+    # imports directos del módulo medido (profundidad 1): son los que se pueden diferir
+    roots = sorted(((us, n) for us, depth, n in top if depth == 1), reverse=True)[:8]
+    return {
+        "module": module,
+        "ok": not last_err,
+        "error": last_err or None,
+        "runs": len(walls),
+        "median_s": round(statistics.median(walls), 4),
+        "min_s": round(min(walls), 4),
+        "top_imports": [{"module": n, "cumulative_ms": round(us / 1000, 1)} for us, n in roots],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de importación de los puntos de entrada")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--json", default=None, help="ruta donde guardar los resultados")
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules:
+        r = measure(module, runs=args.runs)
+        results.append(r)
+        if r["ok"]:
+            top = ", ".join(f"{t['module']} {t['cumulative_ms']:.0f}ms" for t in r["top_imports"][:3])
+            print(f"⏱️ {module:<24} mediana {r['median_s'] * 1000:7.1f} ms  (mín {r['min_s'] * 1000:.1f})  ← {top}")
+        else:
+            print(f"❌ {module:<24} no se pudo importar: {r['error']}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"💾 Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+# src/benchmark.py
+# -*- coding: utf-8 -*-
+"""
+Benchmark reproducible de estrategias, motores de backtest y grids del optimizador.
+
+Todo corre offline sobre velas sintéticas deterministas (generate_fake_data.make_ohlcv),
+así que dos ejecuciones en la misma máquina son comparables entre commits:
+
+    python -m src.benchmark                         # 1k, 10k, 100k y 1M velas
+    python -m src.benchmark --sizes 1000,10000 --repeat 5 --only strategy
+    python -m src.benchmark --grid-bars 20000 --grids small,medium,hybrid_small
+    python -m src.benchmark --only memory --sizes 100000   # memoria: normal vs compacto
+
+Cada caso se mide `repeat` veces (nos quedamos con el mejor tiempo) y se reporta velas/s
+(estrategias y backtests) o combinaciones/s (grids: optimize_rsi.run_grid y las celdas de
+optimize_hybrid_strategies, estrategia sobre arrays + backtest con riesgo). El caso "memory" compara el DataFrame
+de salida de cada estrategia normal frente a compact=True + columns=BACKTEST_COLUMNS
+(tamaño final y pico de asignaciones con tracemalloc). El resultado se guarda en
+BENCH_DIR/<fecha>_<commit>.json con versiones de Python/NumPy/pandas y el commit de git.
+"""
+
+import io
+import os
+import json
+import time
+import warnings
+import platform
+import argparse
+import subprocess
+import contextlib
+import tracemalloc
+from itertools import product
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from src.generate_fake_data import make_ohlcv
+
+BENCH_DIR     = os.getenv("BENCH_DIR", "results/benchmarks")
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+BENCH_SEED    = 42
+BENCH_TF      = "5m"
+
+# Grids del optimizador RSI (mismas claves que optimize_rsi.run_grid)
+GRIDS = {
+    "small": dict(rsi_period=[14], sma_period=[20, 30], rsi_buy=[30, 40],
+                  rsi_sell=[60, 70], lookback_bars=[8]),
+    "medium": dict(rsi_period=[10, 14, 21], sma_period=[20, 30, 50], rsi_buy=[30, 35, 40],
+                   rsi_sell=[60, 65, 70], lookback_bars=[6, 8]),
+    "large": dict(rsi_period=[7, 10, 14, 21, 28], sma_period=[10, 20, 30, 50, 100],
+                  rsi_buy=[25, 30, 35, 40], rsi_sell=[60, 65, 70, 75], lookback_bars=[4, 8, 12]),
+    # Celdas de optimize_hybrid_strategies (parámetros no listados → default del registro)
+    "hybrid_small": dict(macd_short=[6, 8], rsi_period=[12, 14], bb_std=[1.8, 2.0]),
+    "hybrid_medium": dict(macd_short=[6, 8, 10], macd_long=[20, 24], rsi_period=[12, 14],
+                          rsi_oversold=[35, 40], bb_std=[1.8, 2.0]),
+}
+
+
+# ---------------- casos ----------------
+def _strategies(**opts):
+    """nombre → función(df) que devuelve el df con 'position' (opts: columns/compact de frame_output)."""
+    from src.strategy import moving_average_crossover, rsi_sma_strategy, macd_strategy
+    from src.strategy.rsi_sma import rsi_sma_signals
+    from src.strategy.hybrid_strategy import hybrid_trading_strategy
+    from src.strategy.multi_indicator import multi_indicator_strategy
+
+    return {
+        "rsi_sma": lambda df: rsi_sma_strategy(df, **opts),
+        "rsi_sma_kernel": lambda df: rsi_sma_signals(df["close"].to_numpy(dtype=np.float64)),
+        "moving_average": lambda df: moving_average_crossover(df, **opts),
+        "macd": lambda df: macd_strategy(df, **opts),
+        "hybrid": lambda df: hybrid_trading_strategy(df, **opts),
+        "multi_indicator": lambda df: multi_indicator_strategy(df, **opts),
+    }
+
+
+def _backtests():
+    """nombre → función(df con 'position')."""
+    from src.backtest import backtest_signals, backtest_arrays
+    from src.risk_management import enhanced_backtest_with_risk_management
+
+    return {
+        "backtest_signals": lambda df: backtest_signals(df, timeframe=BENCH_TF),
+        "backtest_arrays": lambda df: backtest_arrays(df["close"].to_numpy(dtype=np.float64),
+                                                      df["position"].to_numpy(), timeframe=BENCH_TF),
+        "risk_close": lambda df: enhanced_backtest_with_risk_management(df, timeframe=BENCH_TF, stop_mode="close"),
+        "risk_intrabar": lambda df: enhanced_backtest_with_risk_management(df, timeframe=BENCH_TF, stop_mode="intrabar"),
+    }
+
+
+def _hybrid_cells(grid: dict) -> list:
+    """Combinaciones válidas (restricciones del registro) de un grid híbrido."""
+    from src.strategy.registry import get_strategy
+
+    spec = get_strategy("hybrid")
+    names = list(grid)
+    cells = [spec.coerce(dict(zip(names, values))) for values in product(*grid.values())]
+    return [p for p in cells if spec.is_valid(p)]
+
+
+def _combos(grid: dict) -> int:
+    return sum(1 for b in grid["rsi_buy"] for s in grid["rsi_sell"] if b < s) * (
+        len(grid["rsi_period"]) * len(grid["sma_period"]) * len(grid["lookback_bars"]))
+
+
+# ---------------- medición ----------------
+def _best_time(fn, make_input, repeat: int) -> float:
+    """Mejor de `repeat` ejecuciones; la preparación de la entrada (copias) no cuenta."""
+    best = float("inf")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)   # avisos de pandas en estrategias antiguas
+        for _ in range(repeat):
+            arg = make_input()
+            t0 = time.perf_counter()
+            fn(arg)
+            best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _record(kind: str, name: str, size: int, seconds: float, units: int, unit: str) -> dict:
+    rate = units / seconds if seconds > 0 else float("inf")
+    print(f"  {kind:<9} {name:<18} {size:>9,} velas  {seconds * 1000:10.1f} ms  {rate:14,.0f} {unit}/s")
+    return {"kind": kind, "name": name, "bars": size, "seconds": round(seconds, 6),
+            "units": units, "unit": unit, f"{unit}_per_sec": round(rate, 1)}
+
+
+def bench_strategies(df: pd.DataFrame, repeat: int, names=None) -> list:
+    out = []
+    for name, fn in _strategies().items():
+        if names and name not in names:
+            continue
+        secs = _best_time(fn, lambda: df.copy(), repeat)
+        out.append(_record("strategy", name, len(df), secs, len(df), "bars"))
+    return out
+
+
+def bench_backtests(df: pd.DataFrame, repeat: int, names=None) -> list:
+    from src.strategy import rsi_sma_strategy
+
+    signals = rsi_sma_strategy(df.copy())
+    base = df.assign(position=signals["position"].to_numpy())
+    out = []
+    for name, fn in _backtests().items():
+        if names and name not in names:
+            continue
+        secs = _best_time(fn, lambda: base.copy(), repeat)
+        out.append(_record("backtest", name, len(df), secs, len(df), "bars"))
+    return out
+
+
+def _measure_memory(fn, df: pd.DataFrame):
+    """(bytes del DataFrame devuelto, pico de memoria asignada durante la llamada)."""
+    from src.strategy.frames import frame_memory
+
+    arg = df.copy()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        tracemalloc.start()
+        try:
+            out = fn(arg)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return frame_memory(out), peak
+
+
+def bench_memory(df: pd.DataFrame, names=None) -> list:
+    """Memoria de la salida de cada estrategia: modo normal vs compacto + solo columnas de backtest."""
+    from src.strategy.frames import BACKTEST_COLUMNS
+
+    out = []
+    compact = _strategies(columns=BACKTEST_COLUMNS, compact=True)
+    for name, fn in _strategies().items():
+        if name == "rsi_sma_kernel" or (names and name not in names):   # el kernel no devuelve DataFrame
+            continue
+        before, peak_before = _measure_memory(fn, df)
+        after, peak_after = _measure_memory(compact[name], df)
+        ratio = before / after if after else float("inf")
+        print(f"  memory    {name:<18} {len(df):>9,} velas  {before / 1e6:8.2f} MB → {after / 1e6:6.2f} MB"
+              f"  (x{ratio:.1f}; pico {peak_before / 1e6:.1f} → {peak_after / 1e6:.1f} MB)")
+        out.append({"kind": "memory", "name": name, "bars": len(df),
+                    "bytes_default": before, "bytes_compact": after,
+                    "peak_default": peak_before, "peak_compact": peak_after,
+                    "reduction": round(ratio, 2)})
+    return out
+
+
+def bench_grids(df: pd.DataFrame, grids, repeat: int) -> list:
+    from src.optimize_rsi import run_grid
+    from src.optimize_hybrid_strategies import evaluate_cell
+    from src.strategy.base import OHLCV
+    from src.strategy.registry import get_strategy
+
+    out = []
+    for gname in grids:
+        grid = GRIDS[gname]
+        if gname.startswith("hybrid_"):
+            spec, cells = get_strategy("hybrid"), _hybrid_cells(grid)
+            def run_once(d, cells=cells):
+                data = OHLCV.from_frame(d)                    # como el optimizador: un OHLCV por dataset
+                for params in cells:
+                    evaluate_cell(spec, data, params)
+            secs = _best_time(run_once, lambda: df, repeat)
+            out.append(_record("grid", gname, len(df), secs, len(cells), "combos"))
+            continue
+        def run_once(d, grid=grid):
+            with contextlib.redirect_stdout(io.StringIO()):   # run_grid imprime el progreso
+                run_grid(d, grid, timeframe=BENCH_TF)
+        secs = _best_time(run_once, lambda: df, repeat)
+        out.append(_record("grid", f"rsi_{gname}", len(df), secs, _combos(grid), "combos"))
+    return out
+
+
+# ---------------- metadatos ----------------
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def environment() -> dict:
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run(sizes=DEFAULT_SIZES, repeat: int = 3, only=None, grids=("small", "medium", "hybrid_small"),
+        grid_bars: int = 10_000, strategies=None, seed: int = BENCH_SEED) -> dict:
+    """Ejecuta la suite y devuelve el informe (sin escribirlo)."""
+    only = set(only or ("strategy", "backtest", "grid"))
+    results = []
+    for size in sizes:
+        df = make_ohlcv(size, seed=seed, freq=BENCH_TF.replace("m", "min"))
+        print(f"📏 {size:,} velas")
+        if "strategy" in only:
+            results += bench_strategies(df, repeat, strategies)
+        if "backtest" in only:
+            results += bench_backtests(df, repeat)
+        if "memory" in only:
+            results += bench_memory(df, strategies)
+    if "grid" in only and grids:
+        df = make_ohlcv(grid_bars, seed=seed, freq=BENCH_TF.replace("m", "min"))
+        print(f"🧮 Grids sobre {grid_bars:,} velas")
+        results += bench_grids(df, grids, repeat)
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {"sizes": list(sizes), "repeat": repeat, "seed": seed, "timeframe": BENCH_TF,
+                   "grids": {g: GRIDS[g] for g in grids}, "grid_bars": grid_bars},
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def save(report: dict, out_dir: str = None) -> str:
+    out_dir = out_dir or BENCH_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(out_dir, f"{stamp}_{report['environment']['commit']}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def _int_list(text: str) -> list:
+    return [int(float(t)) for t in text.split(",") if t.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline de estrategias, backtests y grids")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="nº de velas separados por comas (ej 1000,10000)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", default="strategy,backtest,grid",
+                        help="subconjunto: strategy,backtest,grid,memory")
+    parser.add_argument("--strategies", default=None, help="limitar a estas estrategias (coma)")
+    parser.add_argument("--grids", default="small,medium,hybrid_small", help=f"grids: {','.join(GRIDS)}")
+    parser.add_argument("--grid-bars", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=BENCH_SEED)
+    parser.add_argument("--out", default=None, help=f"directorio de resultados (por defecto {BENCH_DIR})")
+    args = parser.parse_args(argv)
+
+    grids = [g for g in args.grids.split(",") if g]
+    unknown = [g for g in grids if g not in GRIDS]
+    if unknown:
+        parser.error(f"grids desconocidos: {unknown}")
+
+    report = run(
+        sizes=_int_list(args.sizes), repeat=args.repeat,
+        only=[o for o in args.only.split(",") if o],
+        grids=grids, grid_bars=args.grid_bars,
+        strategies=[s for s in args.strategies.split(",")] if args.strategies else None,
+        seed=args.seed,
+    )
+    path = save(report, args.out)
+    print(f"💾 Benchmark guardado en {path}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
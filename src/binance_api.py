@@ -1,14 +1,27 @@
 # src/binance_api.py
-import ccxt
 import pandas as pd
 from typing import List, Any
 
+from src.metrics import track_api
+
 # ──────────────────────────────────────────────────────────────────────────────
 #  CONFIGURACIÓN DEL EXCHANGE (solo para histórico; no necesita API keys)
 # ──────────────────────────────────────────────────────────────────────────────
-exchange = ccxt.binance({
-    "enableRateLimit": True,  # respeta límites de la API
-})
+_exchange = None
+
+
+def get_exchange():
+    """
+    Cliente ccxt creado en el primer uso: importar este módulo no carga ccxt
+    (~cientos de ms) ni construye el exchange.
+    """
+    global _exchange
+    if _exchange is None:
+        import ccxt
+        _exchange = ccxt.binance({
+            "enableRateLimit": True,  # respeta límites de la API
+        })
+    return _exchange
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -66,11 +79,13 @@ def get_historical_data(
     if limit <= 0:
         return pd.DataFrame(columns=["timestamp", "open", "high", "low", "close", "volume"])
 
+    exchange = get_exchange()
     ms_per_bar = exchange.parse_timeframe(timeframe) * 1_000
     all_rows: List[List[Any]] = []
 
     # 1) Primer tramo: velas más recientes
-    batch = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=None, limit=min(1000, limit))
+    with track_api("fetch_ohlcv"):
+        batch = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=None, limit=min(1000, limit))
     if not batch:
         raise RuntimeError(f"Binance no devolvió datos para {symbol} {timeframe}")
 
@@ -83,7 +98,8 @@ def get_historical_data(
         # desplazamos 'since' hacia atrás un colchón para evitar solapes
         since = int(earliest_ts - ms_per_bar * (fetch + 1))
 
-        batch = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=fetch)
+        with track_api("fetch_ohlcv"):
+            batch = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=fetch)
         if not batch:
             break
 
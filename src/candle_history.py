@@ -0,0 +1,139 @@
+# src/candle_history.py
+# -*- coding: utf-8 -*-
+"""
+Historial de velas para el arranque del bot, dimensionado por el calentamiento de la estrategia.
+
+    bars = required_bars("rsi_sma", params)            # warm-up declarado en el registro + margen
+    df = load_history("BTC/USDC", "15m", bars)         # CSV local (data/BTCUSDC_15m.csv) + exchange
+
+El CSV local es el que el propio live_trader va escribiendo vela a vela (y fix_data_gaps
+sanea). Si su cola es contigua y basta, solo se piden al exchange las velas que faltan
+hasta ahora; si no, se descargan las `bars` velas completas.
+
+BackgroundFetch hace la misma carga en un hilo, para completar el historial tras una
+recarga en caliente cuyos parámetros necesitan una ventana más larga, sin parar el bucle.
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from src.binance_api import get_historical_data
+
+WARMUP_MARGIN = int(os.getenv("WARMUP_MARGIN", "2"))   # velas extra sobre el warm-up declarado
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+_UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    return int(timeframe[:-1]) * _UNIT_SECONDS[timeframe[-1].lower()]
+
+
+def required_bars(strategy: str, params: dict = None) -> int:
+    """Velas de calentamiento de la estrategia (registro) + WARMUP_MARGIN."""
+    from src.strategy.registry import get_strategy
+    return get_strategy(strategy).warmup(params) + WARMUP_MARGIN
+
+
+def local_path(symbol: str, timeframe: str) -> str:
+    return f"data/{symbol.replace('/', '')}_{timeframe}.csv"
+
+
+def _contiguous_tail(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Última racha de velas sin huecos (paso exacto de `timeframe`)."""
+    if len(df) < 2:
+        return df
+    step = pd.Timedelta(seconds=timeframe_seconds(timeframe))
+    breaks = (df["timestamp"].diff() != step).to_numpy()
+    breaks[0] = False
+    start = int(breaks.nonzero()[0][-1]) if breaks.any() else 0
+    return df.iloc[start:].reset_index(drop=True)
+
+
+def read_local(symbol: str, timeframe: str, path: str = None) -> pd.DataFrame:
+    """Cola contigua y saneada del CSV local (vacío si no existe o no se puede leer)."""
+    path = path or local_path(symbol, timeframe)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    try:
+        df = pd.read_csv(path, usecols=lambda c: c in OHLCV_COLUMNS, float_precision="round_trip")
+    except Exception as e:
+        logging.warning(f"⚠️ No se pudo leer {path}: {e}")
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    if any(c not in df.columns for c in OHLCV_COLUMNS):
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
+    for c in OHLCV_COLUMNS[1:]:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    df = (
+        df.dropna(subset=OHLCV_COLUMNS)
+          .drop_duplicates(subset=["timestamp"], keep="last")
+          .sort_values("timestamp")
+          .reset_index(drop=True)
+    )
+    return _contiguous_tail(df[OHLCV_COLUMNS], timeframe)
+
+
+def _merge(older: pd.DataFrame, newer: pd.DataFrame) -> pd.DataFrame:
+    df = pd.concat([older, newer], ignore_index=True)
+    return (df.drop_duplicates(subset=["timestamp"], keep="last")
+              .sort_values("timestamp")
+              .reset_index(drop=True))
+
+
+def load_history(symbol: str, timeframe: str, bars: int, path: str = None, now: datetime = None):
+    """
+    Las `bars` velas más recientes: cola del CSV local + las que falten del exchange,
+    o descarga completa si lo local no alcanza. Devuelve (df, origen).
+    """
+    local = read_local(symbol, timeframe, path)
+    if len(local):
+        now = now or datetime.now(timezone.utc)
+        gap = int((pd.Timestamp(now) - local["timestamp"].iloc[-1]).total_seconds()
+                  // timeframe_seconds(timeframe))
+        fetch = max(gap, 0) + 2                    # solape de 2 velas con lo local
+        if len(local) + fetch - 2 >= bars and fetch < bars:
+            fresh = get_historical_data(symbol, timeframe, fetch)
+            df = _contiguous_tail(_merge(local, fresh), timeframe)
+            if len(df) >= bars:
+                return df.iloc[-bars:].reset_index(drop=True), f"local+exchange({fetch})"
+
+    return get_historical_data(symbol, timeframe, bars), f"exchange({bars})"
+
+
+def extend_history(history: list, older: pd.DataFrame) -> list:
+    """Antepone a `history` (lista de dicts) las velas de `older` que sean anteriores."""
+    if older is None or older.empty:
+        return history
+    if not history:
+        return older.to_dict("records")
+    first = pd.Timestamp(history[0]["timestamp"])
+    prefix = older[older["timestamp"] < first]
+    return prefix.to_dict("records") + history
+
+
+class BackgroundFetch:
+    """load_history en un hilo daemon; el bucle consulta `done` y recoge `result`."""
+
+    def __init__(self, symbol: str, timeframe: str, bars: int, path: str = None):
+        self.bars = bars
+        self.result = None
+        self.source = None
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=(symbol, timeframe, bars, path),
+                                        name="history-topup", daemon=True)
+        self._thread.start()
+
+    def _run(self, symbol, timeframe, bars, path):
+        try:
+            self.result, self.source = load_history(symbol, timeframe, bars, path)
+        except Exception as e:
+            self.error = e
+
+    @property
+    def done(self) -> bool:
+        return not self._thread.is_alive()
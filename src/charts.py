@@ -0,0 +1,189 @@
+# src/charts.py
+# -*- coding: utf-8 -*-
+"""
+Servicio de gráficos PNG para scripts e informes.
+
+  - matplotlib se importa solo al primer render y con backend no interactivo (Agg):
+    importar este módulo (p.ej. desde el optimizador sin --plot) no cuesta nada.
+  - Cada PNG se cachea en CHART_CACHE_DIR con clave = hash de las series y opciones;
+    repetir un informe sobre datos sin cambios solo copia el fichero.
+  - Las series largas se reducen con LTTB a CHART_MAX_POINTS antes de dibujar.
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import numpy as np
+
+from src.downsample import lttb_indices
+from src.metrics import counter
+
+CHART_CACHE_DIR  = os.getenv("CHART_CACHE_DIR", "results/.chart_cache")
+CHART_CACHE_MAX  = int(os.getenv("CHART_CACHE_MAX", "200"))       # PNGs guardados
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "2000"))     # puntos por línea
+
+CACHE_REQUESTS = counter("chart_cache_requests_total", "Gráficos pedidos por resultado de la caché", ("result",))
+
+_plt = None
+
+
+def _pyplot():
+    """matplotlib.pyplot con backend Agg, importado una sola vez bajo demanda."""
+    global _plt
+    if _plt is None:
+        import matplotlib
+        if "matplotlib.pyplot" not in sys.modules:
+            matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        _plt = plt
+    return _plt
+
+
+# ---------------- series ----------------
+def _as_array(values) -> np.ndarray:
+    """Series/listas → ndarray (fechas como datetime64[ns] sin zona)."""
+    if hasattr(values, "dt") and getattr(values.dt, "tz", None) is not None:
+        values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+    elif hasattr(values, "tz") and getattr(values, "tz", None) is not None:      # DatetimeIndex
+        values = values.tz_convert("UTC").tz_localize(None)
+    arr = np.asarray(values)
+    if arr.dtype == object and len(arr) and hasattr(arr[0], "isoformat"):
+        arr = np.asarray([np.datetime64(v.replace(tzinfo=None) if getattr(v, "tzinfo", None) else v, "ns")
+                          for v in arr])
+    return arr
+
+
+def _numeric(arr: np.ndarray) -> np.ndarray:
+    return arr.astype("datetime64[ns]").astype(np.int64).astype(np.float64) \
+        if np.issubdtype(arr.dtype, np.datetime64) else arr.astype(np.float64)
+
+
+def reduce_series(x, y, max_points: int = None):
+    """(x, y) como arrays; con más de max_points puntos, reducidos con LTTB."""
+    x, y = _as_array(x), _as_array(y)
+    max_points = CHART_MAX_POINTS if max_points is None else max_points
+    if max_points and len(x) > max_points:
+        idx = lttb_indices(_numeric(x), y.astype(np.float64), max_points)
+        x, y = x[idx], y[idx]
+    return x, y
+
+
+# ---------------- caché ----------------
+def _chart_key(kind: str, arrays, options: dict) -> str:
+    h = hashlib.sha1(kind.encode())
+    h.update(json.dumps(options, sort_keys=True, default=str).encode())
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        h.update(str((arr.dtype, arr.shape)).encode())
+        h.update(arr.tobytes() if arr.dtype != object else repr(arr.tolist()).encode())
+    return h.hexdigest()
+
+
+def _prune_cache():
+    try:
+        files = [os.path.join(CHART_CACHE_DIR, f) for f in os.listdir(CHART_CACHE_DIR) if f.endswith(".png")]
+    except OSError:
+        return
+    if len(files) <= CHART_CACHE_MAX:
+        return
+    files.sort(key=os.path.getmtime)
+    for f in files[:len(files) - CHART_CACHE_MAX]:
+        try:
+            os.remove(f)
+        except OSError:
+            pass
+
+
+def _render_cached(kind: str, path: str, arrays, options: dict, draw) -> str:
+    """
+    Devuelve `path` con el PNG: copia desde la caché si existe la misma clave;
+    si no, crea la figura, llama draw(plt) y guarda en caché + destino.
+    """
+    key = _chart_key(kind, arrays, options)
+    cached = os.path.join(CHART_CACHE_DIR, f"{key}.png")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    if os.path.exists(cached):
+        CACHE_REQUESTS.labels("hit").inc()
+        os.utime(cached)     # LRU por mtime
+        shutil.copyfile(cached, path)
+        return path
+
+    CACHE_REQUESTS.labels("miss").inc()
+    plt = _pyplot()
+    fig = plt.figure(figsize=options.get("figsize", (10, 5)))
+    try:
+        draw(plt)
+        plt.title(options.get("title", ""))
+        plt.xlabel(options.get("xlabel", ""))
+        plt.ylabel(options.get("ylabel", ""))
+        plt.grid(options.get("grid", True))
+        if options.get("legend"):
+            plt.legend()
+        plt.tight_layout()
+        os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+        tmp = cached + ".tmp.png"
+        fig.savefig(tmp)
+        os.replace(tmp, cached)
+    finally:
+        plt.close(fig)
+    shutil.copyfile(cached, path)
+    _prune_cache()
+    return path
+
+
+# ---------------- tipos de gráfico ----------------
+def line_chart(path: str, x, y, title: str = "", xlabel: str = "", ylabel: str = "",
+               label: str = None, figsize=(10, 5), max_points: int = None) -> str:
+    """Una serie (p.ej. curva de equity) reducida con LTTB."""
+    x, y = reduce_series(x, y, max_points)
+    options = {"title": title, "xlabel": xlabel, "ylabel": ylabel, "label": label,
+               "figsize": list(figsize), "legend": label is not None}
+
+    def draw(plt):
+        plt.plot(x, y, label=label)
+
+    return _render_cached("line", path, (x, y), options, draw)
+
+
+def equity_chart(path: str, timestamps, equity, title: str = "Evolución del Capital",
+                 ylabel: str = "Capital ($)", **kwargs) -> str:
+    return line_chart(path, timestamps, equity, title=title, xlabel="Fecha", ylabel=ylabel, **kwargs)
+
+
+def trades_chart(path: str, price_x, price_y, buys=None, sells=None, title: str = "",
+                 symbol: str = "BTCUSDC", figsize=(12, 6), max_points: int = None) -> str:
+    """Precio (reducido con LTTB) con marcadores de BUY/SELL (x, y) encima."""
+    px, py = reduce_series(price_x, price_y, max_points)
+    bx, by = (_as_array(buys[0]), _as_array(buys[1])) if buys is not None else (np.array([]), np.array([]))
+    sx, sy = (_as_array(sells[0]), _as_array(sells[1])) if sells is not None else (np.array([]), np.array([]))
+    options = {"title": title, "xlabel": "Fecha", "ylabel": "Precio (USD)", "symbol": symbol,
+               "figsize": list(figsize), "legend": True}
+
+    def draw(plt):
+        plt.plot(px, py, label=symbol, color="blue", linewidth=1)
+        plt.scatter(bx, by, color="green", marker="^", label="BUY", zorder=5)
+        plt.scatter(sx, sy, color="red", marker="v", label="SELL", zorder=5)
+
+    return _render_cached("trades", path, (px, py, bx, by, sx, sy), options, draw)
+
+
+def bar_chart(path: str, labels, values, annotations=None, title: str = "", xlabel: str = "",
+              ylabel: str = "", figsize=(10, 5)) -> str:
+    """Barras con una etiqueta opcional (rotada) encima de cada una."""
+    labels = [str(l) for l in labels]
+    values = np.asarray(values, dtype=np.float64)
+    annotations = list(annotations) if annotations is not None else []
+    options = {"title": title, "xlabel": xlabel, "ylabel": ylabel, "figsize": list(figsize),
+               "labels": labels, "annotations": annotations, "grid": False}
+
+    def draw(plt):
+        plt.bar(labels, values)
+        for i, text in enumerate(annotations):
+            plt.text(i, values[i] + 0.1, text, ha="center", fontsize=8, rotation=45)
+        # margen inferior para que quepan etiquetas
+        plt.gcf().subplots_adjust(bottom=0.25)
+
+    return _render_cached("bar", path, (values,), options, draw)
@@ -0,0 +1,558 @@
+# src/dashboard_data.py
+# -*- coding: utf-8 -*-
+"""
+Capa de datos del dashboard: lee los journals (logs/trades*.csv, logs/performance_log*.csv)
+de forma incremental por offset de bytes y mantiene agregados en memoria.
+
+  - JournalTail      → devuelve solo las líneas completas nuevas desde el último offset
+                       (detecta truncado/rotación y vuelve a empezar)
+  - TradesAggregate  → nº de operaciones, BUY/SELL, PnL emparejado (i-ésimo BUY con i-ésimo SELL)
+                       y serie de precios de las operaciones
+  - PerfAggregate    → serie de equity (filas de log_performance) y nº de fills del journal
+  - OhlcvAggregate   → serie de cierres del CSV de velas que escribe el trader (data/<SYM>_<TF>.csv)
+  - DashboardData    → los une; `refresh()` es un stat() por fichero si no han crecido
+  - BotIndex         → un DashboardData por bot (símbolo, TF) descubierto en logs/ + vista de cartera
+
+Así el coste de una petición no depende del tamaño del histórico: solo se parsea lo nuevo.
+"""
+
+import os
+import re
+import csv
+import time
+import threading
+from array import array
+from datetime import datetime, timezone
+
+import numpy as np
+
+READ_CHUNK = 4 * 1024 * 1024
+
+
+def _parse_ts(value: str):
+    """ISO-8601 → epoch (segundos, float) o None."""
+    try:
+        ts = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except (ValueError, AttributeError):
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class JournalTail:
+    """
+    Lector incremental de un fichero que solo crece por append.
+    Guarda offset, inode y el resto de una línea a medio escribir.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self.inode = None
+        self.mtime = 0.0
+        self._partial = b""
+
+    def reset(self):
+        self.offset = 0
+        self.inode = None
+        self.mtime = 0.0
+        self._partial = b""
+
+    def seek_tail(self, max_bytes: int):
+        """
+        Se coloca a `max_bytes` del final (en un inicio de línea): el próximo read_new
+        solo devuelve la cola reciente en vez de todo el fichero.
+        """
+        self.reset()
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return
+        start = max(0, st.st_size - max_bytes)
+        if start:
+            with open(self.path, "rb") as f:
+                f.seek(start - 1)
+                if f.read(1) != b"\n":
+                    f.readline()            # descarta la línea cortada
+                start = f.tell()
+        self.inode = st.st_ino
+        self.offset = start
+
+    def changed(self) -> bool:
+        """True si el fichero ha crecido, se ha truncado o se ha rotado desde la última lectura."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return self.inode is not None
+        return st.st_ino != self.inode or st.st_size != self.offset
+
+    def read_new(self):
+        """
+        Devuelve (lineas_nuevas, reiniciado). `reiniciado` es True si el fichero se truncó,
+        se rotó o desapareció y hay que rehacer los agregados desde cero.
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            restarted = self.inode is not None
+            self.reset()
+            return [], restarted
+
+        restarted = False
+        if self.inode is not None and (st.st_ino != self.inode or st.st_size < self.offset):
+            self.reset()
+            restarted = True
+        self.inode = st.st_ino
+        self.mtime = st.st_mtime
+
+        if st.st_size == self.offset:
+            return [], restarted
+
+        lines = []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            while True:
+                chunk = f.read(READ_CHUNK)
+                if not chunk:
+                    break
+                self.offset += len(chunk)
+                blob = self._partial + chunk
+                cut = blob.rfind(b"\n")
+                if cut < 0:
+                    self._partial = blob
+                    continue
+                self._partial = blob[cut + 1:]
+                lines.extend(blob[:cut].decode("utf-8", errors="replace").splitlines())
+        return lines, restarted
+
+
+class TradesAggregate:
+    """Agregados de logs/trades*.csv (timestamp,symbol,action,price,strategy,params)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.header = None
+        self.total = 0
+        self.buys = 0
+        self.sells = 0
+        self.buy_prices = array("d")
+        self.sell_prices = array("d")
+        self.paired = 0
+        self.paired_profit = 0.0
+        self.paired_pct = 0.0
+        self.ts = array("d")          # epoch de cada operación (serie de precios)
+        self.prices = array("d")
+        self.actions = array("b")     # 1 = BUY, -1 = SELL, 0 = otra
+
+    def feed(self, lines):
+        for row in csv.reader(lines):
+            if not row:
+                continue
+            if self.header is None:
+                self.header = {name: i for i, name in enumerate(row)}
+                continue
+            if row[0] == "timestamp":
+                continue  # cabecera repetida tras concatenar ficheros
+            self._add(row)
+
+    def _add(self, row):
+        h = self.header
+        get = lambda name: row[h[name]] if name in h and h[name] < len(row) else None
+        action = (get("action") or "").strip().upper()
+        price = _to_float(get("price"))
+        self.total += 1
+
+        side = 0
+        if action == "BUY":
+            self.buys += 1
+            side = 1
+            if price is not None:
+                self.buy_prices.append(price)
+        elif action == "SELL":
+            self.sells += 1
+            side = -1
+            if price is not None:
+                self.sell_prices.append(price)
+
+        # Emparejado posicional: el i-ésimo SELL cierra el i-ésimo BUY
+        while self.paired < min(len(self.buy_prices), len(self.sell_prices)):
+            b = self.buy_prices[self.paired]
+            s = self.sell_prices[self.paired]
+            self.paired_profit += s - b
+            self.paired_pct += (s - b) / b * 100 if b else 0.0
+            self.paired += 1
+
+        ts = _parse_ts(get("timestamp") or "")
+        if ts is not None and price is not None:
+            self.ts.append(ts)
+            self.prices.append(price)
+            self.actions.append(side)
+
+    def summary(self) -> dict:
+        balanced = self.buys == self.sells
+        return {
+            "total_ops": self.total,
+            "buys": self.buys,
+            "sells": self.sells,
+            "total_profit": round(self.paired_profit, 2) if balanced else "⚠️ Desbalance",
+            "profit_pct": round(self.paired_pct, 2) if balanced else "⚠️",
+        }
+
+
+class PerfAggregate:
+    """
+    Agregados de logs/performance_log*.csv. Admite las dos formas de línea que escriben
+    los traders: filas de log_performance (con cabecera y columna equity) y líneas de fill
+    sin cabecera (ts,action,price,qty,notional,status).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.header = None
+        self.equity_ts = array("d")
+        self.equity = array("d")
+        self.fills = 0
+        self.failed = 0
+
+    def feed(self, lines):
+        for row in csv.reader(lines):
+            if not row:
+                continue
+            if row[0] == "timestamp":
+                self.header = {name: i for i, name in enumerate(row)}
+                continue
+            if len(row) == 6 and _to_float(row[5]) is None:
+                # línea de fill: ts,action,price,qty,notional,status (status no numérico)
+                status = row[5].strip().upper()
+                if status == "SUCCESS":
+                    self.fills += 1
+                elif "FAILED" in row[1].upper():
+                    self.failed += 1
+                continue
+            if self.header and "equity" in self.header and self.header["equity"] < len(row):
+                ts = _parse_ts(row[self.header.get("timestamp", 0)])
+                eq = _to_float(row[self.header["equity"]])
+                if ts is not None and eq is not None:
+                    self.equity_ts.append(ts)
+                    self.equity.append(eq)
+
+    def summary(self) -> dict:
+        return {
+            "fills": self.fills,
+            "failed_orders": self.failed,
+            "last_equity": round(self.equity[-1], 2) if len(self.equity) else None,
+        }
+
+
+class OhlcvAggregate:
+    """Serie (timestamp, close) del CSV de velas con cabecera timestamp,open,high,low,close,volume."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.header = None
+        self.ts = array("d")
+        self.close = array("d")
+
+    def feed(self, lines):
+        for row in csv.reader(lines):
+            if not row:
+                continue
+            if row[0] == "timestamp":
+                self.header = {name: i for i, name in enumerate(row)}
+                continue
+            if not self.header or "close" not in self.header or self.header["close"] >= len(row):
+                continue
+            ts = _parse_ts(row[self.header.get("timestamp", 0)])
+            px = _to_float(row[self.header["close"]])
+            if ts is not None and px is not None:
+                self.ts.append(ts)
+                self.close.append(px)
+
+
+class DashboardData:
+    """
+    Agregados del dashboard con caché: `refresh()` solo parsea bytes nuevos y `version`
+    cambia únicamente cuando algún journal crece (o se trunca/rota).
+    """
+
+    def __init__(self, trades_path: str, perf_path: str = None, ohlcv_path: str = None):
+        self.trades_tail = JournalTail(trades_path)
+        self.perf_tail = JournalTail(perf_path) if perf_path else None
+        self.ohlcv_tail = JournalTail(ohlcv_path) if ohlcv_path else None
+        self.trades = TradesAggregate()
+        self.perf = PerfAggregate()
+        self.ohlcv = OhlcvAggregate()
+        self.version = 0
+        self._lock = threading.Lock()
+        self._arrays = {}   # nombre → (version, (ts, valores, ...)) copias NumPy para las APIs
+
+    def _pump(self, tail, agg) -> bool:
+        if tail is None or not tail.changed():
+            return False
+        lines, restarted = tail.read_new()
+        if restarted:
+            agg.reset()
+        agg.feed(lines)
+        return bool(lines) or restarted
+
+    def refresh(self) -> int:
+        with self._lock:
+            grew = self._pump(self.trades_tail, self.trades)
+            grew = self._pump(self.perf_tail, self.perf) or grew
+            grew = self._pump(self.ohlcv_tail, self.ohlcv) or grew
+            if grew:
+                self.version += 1
+            return self.version
+
+    def series(self, name: str):
+        """
+        Copias NumPy (cacheadas por versión) de una serie:
+          "price"  → (ts, close) de las velas, o de las operaciones si no hay CSV de velas
+          "equity" → (ts, equity)
+          "trades" → (ts, price, action)
+        Se copian porque un array('d') con vistas exportadas no puede crecer.
+        """
+        with self._lock:
+            cached = self._arrays.get(name)
+            if cached and cached[0] == self.version:
+                return cached[1]
+            if name == "price":
+                if len(self.ohlcv.ts):
+                    out = (np.array(self.ohlcv.ts), np.array(self.ohlcv.close))
+                else:
+                    out = (np.array(self.trades.ts), np.array(self.trades.prices))
+            elif name == "equity":
+                out = (np.array(self.perf.equity_ts), np.array(self.perf.equity))
+            elif name == "trades":
+                out = (np.array(self.trades.ts), np.array(self.trades.prices),
+                       np.array(self.trades.actions, dtype=np.int8))
+            else:
+                raise KeyError(name)
+            self._arrays[name] = (self.version, out)
+            return out
+
+    def validators(self):
+        """
+        (tag, last_modified) para validación HTTP: el tag sale de (inode, offset) de cada
+        journal, así que solo cambia cuando un fichero crece, se trunca o se rota.
+        """
+        tails = [t for t in (self.trades_tail, self.perf_tail, self.ohlcv_tail) if t is not None]
+        tag = "-".join(f"{t.inode or 0:x}.{t.offset:x}" for t in tails)
+        return tag, max((t.mtime for t in tails), default=0.0)
+
+    def has_trades(self) -> bool:
+        return self.trades.total > 0
+
+    def summary(self) -> dict:
+        out = self.trades.summary()
+        out.update(self.perf.summary())
+        return out
+
+
+# ====================== Varios bots (símbolo × timeframe) ======================
+JOURNAL_RE = re.compile(r"^(trades|performance_log)(?:_(.+))?\.csv$")
+BOT_RESCAN_SEC = float(os.getenv("DASHBOARD_RESCAN_SEC", "60"))
+PORTFOLIO = "portfolio"
+
+
+def bot_key(symbol: str, timeframe: str = None) -> str:
+    """Clave de un bot: "BTCUSDC_15m", o solo el símbolo para el journal sin sufijo."""
+    symbol = symbol.replace("/", "")
+    return f"{symbol}_{timeframe}" if timeframe else symbol
+
+
+def journal_bot_key(trades_path: str, symbol: str) -> str:
+    """Clave del bot que escribe en `trades_path` (la misma que le da BotIndex)."""
+    m = JOURNAL_RE.match(os.path.basename(trades_path or ""))
+    return bot_key(symbol, m.group(2) if m else None)
+
+
+def discover_journals(logs_dir: str) -> dict:
+    """
+    Journals por timeframe a partir de los nombres de fichero:
+      trades_15m.csv / performance_log_15m.csv → "15m"
+      trades.csv / performance_log.csv         → None (journal sin sufijo)
+    Devuelve {tf: {"trades": ruta, "perf": ruta}}.
+    """
+    found = {}
+    try:
+        names = os.listdir(logs_dir)
+    except OSError:
+        return found
+    for name in sorted(names):
+        m = JOURNAL_RE.match(name)
+        if not m:
+            continue
+        kind = "trades" if m.group(1) == "trades" else "perf"
+        found.setdefault(m.group(2), {})[kind] = os.path.join(logs_dir, name)
+    return found
+
+
+def _peek_symbol(trades_path: str):
+    """Símbolo de la primera operación del journal (sin leer el resto del fichero)."""
+    try:
+        with open(trades_path, "r", newline="") as f:
+            rows = csv.reader([f.readline(), f.readline()])
+            header = next(rows, None)
+            first = next(rows, None)
+    except OSError:
+        return None
+    if not header or not first or "symbol" not in header:
+        return None
+    i = header.index("symbol")
+    if i >= len(first):
+        return None
+    return first[i].replace("/", "").strip() or None
+
+
+class BotIndex:
+    """
+    Un DashboardData por bot (símbolo, TF) descubierto en logs/, más una vista de cartera.
+    El descubrimiento es un listdir cada DASHBOARD_RESCAN_SEC; cada bot solo parsea lo que
+    crecen sus journals, y la cartera se recalcula solo cuando cambia la versión de algún bot.
+    """
+
+    def __init__(self, base_dir: str, default_symbol: str, default_timeframe: str, rescan_sec: float = None):
+        self.base_dir = base_dir
+        self.logs_dir = os.path.join(base_dir, "logs")
+        self.default_symbol = default_symbol
+        self.default_timeframe = default_timeframe
+        self.rescan_sec = BOT_RESCAN_SEC if rescan_sec is None else rescan_sec
+        self._bots = {}          # clave "BTCUSDC_15m" → DashboardData
+        self._meta = {}          # clave → {"symbol", "timeframe", "trades", "perf"}
+        self._by_tf = {}         # tf del fichero → clave
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+        self._portfolio = {}     # nombre → (versiones, resultado)
+
+    def _scan(self, force: bool = False):
+        now = time.time()
+        if not force and now - self._last_scan < self.rescan_sec:
+            return
+        self._last_scan = now
+        for tf, paths in discover_journals(self.logs_dir).items():
+            if tf in self._by_tf or "trades" not in paths and "perf" not in paths:
+                continue
+            symbol = (_peek_symbol(paths["trades"]) if "trades" in paths else None) or self.default_symbol
+            timeframe = tf or self.default_timeframe
+            key = bot_key(symbol, tf)
+            ohlcv = os.path.join(self.base_dir, f"data/{symbol}_{timeframe}.csv")
+            self._bots[key] = DashboardData(paths.get("trades", os.path.join(self.logs_dir, "trades.csv")),
+                                            paths.get("perf"), ohlcv)
+            self._meta[key] = {"symbol": symbol, "timeframe": timeframe,
+                               "trades": paths.get("trades"), "perf": paths.get("perf")}
+            self._by_tf[tf] = key
+
+    def refresh(self) -> dict:
+        """Refresca todos los bots; devuelve {clave: versión}."""
+        with self._lock:
+            self._scan()
+            bots = dict(self._bots)
+        return {key: data.refresh() for key, data in bots.items()}
+
+    def keys(self) -> list:
+        with self._lock:
+            self._scan()
+            return list(self._bots)
+
+    def meta(self, key: str) -> dict:
+        return self._meta.get(key, {})
+
+    def get(self, key: str = None):
+        """DashboardData de un bot (por defecto el del TF configurado, o el primero)."""
+        with self._lock:
+            self._scan()
+            if key and key in self._bots:
+                return self._bots[key]
+            default = self._by_tf.get(self.default_timeframe) or self._by_tf.get(None)
+            if default is None and self._bots:
+                default = next(iter(self._bots))
+            return self._bots.get(default)
+
+    def validators(self, key: str = None):
+        """(tag, last_modified) de un bot o, con key=PORTFOLIO, de todos."""
+        with self._lock:
+            bots = dict(self._bots)
+        if key == PORTFOLIO:
+            parts = [(k, *d.validators()) for k, d in sorted(bots.items())]
+            tag = "|".join(f"{k}:{t}" for k, t, _ in parts)
+            return tag, max((m for _, _, m in parts), default=0.0)
+        data = bots.get(key)
+        return data.validators() if data is not None else ("", 0.0)
+
+    def default_key(self):
+        data = self.get()
+        return next((k for k, d in self._bots.items() if d is data), None)
+
+    # ---------------- cartera ----------------
+    def _cached(self, name, versions, build):
+        hit = self._portfolio.get(name)
+        if hit and hit[0] == versions:
+            return hit[1]
+        out = build()
+        self._portfolio[name] = (versions, out)
+        return out
+
+    def portfolio_summary(self) -> dict:
+        versions = tuple(sorted(self.refresh().items()))
+
+        def build():
+            out = {"bots": len(self._bots), "total_ops": 0, "buys": 0, "sells": 0,
+                   "total_profit": 0.0, "profit_pct": 0.0, "fills": 0, "failed_orders": 0, "last_equity": None}
+            for data in self._bots.values():
+                s = data.summary()
+                for k in ("total_ops", "buys", "sells", "fills", "failed_orders"):
+                    out[k] += s[k]
+                for k in ("total_profit", "profit_pct"):
+                    # un bot desbalanceado (posición abierta) marca la cartera igual que en su vista
+                    if isinstance(out[k], float) and isinstance(s[k], (int, float)):
+                        out[k] = round(out[k] + s[k], 2)
+                    elif not isinstance(s[k], (int, float)):
+                        out[k] = s[k]
+                if s["last_equity"] is not None:
+                    out["last_equity"] = round((out["last_equity"] or 0.0) + s["last_equity"], 2)
+            return out
+
+        return self._cached("summary", versions, build)
+
+    def portfolio_series(self, name: str):
+        """
+        "equity" → suma de las equities de cada bot (cada una mantiene su último valor
+                   hasta su siguiente registro; un bot cuenta desde su primer registro)
+        "trades" → operaciones de todos los bots ordenadas por tiempo
+        """
+        versions = tuple(sorted(self.refresh().items()))
+
+        def build():
+            parts = [d.series(name) for d in self._bots.values()]
+            parts = [p for p in parts if len(p[0])]
+            if not parts:
+                return tuple(np.empty(0) for _ in range(2 if name == "equity" else 3))
+            if name == "trades":
+                cols = [np.concatenate(c) for c in zip(*parts)]
+                order = np.argsort(cols[0], kind="stable")
+                return tuple(c[order] for c in cols)
+            if name != "equity":
+                raise KeyError(name)
+            ts = np.unique(np.concatenate([p[0] for p in parts]))
+            total = np.zeros(len(ts))
+            for p_ts, p_eq in parts:
+                pos = np.searchsorted(p_ts, ts, side="right") - 1
+                total += np.where(pos >= 0, p_eq[np.maximum(pos, 0)], 0.0)
+            return ts, total
+
+        return self._cached(name, versions, build)
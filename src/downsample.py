@@ -0,0 +1,55 @@
+# src/downsample.py
+# -*- coding: utf-8 -*-
+"""
+Reducción de series para gráficos: Largest-Triangle-Three-Buckets (LTTB).
+
+Conserva la forma visual (picos, valles) de una serie de N puntos con solo `n_out`
+puntos. El bucle Python es por cubo (n_out iteraciones), no por punto.
+"""
+
+import numpy as np
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Índices de los puntos elegidos por LTTB (siempre incluye el primero y el último).
+    Si la serie ya tiene <= n_out puntos devuelve todos.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out <= 0:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:n_out]
+
+    # Cubos intermedios: n-2 puntos repartidos en n_out-2 cubos
+    every = (n - 2) / (n_out - 2)
+    edges = (np.floor(np.arange(n_out - 1) * every) + 1).astype(np.int64)
+    edges[-1] = n - 1
+    # medias de cada cubo (para el "siguiente" punto C del triángulo)
+    cx = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+    cy = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / np.diff(edges)
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 1 < n_out - 2:
+            nx, ny = cx[b + 1], cy[b + 1]
+        else:
+            nx, ny = x[n - 1], y[n - 1]
+        ax, ay = x[a], y[a]
+        # área (×2) del triángulo A-P-C para cada candidato P del cubo
+        area = np.abs((ax - nx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (ny - ay))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+
+def lttb(x, y, n_out: int):
+    """(x, y) reducidos con LTTB."""
+    idx = lttb_indices(x, y, n_out)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
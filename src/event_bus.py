@@ -0,0 +1,243 @@
+# src/event_bus.py
+# -*- coding: utf-8 -*-
+"""
+Bus de eventos local entre los traders y el dashboard.
+
+Productores (live_trader, paper/real_trading, balance_tracker):
+    publish("candle", close=..., ...)   → una línea JSON en logs/events.jsonl (append atómico)
+
+Consumidor (web_dashboard):
+    EventHub: un único hilo hace tail del fichero y reparte cada evento a las colas de los
+    navegadores conectados por SSE. N pestañas abiertas = 1 lectura del fichero, no N recargas.
+
+Tipos de evento: candle · signal · fill · balance
+
+El journal no crece sin límite: al pasar de EVENTS_MAX_MB se rota a events.jsonl.1 (se
+conserva una sola generación), y el hub solo lee los últimos EVENTS_SEED_KB al arrancar.
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+from datetime import datetime, timezone
+
+from src.dashboard_data import JournalTail, bot_key
+from src.metrics import counter, gauge
+
+EVENTS_PATH      = os.getenv("EVENTS_PATH", "logs/events.jsonl")
+EVENTS_POLL_SEC  = float(os.getenv("EVENTS_POLL_SEC", "0.5"))
+EVENTS_QUEUE_MAX = int(os.getenv("EVENTS_QUEUE_MAX", "256"))
+EVENTS_MAX_BYTES = int(float(os.getenv("EVENTS_MAX_MB", "10")) * 1024 * 1024)   # rota a events.jsonl.1
+EVENTS_SEED_BYTES = int(os.getenv("EVENTS_SEED_KB", "256")) * 1024               # cola leída al arrancar
+
+SSE_CLIENTS   = gauge("dashboard_sse_clients", "Conexiones SSE abiertas")
+EVENTS_FANNED = counter("dashboard_events_total", "Eventos repartidos a los suscriptores", ("type",))
+EVENTS_DROPPED = counter("dashboard_events_dropped_total", "Eventos descartados por clientes lentos")
+
+# Fuente por defecto = clave del bot en el dashboard (BotIndex): "<SYMBOL>_<TF>"
+_SOURCE = bot_key(os.getenv("TRADING_SYMBOL", "BTCUSDC"), os.getenv("TRADING_TIMEFRAME", "15m"))
+GLOBAL_TYPES = ("balance",)     # eventos de la cuenta, no de un bot: llegan a todas las vistas
+
+
+def _jsonable(v):
+    if hasattr(v, "item"):          # escalares NumPy
+        return v.item()
+    if hasattr(v, "isoformat"):     # datetime / Timestamp
+        return v.isoformat()
+    return str(v)
+
+
+def publish(kind: str, path: str = None, source: str = None, **data):
+    """
+    Publica un evento. Nunca lanza: un fallo del bus no debe parar el trading.
+    `source` es la clave del bot (ver dashboard_data.journal_bot_key); por defecto la del entorno.
+    Cada evento es una sola escritura O_APPEND (<4 KB), así que no se intercalan
+    líneas de varios procesos.
+    """
+    event = {
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "type": kind,
+        "source": source or _SOURCE,
+        "data": data,
+    }
+    path = path or EVENTS_PATH
+    try:
+        line = (json.dumps(event, default=_jsonable) + "\n").encode("utf-8")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+            st = os.fstat(fd)
+        finally:
+            os.close(fd)
+        if st.st_size > EVENTS_MAX_BYTES:
+            _rotate(path, st.st_ino)
+    except Exception as e:
+        print(f"⚠️ No se pudo publicar evento {kind}: {e}")
+
+
+def _rotate(path: str, inode: int):
+    """Mueve el journal lleno a <path>.1; si otro proceso ya lo rotó (otro inode) no hace nada."""
+    try:
+        if os.stat(path).st_ino == inode:
+            os.replace(path, path + ".1")
+    except OSError:
+        pass
+
+
+class EventHub:
+    """
+    Reparte los eventos del fichero a los suscriptores (una cola por conexión SSE).
+    Guarda el último evento de cada tipo y fuente (p.ej. el último balance) para servirlo
+    al conectar o desde /balance sin tocar la API de Binance.
+    """
+
+    def __init__(self, path: str = None, poll_sec: float = None):
+        self.tail = JournalTail(path or EVENTS_PATH)
+        self.poll_sec = EVENTS_POLL_SEC if poll_sec is None else poll_sec
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._last = {}          # (type, source) → evento
+        self._thread = None
+        self._stop = threading.Event()
+
+    # ---------------- ciclo de vida ----------------
+    def start(self, from_end: bool = True):
+        """
+        Arranca el hilo lector. Con from_end=True se cargan los "últimos" de cada tipo
+        pero no se reenvía el histórico a los suscriptores.
+        """
+        if self._thread is not None:
+            return self
+        self.tail.seek_tail(EVENTS_SEED_BYTES)   # últimos valores: basta la cola reciente
+        for event in self._read():
+            self._remember(event)
+        if not from_end:
+            self.tail.reset()
+        self._thread = threading.Thread(target=self._run, name="event-hub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _read(self):
+        lines = self._drain_rotated() + self.tail.read_new()[0]
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+    def _drain_rotated(self) -> list:
+        """Si el journal se rotó desde la última lectura, lo que quedaba por leer de <path>.1."""
+        path = self.tail.path
+        try:
+            if self.tail.inode is None or os.stat(path).st_ino == self.tail.inode:
+                return []
+            if os.stat(path + ".1").st_ino != self.tail.inode:
+                return []
+        except OSError:
+            return []
+        self.tail.path = path + ".1"
+        try:
+            lines, _ = self.tail.read_new()
+        finally:
+            self.tail.path = path
+        return lines
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.tail.changed():
+                    for event in self._read():
+                        self._remember(event)
+                        self._fan_out(event)
+            except Exception as e:
+                print(f"⚠️ EventHub: {e}")
+            self._stop.wait(self.poll_sec)
+
+    # ---------------- suscriptores ----------------
+    def subscribe(self) -> queue.Queue:
+        q = queue.Queue(maxsize=EVENTS_QUEUE_MAX)
+        with self._lock:
+            self._subscribers.add(q)
+        SSE_CLIENTS.inc()
+        return q
+
+    def unsubscribe(self, q: queue.Queue):
+        with self._lock:
+            if q in self._subscribers:
+                self._subscribers.discard(q)
+                SSE_CLIENTS.dec()
+
+    def _fan_out(self, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        EVENTS_FANNED.labels(event.get("type", "unknown")).inc()
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                # cliente lento: se descarta el evento más viejo en vez de bloquear al resto
+                EVENTS_DROPPED.inc()
+                try:
+                    q.get_nowait()
+                    q.put_nowait(event)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    # ---------------- últimos valores ----------------
+    def _remember(self, event: dict):
+        key = (event.get("type"), event.get("source"))
+        with self._lock:
+            self._last[key] = event
+
+    def last(self, kind: str, source: str = None):
+        """Último evento de un tipo (de una fuente concreta o el más reciente de todas)."""
+        with self._lock:
+            if source is not None:
+                return self._last.get((kind, source))
+            events = [e for (k, _), e in self._last.items() if k == kind]
+        return max(events, key=lambda e: e.get("ts", "")) if events else None
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return list(self._last.values())
+
+
+def sse_format(event: dict) -> str:
+    """Evento en formato text/event-stream (event: <tipo> / data: <json>)."""
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event, default=_jsonable)}\n\n"
+
+
+def for_source(event: dict, source: str = None) -> bool:
+    """True si el evento va a la vista del bot `source` (None → todos los bots)."""
+    return source is None or event.get("type") in GLOBAL_TYPES or event.get("source") == source
+
+
+def sse_stream(hub: EventHub, keepalive_sec: float = 15.0, source: str = None):
+    """
+    Generador SSE para una conexión: últimos valores al conectar y luego eventos en vivo.
+    Con `source` solo se envían los eventos de ese bot (más los globales, como el balance).
+    """
+    q = hub.subscribe()
+    try:
+        yield "retry: 3000\n\n"
+        for event in hub.snapshot():
+            if for_source(event, source):
+                yield sse_format(event)
+        last_ping = time.time()
+        while True:
+            try:
+                event = q.get(timeout=1.0)
+                if for_source(event, source):
+                    yield sse_format(event)
+            except queue.Empty:
+                if time.time() - last_ping >= keepalive_sec:
+                    last_ping = time.time()
+                    yield ": keepalive\n\n"
+    finally:
+        hub.unsubscribe(q)
@@ -1,18 +1,48 @@
 # scripts/generate_fake_data.py
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+import argparse
 import os
 
-np.random.seed(42)
+import numpy as np
+import pandas as pd
+
+
+def make_ohlcv(rows: int = 200, seed: int = 42, start: str = "2024-01-01",
+               freq: str = "5min", price: float = 20000.0, vol: float = 0.004) -> pd.DataFrame:
+    """
+    OHLCV sintético y determinista (misma semilla → mismas velas), sin red.
+    Cierres por paseo aleatorio geométrico; open = cierre anterior; high/low envuelven
+    open/close con una mecha aleatoria; volumen lognormal.
+    """
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, vol, rows)))
+    open_ = np.empty(rows)
+    open_[0] = price
+    open_[1:] = close[:-1]
+    wick = np.abs(rng.normal(0, vol / 2, (2, rows)))
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=rows, freq=freq, tz="UTC"),
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + wick[0]),
+        "low": np.minimum(open_, close) * (1 - wick[1]),
+        "close": close,
+        "volume": rng.lognormal(3, 0.5, rows),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera velas OHLCV simuladas")
+    parser.add_argument("--rows", type=int, default=200)  # 🟢 Esto garantiza suficiente data para RSI y SMA
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--freq", default="5min")
+    parser.add_argument("--out", default="data/BTCUSDC.csv")
+    args = parser.parse_args()
+
+    df = make_ohlcv(args.rows, seed=args.seed, freq=args.freq)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    df.to_csv(args.out, index=False)
 
-start = datetime(2024, 1, 1)
-rows = 200  # 🟢 Esto garantiza suficiente data para RSI y SMA
-prices = [20000 + np.random.normal(0, 100) for _ in range(rows)]
-timestamps = [start + timedelta(minutes=5*i) for i in range(rows)]
+    print(f"✅ Datos simulados generados en {args.out}")
 
-df = pd.DataFrame({'timestamp': timestamps, 'close': prices})
-os.makedirs('data', exist_ok=True)
-df.to_csv('data/BTCUSDC.csv', index=False)
 
-print("✅ Datos simulados generados en data/BTCUSDC.csv")
+if __name__ == "__main__":
+    main()
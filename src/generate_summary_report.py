@@ -10,12 +10,9 @@ PERF_PATH = 'logs/performance_log.csv'
 CHART_PATH = 'results/trade_analysis.png'
 OUTPUT_PATH = 'results/summary_report.pdf'
 
-def generate_summary_report():
-    if not os.path.exists(TRADES_PATH):
-        print(f"❌ No se encontró el archivo de trades: {TRADES_PATH}")
-        return
-
-    trades = pd.read_csv(TRADES_PATH)
+def compute_report_metrics(trades_path=TRADES_PATH):
+    """Métricas del informe leyendo el CSV completo de operaciones."""
+    trades = pd.read_csv(trades_path)
     trades['timestamp'] = pd.to_datetime(trades['timestamp'], errors='coerce')
     trades.dropna(subset=['timestamp', 'price', 'action'], inplace=True)
 
@@ -42,6 +39,20 @@ def generate_summary_report():
         metrics['retorno_total'] = round(profit_ops.sum(), 2)
         metrics['porcentaje_total'] = round((profit_ops / buy_prices * 100).sum(), 2)
 
+    return metrics
+
+def generate_summary_report(metrics=None):
+    """
+    Genera el PDF. `metrics` permite pasar métricas ya calculadas de forma incremental
+    (report_scheduler); si no se pasan, se calculan leyendo trades.csv entero.
+    """
+    if not os.path.exists(TRADES_PATH):
+        print(f"❌ No se encontró el archivo de trades: {TRADES_PATH}")
+        return
+
+    if metrics is None:
+        metrics = compute_report_metrics(TRADES_PATH)
+
     # 🔁 Si existe performance_log.csv, generamos gráfico real
     if os.path.exists(PERF_PATH):
         print("📈 Generando gráfico de equity...")
@@ -8,20 +8,31 @@ import math
 import logging
 import hashlib
 from dotenv import load_dotenv
+import numpy as np
 import pandas as pd
 
 from src.binance_api import get_historical_data
+from src.candle_history import load_history, required_bars, extend_history, BackgroundFetch
 from src.strategy_selector import select_best_strategy
-from src.balance_tracker import load_balance, save_balance
-from src.strategy.rsi_sma import rsi_sma_strategy  # estrategia por defecto para hot-reload
+from src.balance_tracker import load_balance, save_balance, print_config
+from src.event_bus import publish
+from src.dashboard_data import journal_bot_key
+from src.metrics import counter, gauge, histogram, start_http_server
+from src.profiling import cycles_session
+from src.strategy.base import OHLCV
+from src.strategy.registry import REGISTRY, get_strategy
 
 # === Carga de entorno =========================================================
 load_dotenv()
 
 SYMBOL_ENV   = os.getenv("TRADING_SYMBOL", "BTCUSDC")
 TIMEFRAME    = os.getenv("TRADING_TIMEFRAME", "15m")
-BOOT_LIMIT   = int(os.getenv("BOOT_LIMIT", "400"))  # ~4 días en 15m
+# Velas de arranque: el warm-up de la estrategia activa (registro); BOOT_LIMIT > 0 fija un mínimo
+BOOT_LIMIT   = int(os.getenv("BOOT_LIMIT", "0"))
+HISTORY_KEEP = 1000   # velas extra que se conservan sobre la ventana necesaria
 USE_REAL_TR  = os.getenv("USE_REAL_TRADING", "False") == "True"
+# Versión vectorizada de la estrategia (arrays, sin DataFrame por vela) si el registro la declara
+USE_KERNEL   = os.getenv("STRATEGY_KERNEL", "False").strip().lower() in ("1", "true", "yes", "on")
 
 # Trading real o paper (ambos usan símbolo sin barra, p.ej. BTCUSDC)
 if USE_REAL_TR:
@@ -56,24 +67,26 @@ INTERVAL = mult * (60 if unit == "m" else 3600)
 SUFFIX      = f"_{TIMEFRAME}"
 TRADES_PATH = f"logs/trades{SUFFIX}.csv"
 PERF_PATH   = f"logs/performance_log{SUFFIX}.csv"
+BOT_KEY     = journal_bot_key(TRADES_PATH, SYMBOL_TRADE)   # fuente de los eventos = clave del dashboard
 ACTIVE_PATH = f"results/active_params_{to_binance_symbol(SYMBOL_CCXT)}_{TIMEFRAME}.json"
 
-# === Logging =================================================================
-os.makedirs("logs", exist_ok=True)
-logging.basicConfig(
-    filename=f"logs/live_trader{SUFFIX}.log",
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s"
-)
-
-# === Historial inicial (solo barras cerradas) =================================
-history = get_historical_data(SYMBOL_CCXT, TIMEFRAME, BOOT_LIMIT).to_dict("records")
-
-# === Estrategia inicial =======================================================
-strategy_name, strategy_func, params, _ = select_best_strategy(
-    symbol=to_binance_symbol(SYMBOL_CCXT), tf=TIMEFRAME
-)
-logging.info(f"🧐 Estrategia {strategy_name}   TF={TIMEFRAME}   params={params}")
+# === Métricas (GET /metrics en METRICS_PORT) =================================
+LOOP_SECONDS     = histogram("bot_loop_seconds", "Trabajo de una iteración del bucle (sin la espera a la vela)")
+FETCH_SECONDS    = histogram("bot_candle_fetch_seconds", "Latencia de la descarga de la última vela")
+EVAL_SECONDS     = histogram("bot_strategy_eval_seconds", "Tiempo de cálculo de la señal")
+SIGNALS_TOTAL    = counter("bot_signals_total", "Decisiones del bucle", ("action",))
+ORDERS_TOTAL     = counter("bot_orders_total", "Órdenes enviadas", ("side", "result"))
+RELOADS_TOTAL    = counter("bot_param_reloads_total", "Recargas en caliente de parámetros")
+LAST_CANDLE_TS   = gauge("bot_last_candle_timestamp_seconds", "Timestamp de la última vela cerrada recibida")
+
+# === Estado del bot (se rellena en _boot, no al importar) ======================
+history       = []     # velas cerradas
+strategy_name = None
+strategy_func = None
+strategy_spec = None   # entrada del registro de estrategias
+params        = {}
+history_bars  = 0      # ventana necesaria para strategy/params actuales
+_topup        = None   # BackgroundFetch en curso si una recarga pidió más historial
 
 # === Hot-reload guard / firmas de params =====================================
 _last_active_mtime = None
@@ -84,10 +97,36 @@ def _params_signature(name: str, p: dict) -> str:
     blob = json.dumps(core, sort_keys=True, separators=(",", ":"))
     return hashlib.md5(blob.encode()).hexdigest()
 
-try:
-    _last_active_sig = _params_signature(strategy_name, params)
-except Exception:
-    _last_active_sig = None
+def _boot():
+    """
+    Arranque del bot: logging, estrategia e historial inicial justo para su calentamiento
+    (CSV local + exchange). Vive aquí y no en el cuerpo del módulo para que importar
+    live_trader no haga red.
+    """
+    global history, history_bars, strategy_name, strategy_func, strategy_spec, params, _last_active_sig
+
+    os.makedirs("logs", exist_ok=True)
+    logging.basicConfig(
+        filename=f"logs/live_trader{SUFFIX}.log",
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s"
+    )
+
+    strategy_name, strategy_func, params, _ = select_best_strategy(
+        symbol=to_binance_symbol(SYMBOL_CCXT), tf=TIMEFRAME
+    )
+    strategy_spec = get_strategy(strategy_name)
+    logging.info(f"🧐 Estrategia {strategy_name}   TF={TIMEFRAME}   params={params}")
+
+    history_bars = max(required_bars(strategy_name, params), BOOT_LIMIT)
+    boot_df, source = load_history(SYMBOL_CCXT, TIMEFRAME, history_bars)
+    history = boot_df.to_dict("records")
+    logging.info(f"📥 Historial inicial: {len(history)}/{history_bars} velas desde {source}")
+
+    try:
+        _last_active_sig = _params_signature(strategy_name, params)
+    except Exception:
+        _last_active_sig = None
 
 LAST_PARAM_APPLY_TS = 0
 PARAM_COOLDOWN_BARS = 12  # evita cambios de params demasiado frecuentes
@@ -95,10 +134,11 @@ PARAM_COOLDOWN_BARS = 12  # evita cambios de params demasiado frecuentes
 def _maybe_reload_active_params():
     """
     Si existe ACTIVE_PATH y cambió su mtime, recarga en caliente la estrategia/params
-    respetando un cooldown de PARAM_COOLDOWN_BARS velas. Acepta parámetros extra
-    numéricos del JSON (p.ej., lookback_bars) y los preserva.
+    respetando un cooldown de PARAM_COOLDOWN_BARS velas. La estrategia puede ser cualquiera
+    del registro; los parámetros se tipan y validan con su espacio declarado.
     """
-    global strategy_name, strategy_func, params, _last_active_mtime, _last_active_sig, LAST_PARAM_APPLY_TS
+    global strategy_name, strategy_func, strategy_spec, params
+    global _last_active_mtime, _last_active_sig, LAST_PARAM_APPLY_TS
 
     try:
         if not os.path.exists(ACTIVE_PATH):
@@ -118,32 +158,21 @@ def _maybe_reload_active_params():
 
         best = blob.get("best", {})
         new_params   = best.get("params", {}) or {}
-        new_strategy = best.get("strategy", "rsi_sma") or "rsi_sma"
-
-        # por ahora solo rsi_sma en live
-        if new_strategy != "rsi_sma":
-            new_strategy = "rsi_sma"
-
-        # base obligatoria
-        applied_params = dict(
-            rsi_period=int(new_params.get("rsi_period", 14)),
-            sma_period=int(new_params.get("sma_period", 50)),
-            rsi_buy=int(new_params.get("rsi_buy", 25)),
-            rsi_sell=int(new_params.get("rsi_sell", 75)),
-        )
-        # merge de extras numéricos (p.ej. lookback_bars)
-        for k, v in new_params.items():
-            if k in applied_params:
-                continue
-            # solo pasamos valores escalares numéricos (int/float) y seguros de castear
-            try:
-                if isinstance(v, bool):
-                    continue
-                if isinstance(v, (int, float)) or (isinstance(v, str) and v.replace('.', '', 1).lstrip('-').isdigit()):
-                    iv = int(v) if str(v).isdigit() else float(v)
-                    applied_params[k] = iv
-            except Exception:
-                pass  # ignoramos lo que no sea numérico
+        new_strategy = best.get("strategy", strategy_name) or strategy_name
+
+        if new_strategy not in REGISTRY:
+            _last_active_mtime = mtime
+            logging.warning(f"⚠️ Estrategia '{new_strategy}' no registrada; se mantiene {strategy_name}")
+            return
+        new_spec = get_strategy(new_strategy)
+
+        # tipos + defaults del espacio declarado (claves desconocidas fuera)
+        applied_params = new_spec.coerce(new_params)
+        problems = new_spec.violations(applied_params)
+        if problems:
+            _last_active_mtime = mtime
+            logging.warning(f"⚠️ Parámetros inválidos para {new_strategy}: {problems}; se mantienen los actuales")
+            return
 
         new_sig = _params_signature(new_strategy, applied_params)
         if _last_active_sig is not None and new_sig == _last_active_sig:
@@ -152,20 +181,46 @@ def _maybe_reload_active_params():
 
         # Aplica
         strategy_name = new_strategy
-        strategy_func = rsi_sma_strategy
+        strategy_spec = new_spec
+        strategy_func = new_spec.batch
         params        = applied_params
         _last_active_mtime = mtime
         _last_active_sig   = new_sig
         LAST_PARAM_APPLY_TS = now
+        RELOADS_TOTAL.inc()
 
-        logging.info(f"♻️ Parámetros actualizados en caliente desde {ACTIVE_PATH}: {params}")
-        print(f"♻️ Reload params: {params}")
+        logging.info(f"♻️ Estrategia/parámetros actualizados en caliente desde {ACTIVE_PATH}: "
+                     f"{strategy_name} {params}")
+        print(f"♻️ Reload {strategy_name}: {params}")
+        _request_history(max(required_bars(strategy_name, params), BOOT_LIMIT))
 
     except Exception as e:
         logging.warning(f"⚠️ No se pudieron recargar parámetros activos: {e}")
 
 
 
+def _request_history(bars: int):
+    """Si la nueva ventana es más larga que el historial, lo completa en segundo plano."""
+    global history_bars, _topup
+    history_bars = bars
+    if len(history) >= bars or (_topup is not None and not _topup.done and _topup.bars >= bars):
+        return
+    logging.info(f"📥 Completando historial en segundo plano: {len(history)} → {bars} velas")
+    _topup = BackgroundFetch(SYMBOL_CCXT, TIMEFRAME, bars)
+
+def _apply_history_topup():
+    """Incorpora (desde el hilo del bucle) las velas antiguas descargadas por _request_history."""
+    global history, _topup
+    if _topup is None or not _topup.done:
+        return
+    fetched, _topup = _topup, None
+    if fetched.error is not None:
+        logging.warning(f"⚠️ No se pudo completar el historial: {fetched.error}")
+        return
+    before = len(history)
+    history = extend_history(history, fetched.result)
+    logging.info(f"📥 Historial completado desde {fetched.source}: {before} → {len(history)} velas")
+
 # === Persistencia incremental de datos =======================================
 def _save_to_csv(row: dict, filename: str = f"data/{to_binance_symbol(SYMBOL_CCXT)}_{TIMEFRAME}.csv"):
     os.makedirs("data", exist_ok=True)
@@ -179,31 +234,64 @@ def _fetch_historical_prices(in_position: bool) -> pd.DataFrame:
     Trae la última barra cerrada y la añade a 'history' solo si es nueva.
     Luego aplica la estrategia con los 'params' activos.
     """
-    last_df = get_historical_data(SYMBOL_CCXT, TIMEFRAME, 2)
+    with FETCH_SECONDS.time():
+        last_df = get_historical_data(SYMBOL_CCXT, TIMEFRAME, 2)
     last = last_df.iloc[-1].to_dict()
+    _apply_history_topup()
+    LAST_CANDLE_TS.set(pd.Timestamp(last["timestamp"]).timestamp())
 
     if not history or last["timestamp"] != history[-1]["timestamp"]:
         history.append(last)
         _save_to_csv(last)
+        publish("candle", source=BOT_KEY, symbol=SYMBOL_TRADE, timeframe=TIMEFRAME,
+                **{k: last.get(k) for k in ("timestamp", "open", "high", "low", "close", "volume")})
         # recorta para no crecer sin límite
-        if len(history) > BOOT_LIMIT + 1000:
-            del history[: len(history) - (BOOT_LIMIT + 1000)]
+        keep = history_bars + HISTORY_KEEP
+        if len(history) > keep:
+            del history[: len(history) - keep]
+
+    with EVAL_SECONDS.time():
+        if USE_KERNEL and strategy_spec.vectorized is not None:
+            return _last_signal_kernel(in_position)
+
+        df = pd.DataFrame(history)
+        # pasar estado de posición para reglas dependientes (stop_bar, etc.)
+        return strategy_spec.apply(df, params, in_position=in_position)
 
-    df = pd.DataFrame(history)
-    # pasar estado de posición para reglas dependientes (stop_bar, etc.)
-    return strategy_func(df, in_position=in_position, **params)
+def _last_signal_kernel(in_position: bool) -> pd.DataFrame:
+    """
+    Variante vectorizada: calcula la señal sobre arrays y devuelve solo la última
+    vela (mismas columnas que usa el bucle para decidir y loguear).
+    """
+    n = len(history)
+    cols = {c: np.fromiter((r[c] for r in history), dtype=np.float64, count=n)
+            for c in ("open", "high", "low", "close", "volume")}
+    data = OHLCV(**cols)
+    result = strategy_spec.apply_arrays(data, params, in_position=in_position,
+                                        indicators=strategy_spec.indicators)
+    signal = int(result.position[-1])
+    row = {"timestamp": history[-1]["timestamp"], "close": float(data.close[-1]),
+           "position": signal, "signal_raw": signal}
+    for k, v in result.indicators.items():
+        row[k] = v[-1].item() if hasattr(v[-1], "item") else v[-1]
+    return pd.DataFrame([row])
 
 # === Bucle principal ==========================================================
 def run_bot():
     print(f"🔄 Iniciando bot ({'REAL' if USE_REAL_TR else 'PAPER'}) para {SYMBOL_TRADE} @ {TIMEFRAME}")
+    print_config()
+    _boot()
+    start_http_server()
     balance = load_balance()
     print(f"📊 Balance inicial: {balance}")
     save_balance(balance)
 
     position = 0  # 0=flat, 1=long
+    prof = cycles_session(f"live_trader{SUFFIX}")   # --profile / PROFILE=1: primeras PROFILE_CYCLES velas
 
     while True:
         start_time = time.time()
+        prof.begin()
 
         # 1) Hot-reload de parámetros si cambiaron
         _maybe_reload_active_params()
@@ -212,6 +300,7 @@ def run_bot():
         df = _fetch_historical_prices(in_position=(position == 1))
         if df.empty or "position" not in df.columns:
             logging.warning("⚠️ Datos insuficientes para generar señal")
+            prof.end()
             time.sleep(INTERVAL)
             continue
 
@@ -237,18 +326,28 @@ def run_bot():
             f"EMA200={0 if math.isnan(ema_v) else ema_v:.2f} | "
             f"Action={action} "
         )
+        SIGNALS_TOTAL.labels(action).inc()
+        publish("signal", source=BOT_KEY, symbol=SYMBOL_TRADE, timeframe=TIMEFRAME, action=action, raw=raw,
+                close=float(last.close), strategy=strategy_name,
+                rsi=None if math.isnan(rsi_v) else float(rsi_v),
+                sma=None if math.isnan(sma_v) else float(sma_v),
+                ema200=None if math.isnan(ema_v) else float(ema_v))
 
         # 3) Ejecuta trade si corresponde
         if action == "BUY":
-            buy(SYMBOL_TRADE, float(last.close), strategy_name, params, TRADES_PATH, PERF_PATH)
+            order = buy(SYMBOL_TRADE, float(last.close), strategy_name, params, TRADES_PATH, PERF_PATH)
+            ORDERS_TOTAL.labels("BUY", "ok" if order else "failed").inc()
             position = 1
 
         elif action == "SELL":
-            sell(SYMBOL_TRADE, float(last.close), strategy_name, params, TRADES_PATH, PERF_PATH)
+            order = sell(SYMBOL_TRADE, float(last.close), strategy_name, params, TRADES_PATH, PERF_PATH)
+            ORDERS_TOTAL.labels("SELL", "ok" if order else "failed").inc()
             position = 0
 
         # 4) Sincronización precisa con el reloj de vela
+        prof.end()
         elapsed = time.time() - start_time
+        LOOP_SECONDS.observe(elapsed)
         time.sleep(max(0, INTERVAL - elapsed))
 
 
@@ -6,13 +6,14 @@ from datetime import datetime, timezone
 from src.binance_api import get_historical_data
 from src.paper_trading_5m import buy, sell
 from src.strategy_selector import select_best_strategy
+from src.candle_history import load_history, required_bars
 from src.utils import log_operation
 
 load_dotenv()
 
 SYMBOL     = "BTCUSDC"          # ← cambia aquí si quieres otro símbolo
 TIMEFRAME  = "5m"              # ← cambia aquí si quieres otro TF
-BOOT_LIMIT = 400                # ≈4 días de velas para este TF
+BOOT_LIMIT = 0                  # mínimo de velas de arranque (0 → solo el warm-up de la estrategia)
 
 # -------- intervalo dinámico ------------------------------------------
 unit   = TIMEFRAME[-1].lower()
@@ -25,16 +26,26 @@ SUFFIX = "_5m"
 TRADES_PATH = f"logs/trades{SUFFIX}.csv"
 PERF_PATH   = f"logs/performance_log{SUFFIX}.csv"
 
-# historial inicial
-history = get_historical_data(SYMBOL, TIMEFRAME, BOOT_LIMIT).to_dict("records")
+# estado del bot (se rellena en _boot, no al importar)
+history = []
+strategy_name, strategy_func, params = None, None, {}
 
-strategy_name, strategy_func, params, _ = select_best_strategy(tf=TIMEFRAME)
+def _boot():
+    """Estrategia + historial justo para su calentamiento + logging; fuera del import para no hacer red al cargar."""
+    global history, strategy_name, strategy_func, params
+    strategy_name, strategy_func, params, _ = select_best_strategy(tf=TIMEFRAME)
 
-logging.basicConfig(
-    filename="logs/live_trader_5m.log",
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s")
-logging.info(f"🧐 Estrategia {strategy_name}   TF={TIMEFRAME}   params={params}")
+    bars = max(required_bars(strategy_name, params), BOOT_LIMIT)
+    boot_df, source = load_history(SYMBOL, TIMEFRAME, bars)
+    history = boot_df.to_dict("records")
+
+    os.makedirs("logs", exist_ok=True)
+    logging.basicConfig(
+        filename="logs/live_trader_5m.log",
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s")
+    logging.info(f"🧐 Estrategia {strategy_name}   TF={TIMEFRAME}   params={params}")
+    logging.info(f"📥 Historial inicial: {len(history)}/{bars} velas desde {source}")
 
 def save_to_csv(row, filename=f"data/{SYMBOL}_{TIMEFRAME}.csv"):
     os.makedirs("data", exist_ok=True)
@@ -51,6 +62,7 @@ def fetch_historical_prices():
     return strategy_func(df, **params)
 
 def run_bot():
+    _boot()
     position = 0
     while True:
         start_time = time.time()
@@ -0,0 +1,346 @@
+# src/metrics.py
+# -*- coding: utf-8 -*-
+"""
+Métricas en proceso con exposición en formato texto de Prometheus.
+
+    from src.metrics import counter, histogram, start_http_server
+
+    LOOP = histogram("bot_loop_seconds", "Duración de una iteración del bucle")
+    ORDERS = counter("bot_orders_total", "Órdenes enviadas", ("side", "result"))
+
+    with LOOP.time():
+        ...
+    ORDERS.labels(side="BUY", result="ok").inc()
+
+Cada proceso largo (live_trader, reoptimizer, report_scheduler) sirve GET /metrics en
+127.0.0.1:METRICS_PORT (0 = sin servidor); el dashboard lo expone en su propia ruta /metrics.
+Actualizar una métrica es un lock + una suma en memoria: sin E/S en el camino caliente.
+"""
+
+import os
+import time
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# segundos: de llamadas de API (ms) a optimizaciones completas (minutos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _fmt(v: float) -> str:
+    v = float(v)
+    if v == float("inf"):
+        return "+Inf"
+    return str(int(v)) if v.is_integer() and abs(v) < 1e15 else repr(v)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _label_str(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Timer:
+    """Context manager que observa la duración del bloque en un histograma."""
+
+    __slots__ = ("_hist", "_t0")
+
+    def __init__(self, hist):
+        self._hist = hist
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._hist.observe(time.perf_counter() - self._t0)
+        return False
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames=()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kw):
+        """Serie hija para unos valores de etiqueta (se crea la primera vez)."""
+        key = values if values else tuple(str(kw[n]) for n in self.labelnames)
+        key = tuple(str(v) for v in key)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        return self._children[()]
+
+    def collect(self) -> list:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(child.samples(self.name, self.labelnames, key))
+        return lines
+
+
+# ---------------- Counter ----------------
+class _CounterChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def samples(self, name, names, key):
+        return [f"{name}{_label_str(names, key)} {_fmt(self._value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    @property
+    def value(self) -> float:
+        return self._default().value
+
+
+# ---------------- Gauge ----------------
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self._value = float(value)
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+
+    @property
+    def value(self) -> float:
+        return self._default().value
+
+
+# ---------------- Histogram ----------------
+class _HistogramChild:
+    __slots__ = ("_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, bounds):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)     # último = +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def samples(self, name, names, key):
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        out, acc = [], 0
+        for bound, c in zip(list(self._bounds) + [float("inf")], counts):
+            acc += c
+            le = 'le="%s"' % _fmt(bound)
+            out.append(f"{name}_bucket{_label_str(names, key, le)} {acc}")
+        out.append(f"{name}_sum{_label_str(names, key)} {_fmt(total)}")
+        out.append(f"{name}_count{_label_str(names, key)} {acc}")
+        return out
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self._bounds = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, doc, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self._bounds)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self) -> _Timer:
+        return _Timer(self._default())
+
+    @property
+    def count(self) -> int:
+        return self._default().count
+
+
+# ---------------- Registro ----------------
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def get_or_create(self, cls, name, doc, labelnames=(), **kwargs):
+        """Misma métrica si otro módulo ya la registró (p.ej. al recargar)."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, doc, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Métrica {name} ya registrada con otro tipo/etiquetas")
+            return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for m in sorted(metrics, key=lambda m: m.name):
+            lines.extend(m.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, doc: str, labelnames=()) -> Counter:
+    return REGISTRY.get_or_create(Counter, name, doc, labelnames)
+
+
+def gauge(name: str, doc: str, labelnames=()) -> Gauge:
+    return REGISTRY.get_or_create(Gauge, name, doc, labelnames)
+
+
+def histogram(name: str, doc: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.get_or_create(Histogram, name, doc, labelnames, buckets=buckets)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# ---------------- Llamadas a APIs externas ----------------
+API_CALLS = counter("exchange_api_calls_total", "Llamadas a la API del exchange", ("endpoint",))
+API_ERRORS = counter("exchange_api_errors_total", "Llamadas a la API del exchange con excepción", ("endpoint",))
+API_LATENCY = histogram("exchange_api_seconds", "Latencia de las llamadas a la API del exchange", ("endpoint",))
+
+
+class track_api:
+    """
+    with track_api("fetch_ohlcv"):
+        exchange.fetch_ohlcv(...)
+    Cuenta la llamada, su latencia y si terminó en excepción (que se propaga).
+    """
+
+    __slots__ = ("endpoint", "_t0")
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+
+    def __enter__(self):
+        API_CALLS.labels(self.endpoint).inc()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        API_LATENCY.labels(self.endpoint).observe(time.perf_counter() - self._t0)
+        if exc_type is not None:
+            API_ERRORS.labels(self.endpoint).inc()
+        return False
+
+
+# ---------------- Servidor HTTP ----------------
+PROCESS_START = gauge("process_start_time_seconds", "Inicio del proceso (epoch)")
+PROCESS_START.set(time.time())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):      # sin una línea en stderr por cada scrape
+        pass
+
+
+_server = None
+
+
+def start_http_server(port: int = None, host: str = None):
+    """
+    Sirve /metrics en un hilo daemon. Sin puerto (METRICS_PORT=0) no hace nada.
+    Nunca lanza: si el puerto está ocupado se avisa y el proceso sigue.
+    """
+    global _server
+    port = METRICS_PORT if port is None else port
+    if not port or _server is not None:
+        return _server
+    try:
+        _server = ThreadingHTTPServer((host or METRICS_HOST, port), _Handler)
+    except OSError as e:
+        print(f"⚠️ No se pudo abrir el endpoint de métricas en :{port}: {e}")
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"📈 Métricas en http://{host or METRICS_HOST}:{port}/metrics")
+    return _server
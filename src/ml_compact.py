@@ -0,0 +1,145 @@
+# src/ml_compact.py
+# -*- coding: utf-8 -*-
+"""
+Formato compacto del RandomForest para inferencia en vivo (sin sklearn ni pickle).
+
+Todos los árboles se aplanan en arrays NumPy contiguos de nodos:
+    feature   int16   (n_nodes,)      feature que evalúa el nodo
+    threshold float64 (n_nodes,)      umbral YA en unidades originales (scaler plegado:
+                                      (x - mean) / scale <= t  ⇔  x <= t·scale + mean)
+    children  int32   (2, n_nodes)    hijo izquierdo / derecho; en las hojas apuntan a sí mismas
+    value     float64 (n_nodes, C)    probabilidades de clase de cada hoja
+    roots     int32   (n_trees,)      nodo raíz de cada árbol
+más meta.json (clases, features, profundidad). Se guardan como .npy en un directorio y se
+abren con mmap: cargar el modelo es abrir 5 ficheros, no deserializar un bosque.
+
+El predictor recorre todos los árboles a la vez: `max_depth` pasos vectorizados sobre
+una matriz (filas × árboles) de índices de nodo.
+"""
+
+import os
+import json
+import numpy as np
+
+FORMAT_VERSION = 1
+_ARRAYS = ("feature", "threshold", "children", "value", "roots")
+
+
+class CompactForest:
+    def __init__(self, feature, threshold, children, value, roots, classes, feature_names, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = children[0]
+        self.right = children[1]
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = np.asarray(classes)
+        self.feature_names = list(feature_names)
+        self.max_depth = int(max_depth)
+
+    # ---------------- exportación ----------------
+    @classmethod
+    def from_sklearn(cls, model, scaler=None, feature_names=None) -> "CompactForest":
+        """Aplana un RandomForestClassifier (y pliega un StandardScaler ajustado, si se da)."""
+        n_features = model.n_features_in_
+        mean = np.zeros(n_features) if scaler is None else np.asarray(scaler.mean_, dtype=np.float64)
+        scale = np.ones(n_features) if scaler is None else np.asarray(scaler.scale_, dtype=np.float64)
+
+        feats, thrs, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for est in model.estimators_:
+            t = est.tree_
+            n = t.node_count
+            leaf = t.children_left == -1
+            idx = np.arange(n, dtype=np.int32) + offset
+
+            f = np.where(leaf, 0, t.feature).astype(np.int16)
+            thr = np.where(leaf, 0.0, t.threshold * scale[f] + mean[f])
+            lefts.append(np.where(leaf, idx, t.children_left + offset).astype(np.int32))
+            rights.append(np.where(leaf, idx, t.children_right + offset).astype(np.int32))
+
+            v = t.value[:, 0, :].astype(np.float64)
+            v = v / np.maximum(v.sum(axis=1, keepdims=True), 1e-300)
+            feats.append(f)
+            thrs.append(thr)
+            values.append(v)
+            roots.append(offset)
+            depth = max(depth, t.max_depth)
+            offset += n
+
+        return cls(
+            feature=np.concatenate(feats),
+            threshold=np.concatenate(thrs),
+            children=np.vstack([np.concatenate(lefts), np.concatenate(rights)]),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=model.classes_,
+            feature_names=feature_names if feature_names is not None else [f"f{i}" for i in range(n_features)],
+            max_depth=depth,
+        )
+
+    def save(self, path: str) -> str:
+        """Escribe el directorio `path` (arrays .npy + meta.json) de forma atómica por fichero."""
+        os.makedirs(path, exist_ok=True)
+        for name in _ARRAYS:
+            tmp = os.path.join(path, f"{name}.tmp.npy")
+            np.save(tmp, np.ascontiguousarray(getattr(self, name)))
+            os.replace(tmp, os.path.join(path, f"{name}.npy"))
+        meta = {
+            "format": FORMAT_VERSION,
+            "classes": self.classes_.tolist(),
+            "feature_names": self.feature_names,
+            "max_depth": self.max_depth,
+            "n_trees": int(len(self.roots)),
+            "n_nodes": int(len(self.feature)),
+        }
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CompactForest":
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Formato de modelo compacto no soportado: {meta.get('format')}")
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+                  for name in _ARRAYS}
+        return cls(classes=meta["classes"], feature_names=meta["feature_names"],
+                   max_depth=meta["max_depth"], **arrays)
+
+    # ---------------- inferencia ----------------
+    def leaves(self, X) -> np.ndarray:
+        """
+        Índice de hoja de cada árbol para cada fila: (n_filas, n_árboles).
+        Ambos caminos usan `x <= umbral` → izquierda; NaN no tiene rama definida en el
+        formato compacto, así que se rechaza (rellenar antes, como el fillna(0) de ml_strategy).
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if np.isnan(X).any():
+            raise ValueError("❌ CompactForest no admite NaN en las features (rellenar antes de predecir)")
+        if X.shape[0] == 1:
+            # una fila (vivo): índices 1-D, un gather por paso (children[0|1, nodo])
+            x = X[0]
+            node = np.asarray(self.roots, dtype=np.intp)
+            for _ in range(self.max_depth):
+                go_right = ~(x[self.feature[node]] <= self.threshold[node])
+                node = self.children[go_right.view(np.int8), node]
+            return node[None, :]
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Media de las probabilidades de hoja (igual que RandomForestClassifier.predict_proba)."""
+        return self.value[self.leaves(X)].mean(axis=1, dtype=np.float64)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
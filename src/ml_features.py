@@ -0,0 +1,202 @@
+# src/ml_features.py
+# -*- coding: utf-8 -*-
+"""
+Features del modelo ML calculadas en streaming (una vela → un vector de 21 features).
+
+MLTradingStrategy.create_features recalcula todas las columnas sobre el DataFrame completo;
+en vivo solo importa la última vela. StreamingFeatures guarda el estado mínimo
+(ventanas de hasta 50 cierres, sumas de EMA con adjust=True, etc.) y produce el mismo
+vector que la fila correspondiente de create_features, en el orden de FEATURE_NAMES.
+
+    python -m src.ml_features     # comprobación de paridad streaming vs batch
+"""
+
+import math
+from collections import deque
+import numpy as np
+
+SMA_PERIODS = (5, 10, 20, 50)
+
+FEATURE_NAMES = [
+    'returns', 'returns_2', 'returns_5', 'macd', 'macd_signal', 'macd_hist',
+    'rsi', 'bb_position', 'volatility', 'atr', 'volume_ratio',
+    'high_low_ratio', 'close_open_ratio', 'momentum_5', 'momentum_10',
+    'roc_5', 'roc_10',
+] + [f'price_sma_{p}_ratio' for p in SMA_PERIODS]
+
+NAN = float("nan")
+
+
+class _Ewm:
+    """ewm(span).mean() de pandas con adjust=True: media ponderada num/den acumulada."""
+
+    __slots__ = ("decay", "num", "den")
+
+    def __init__(self, span: int):
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.num = 0.0
+        self.den = 0.0
+
+    def update(self, x: float) -> float:
+        self.num = x + self.decay * self.num
+        self.den = 1.0 + self.decay * self.den
+        return self.num / self.den
+
+
+def _window_mean(buf: deque, n: int) -> float:
+    """rolling(n).mean(): NaN hasta tener n valores o si alguno es NaN."""
+    if len(buf) < n:
+        return NAN
+    return math.fsum(buf) / n if n == len(buf) else math.fsum(list(buf)[-n:]) / n
+
+
+def _window_std(buf: deque, n: int) -> float:
+    """rolling(n).std() (ddof=1)."""
+    if len(buf) < n:
+        return NAN
+    return float(np.std(np.fromiter(buf, dtype=np.float64, count=len(buf))[-n:], ddof=1))
+
+
+def _div(a: float, b: float) -> float:
+    """a / b con la semántica de pandas (x/0 → ±inf, 0/0 → NaN)."""
+    try:
+        return a / b
+    except ZeroDivisionError:
+        return NAN if a == 0 or a != a else math.copysign(math.inf, a)
+
+
+class StreamingFeatures:
+    """Estado incremental de las 21 features de MLTradingStrategy."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.last_timestamp = None
+        self.last = None                                 # último vector calculado
+        self._close = deque(maxlen=max(SMA_PERIODS) + 1)  # cierres (SMA50 + desplazamientos ≤10)
+        self._ret = deque(maxlen=20)                     # returns para la volatilidad
+        self._gain = deque(maxlen=14)
+        self._loss = deque(maxlen=14)
+        self._tr = deque(maxlen=14)
+        self._volume = deque(maxlen=20)
+        self._ema12 = _Ewm(12)
+        self._ema26 = _Ewm(26)
+        self._signal = _Ewm(9)
+
+    def _shift(self, k: int) -> float:
+        """close.shift(k) respecto a la vela ya añadida."""
+        return self._close[-1 - k] if len(self._close) > k else NAN
+
+    def update(self, open_, high, low, close, volume, timestamp=None) -> np.ndarray:
+        """Añade una vela cerrada y devuelve su vector de features (NaN donde aún no hay datos)."""
+        prev = self._close[-1] if self._close else NAN
+        self._close.append(close)
+        self._volume.append(volume)
+        self.count += 1
+
+        c1, c2, c5, c10 = self._shift(1), self._shift(2), self._shift(5), self._shift(10)
+        returns = _div(close, c1) - 1
+
+        # MACD (EMAs desde la primera vela)
+        macd = self._ema12.update(close) - self._ema26.update(close)
+        macd_signal = self._signal.update(macd)
+
+        # RSI: delta NaN de la 1ª vela cuenta como 0 en ganancias/pérdidas (delta.where(...))
+        delta = close - prev
+        self._gain.append(delta if delta > 0 else 0.0)
+        self._loss.append(-delta if delta < 0 else 0.0)
+        gain, loss = _window_mean(self._gain, 14), _window_mean(self._loss, 14)
+        rsi = 100 - _div(100, 1 + _div(gain, loss))
+
+        # Bollinger (20, 2σ)
+        bb_mid, bb_std = _window_mean(self._close, 20), _window_std(self._close, 20)
+        bb_upper, bb_lower = bb_mid + bb_std * 2, bb_mid - bb_std * 2
+        bb_position = _div(close - bb_lower, bb_upper - bb_lower)
+
+        # Volatilidad y ATR
+        self._ret.append(returns)
+        volatility = _window_std(self._ret, 20)
+        tr = max(high - low, abs(high - prev), abs(low - prev)) if prev == prev else NAN
+        self._tr.append(tr)
+        atr = _window_mean(self._tr, 14)
+
+        row = [
+            returns, _div(close, c2) - 1, _div(close, c5) - 1,
+            macd, macd_signal, macd - macd_signal,
+            rsi, bb_position, volatility, atr,
+            _div(volume, _window_mean(self._volume, 20)),
+            _div(high, low), _div(close, open_),
+            _div(close, c5), _div(close, c10),
+            _div(close - c5, c5) * 100, _div(close - c10, c10) * 100,
+        ]
+        row.extend(_div(close, _window_mean(self._close, p)) for p in SMA_PERIODS)
+
+        self.last_timestamp = timestamp
+        self.last = np.array(row, dtype=np.float64)
+        return self.last
+
+    def update_frame(self, df) -> np.ndarray:
+        """Alimenta todas las filas de df (open/high/low/close/volume[/timestamp]); devuelve la última."""
+        cols = [df[c].to_numpy(dtype=np.float64) for c in ("open", "high", "low", "close", "volume")]
+        stamps = df["timestamp"].to_numpy() if "timestamp" in df.columns else df.index.to_numpy()
+        for i in range(len(df)):
+            self.update(cols[0][i], cols[1][i], cols[2][i], cols[3][i], cols[4][i], stamps[i])
+        return self.last
+
+    @classmethod
+    def from_frame(cls, df) -> "StreamingFeatures":
+        state = cls()
+        state.update_frame(df)
+        return state
+
+
+def check_parity(df, rtol: float = 1e-7, atol: float = 1e-9) -> dict:
+    """
+    Compara StreamingFeatures fila a fila con create_features (batch).
+    Devuelve {'rows', 'max_abs_diff', 'mismatches': [(fila, feature, batch, stream), ...]}.
+    """
+    from src.ml_strategy import MLTradingStrategy
+
+    batch = MLTradingStrategy().create_features(df)[FEATURE_NAMES].to_numpy(dtype=np.float64)
+    state = StreamingFeatures()
+    stream = np.empty_like(batch)
+    cols = [df[c].to_numpy(dtype=np.float64) for c in ("open", "high", "low", "close", "volume")]
+    for i in range(len(df)):
+        stream[i] = state.update(cols[0][i], cols[1][i], cols[2][i], cols[3][i], cols[4][i])
+
+    same = np.isclose(batch, stream, rtol=rtol, atol=atol, equal_nan=True)
+    diff = np.abs(batch - stream)
+    finite = np.isfinite(diff)
+    rows, feats = np.nonzero(~same)
+    return {
+        "rows": len(df),
+        "max_abs_diff": float(diff[finite].max()) if finite.any() else 0.0,
+        "mismatches": [(int(r), FEATURE_NAMES[f], float(batch[r, f]), float(stream[r, f]))
+                       for r, f in zip(rows[:20], feats[:20])],
+    }
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    rng = np.random.default_rng(7)
+    n = 3000
+    close = 20000 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=n, freq="5min", tz="UTC"),
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.002, n))),
+        "low": np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.002, n))),
+        "close": close,
+        "volume": rng.lognormal(3, 0.5, n),
+    })
+    report = check_parity(df)
+    ok = not report["mismatches"]
+    print(f"{'✅' if ok else '❌'} Paridad streaming vs batch: {report['rows']} velas × {len(FEATURE_NAMES)} features, "
+          f"máx |Δ| = {report['max_abs_diff']:.3g}")
+    for m in report["mismatches"]:
+        print("   ", m)
+    raise SystemExit(0 if ok else 1)
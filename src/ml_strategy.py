@@ -1,18 +1,22 @@
 # src/ml_strategy.py
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import TimeSeriesSplit
-from sklearn.metrics import classification_report, accuracy_score
-from sklearn.preprocessing import StandardScaler
-import joblib
 import os
 
+from src.ml_features import FEATURE_NAMES, StreamingFeatures
+from src.ml_compact import CompactForest
+
+CONFIDENCE_THRESHOLD = 0.6
+
 class MLTradingStrategy:
     def __init__(self):
+        # sklearn/joblib se importan solo al entrenar o abrir el .pkl: el camino compacto
+        # (load_compact + predict_last) no los carga
         self.model = None
-        self.scaler = StandardScaler()
+        self.scaler = None       # StandardScaler, creado en train_model o leído en load_model
         self.feature_names = []
+        self._stream = None      # estado incremental de features para predict_last
+        self.compact = None      # CompactForest (scaler plegado) para inferencia en vivo
         
     def create_features(self, df):
         """
@@ -108,18 +112,8 @@ class MLTradingStrategy:
         df = self.create_features(df)
         df = self.create_labels(df)
         
-        # Seleccionar características
-        feature_cols = [
-            'returns', 'returns_2', 'returns_5', 'macd', 'macd_signal', 'macd_hist',
-            'rsi', 'bb_position', 'volatility', 'atr', 'volume_ratio',
-            'high_low_ratio', 'close_open_ratio', 'momentum_5', 'momentum_10',
-            'roc_5', 'roc_10'
-        ]
-        
-        # Añadir ratios de SMA
-        for period in [5, 10, 20, 50]:
-            feature_cols.append(f'price_sma_{period}_ratio')
-        
+        # Seleccionar características (mismo orden que StreamingFeatures)
+        feature_cols = list(FEATURE_NAMES)
         self.feature_names = feature_cols
         
         # Limpiar datos
@@ -134,6 +128,10 @@ class MLTradingStrategy:
         """
         Entrenar modelo con validación temporal
         """
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.metrics import classification_report, accuracy_score
+        from sklearn.preprocessing import StandardScaler
+
         X, y, df_clean = self.prepare_data(df)
         
         # División temporal (importante para series de tiempo)
@@ -145,6 +143,7 @@ class MLTradingStrategy:
         print(f"📊 Datos de prueba: {len(X_test)} muestras")
         
         # Escalar características
+        self.scaler = StandardScaler()
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
         
@@ -159,6 +158,7 @@ class MLTradingStrategy:
         )
         
         self.model.fit(X_train_scaled, y_train)
+        self.compact = None
         
         # Evaluar modelo
         y_pred = self.model.predict(X_test_scaled)
@@ -179,6 +179,17 @@ class MLTradingStrategy:
         
         return accuracy, feature_importance
     
+    def train_walk_forward(self, df, n_splits=5, n_jobs=None):
+        """
+        Entrenamiento walk-forward en paralelo (ver src/ml_training.py); deja cargado
+        el modelo del fold más reciente.
+        """
+        from src.ml_training import walk_forward_train
+
+        summary = walk_forward_train(df, n_splits=n_splits, n_jobs=n_jobs)
+        self.load_model(summary['latest_model'])
+        return summary
+
     def predict_signals(self, df):
         """
         Generar señales de trading usando el modelo entrenado
@@ -209,13 +220,64 @@ class MLTradingStrategy:
         df.loc[df['ml_signal'] == -1, 'position'] = -1  # Sell
         
         # Usar solo señales con alta confianza
-        confidence_threshold = 0.6
-        df.loc[df['ml_confidence'] < confidence_threshold, 'position'] = 0
+        df.loc[df['ml_confidence'] < CONFIDENCE_THRESHOLD, 'position'] = 0
         
         return df
+
+    def _last_features(self, df):
+        """
+        Vector de features de la última vela de df. Si el estado streaming ya vio la
+        vela anterior solo se procesa la nueva; si no (arranque, hueco), se recalienta con df.
+        """
+        stamps = df['timestamp'] if 'timestamp' in df.columns else df.index.to_series()
+        last_ts = stamps.iloc[-1]
+        prev_ts = stamps.iloc[-2] if len(df) > 1 else None
+        s = self._stream
+        if s is not None and s.last_timestamp is not None:
+            if s.last_timestamp == last_ts:
+                return s.last
+            if prev_ts is not None and s.last_timestamp == prev_ts:
+                r = df.iloc[-1]
+                return s.update(r['open'], r['high'], r['low'], r['close'], r['volume'], last_ts)
+        self._stream = StreamingFeatures()
+        return self._stream.update_frame(df)
+
+    def predict_last(self, df):
+        """
+        Señal solo para la última vela (uso en vivo): features incrementales + una fila
+        al modelo. Mismo resultado que la última fila de predict_signals(df).
+        Devuelve {'timestamp', 'ml_signal', 'ml_confidence', 'position'}.
+        """
+        if self.model is None and self.compact is None:
+            raise ValueError("Modelo no entrenado. Usar train_model() primero.")
+        if list(self.feature_names) != FEATURE_NAMES:
+            raise ValueError("predict_last requiere las features estándar (FEATURE_NAMES)")
+
+        x = self._last_features(df)
+        x = np.where(np.isnan(x), 0.0, x)                        # fillna(0) como en batch
+
+        if self.compact is not None:
+            proba = self.compact.predict_proba(x)[0]             # umbrales ya en unidades originales
+            classes = self.compact.classes_
+        else:
+            x_scaled = ((x - self.scaler.mean_) / self.scaler.scale_).reshape(1, -1)
+            proba = self.model.predict_proba(x_scaled)[0]
+            classes = self.model.classes_
+        best = int(np.argmax(proba))
+        signal = int(classes[best])
+        confidence = float(proba[best])
+        position = signal if signal in (1, -1) and confidence >= CONFIDENCE_THRESHOLD else 0
+        return {
+            'timestamp': df['timestamp'].iloc[-1] if 'timestamp' in df.columns else df.index[-1],
+            'ml_signal': signal,
+            'ml_confidence': confidence,
+            'position': position,
+        }
     
     def save_model(self, filepath='models/ml_trading_model.pkl'):
         """Guardar modelo entrenado"""
+        import joblib
+
         os.makedirs('models', exist_ok=True)
         model_data = {
             'model': self.model,
@@ -228,16 +290,37 @@ class MLTradingStrategy:
     def load_model(self, filepath='models/ml_trading_model.pkl'):
         """Cargar modelo entrenado"""
         if os.path.exists(filepath):
+            import joblib
             model_data = joblib.load(filepath)
             self.model = model_data['model']
             self.scaler = model_data['scaler'] 
             self.feature_names = model_data['feature_names']
+            self.compact = None
             print(f"📂 Modelo cargado desde {filepath}")
             return True
         else:
             print(f"❌ No se encontró modelo en {filepath}")
             return False
 
+    def export_compact(self, path='models/ml_trading_model.compact'):
+        """Exportar el modelo entrenado al formato compacto (ver src/ml_compact.py)"""
+        if self.model is None:
+            raise ValueError("Modelo no entrenado. Usar train_model() primero.")
+        self.compact = CompactForest.from_sklearn(self.model, self.scaler, self.feature_names)
+        self.compact.save(path)
+        print(f"💾 Modelo compacto guardado en {path}")
+        return path
+
+    def load_compact(self, path='models/ml_trading_model.compact'):
+        """Cargar el modelo compacto (mmap, sin sklearn ni pickle) para predict_last"""
+        if not os.path.exists(os.path.join(path, 'meta.json')):
+            print(f"❌ No se encontró modelo compacto en {path}")
+            return False
+        self.compact = CompactForest.load(path)
+        self.feature_names = self.compact.feature_names
+        print(f"📂 Modelo compacto cargado desde {path}")
+        return True
+
 def ml_strategy_backtest():
     """
     Función para probar la estrategia ML
@@ -277,6 +360,7 @@ def ml_strategy_backtest():
     
     # Guardar modelo
     ml_strategy.save_model()
+    ml_strategy.export_compact()
     
     # Guardar resultados
     os.makedirs('results', exist_ok=True)
@@ -0,0 +1,202 @@
+# src/ml_training.py
+# -*- coding: utf-8 -*-
+"""
+Entrenamiento walk-forward del modelo ML.
+
+  1) build_dataset: features + etiquetas de MLTradingStrategy calculadas UNA vez y guardadas
+     como .npy float32 (X) / int8 (y) en ML_CACHE_DIR, con clave = hash de los datos y de
+     los parámetros de etiquetado. Reentrenar sobre los mismos datos no recalcula nada.
+  2) walk_forward_train: folds TimeSeriesSplit (con gap = forward_periods entre train y
+     test, para que ninguna etiqueta de train mire precios del test) entrenados en paralelo
+     (joblib, un proceso por fold). Cada worker abre la matriz con mmap: no se copia ni se serializa X.
+  3) Por fold se guardan modelo (scaler + RandomForest) y métricas en
+     models/walk_forward/<clave>/fold_<k>.joblib + metrics.json.
+
+    python -m src.ml_training --symbol BTC/USDT --timeframe 5m --limit 200000 --splits 5
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+import joblib
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.preprocessing import StandardScaler
+
+from src.ml_features import FEATURE_NAMES
+
+ML_CACHE_DIR    = os.getenv("ML_CACHE_DIR", "models/cache")
+WALK_FORWARD_DIR = os.getenv("ML_WALK_FORWARD_DIR", "models/walk_forward")
+ML_N_JOBS       = int(os.getenv("ML_N_JOBS", "-1"))
+
+# Mismos hiperparámetros que MLTradingStrategy.train_model
+RF_PARAMS = dict(
+    n_estimators=100,
+    max_depth=10,
+    min_samples_split=5,
+    min_samples_leaf=2,
+    random_state=42,
+    class_weight='balanced',
+)
+
+
+# ---------------- dataset cacheado ----------------
+def dataset_key(df: pd.DataFrame, forward_periods: int, threshold: float) -> str:
+    """Hash de las velas (OHLCV + timestamps) y de los parámetros de etiquetado."""
+    h = hashlib.sha1(f"v1|{forward_periods}|{threshold}|{','.join(FEATURE_NAMES)}".encode())
+    for col in ("open", "high", "low", "close", "volume"):
+        h.update(np.ascontiguousarray(df[col].to_numpy(dtype=np.float64)).tobytes())
+    if "timestamp" in df.columns:
+        h.update(pd.to_datetime(df["timestamp"], utc=True).astype("int64").to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def build_dataset(df: pd.DataFrame, forward_periods: int = 5, threshold: float = 0.02,
+                  cache_dir: str = None) -> dict:
+    """
+    Devuelve {'key', 'X_path', 'y_path', 'X' (memmap float32), 'y', 'timestamps', 'n'}.
+    Si la caché ya tiene esa clave no se recalcula nada.
+    """
+    from src.ml_strategy import MLTradingStrategy
+
+    cache_dir = cache_dir or ML_CACHE_DIR
+    key = dataset_key(df, forward_periods, threshold)
+    base = os.path.join(cache_dir, key)
+    X_path, y_path, ts_path, meta_path = (f"{base}_X.npy", f"{base}_y.npy", f"{base}_ts.npy", f"{base}.json")
+
+    if not all(os.path.exists(p) for p in (X_path, y_path, ts_path, meta_path)):
+        os.makedirs(cache_dir, exist_ok=True)
+        strategy = MLTradingStrategy()
+        feats = strategy.create_features(df)
+        labeled = strategy.create_labels(feats, forward_periods=forward_periods, threshold=threshold)
+        labeled = labeled.dropna(subset=FEATURE_NAMES + ["future_return"])
+
+        X = np.lib.format.open_memmap(X_path + ".tmp.npy", mode="w+", dtype=np.float32,
+                                      shape=(len(labeled), len(FEATURE_NAMES)))
+        X[:] = labeled[FEATURE_NAMES].to_numpy(dtype=np.float32)
+        X.flush()
+        del X
+        np.save(y_path, labeled["label"].to_numpy(dtype=np.int8))
+        stamps = (pd.to_datetime(labeled["timestamp"], utc=True).astype("int64").to_numpy()
+                  if "timestamp" in labeled.columns else labeled.index.to_numpy(dtype=np.int64))
+        np.save(ts_path, stamps)
+        os.replace(X_path + ".tmp.npy", X_path)
+        with open(meta_path, "w") as f:
+            json.dump({"key": key, "rows": int(len(labeled)), "features": FEATURE_NAMES,
+                       "forward_periods": forward_periods, "threshold": threshold}, f, indent=2)
+        print(f"🧮 Matriz de features cacheada: {X_path} ({len(labeled)}×{len(FEATURE_NAMES)} float32)")
+    else:
+        print(f"♻️ Matriz de features en caché: {X_path}")
+
+    X = np.load(X_path, mmap_mode="r")
+    return {"key": key, "X_path": X_path, "y_path": y_path, "X": X,
+            "y": np.load(y_path), "timestamps": np.load(ts_path), "n": int(X.shape[0])}
+
+
+# ---------------- folds ----------------
+def _fit_fold(fold: int, X_path: str, y_path: str, train_idx, test_idx, rf_params: dict, out_path: str) -> dict:
+    """Worker: entrena un fold leyendo X por mmap y guarda su modelo."""
+    t0 = time.perf_counter()
+    X = np.load(X_path, mmap_mode="r")
+    y = np.load(y_path, mmap_mode="r")
+    tr_lo, tr_hi = int(train_idx[0]), int(train_idx[-1]) + 1     # los folds son tramos contiguos
+    te_lo, te_hi = int(test_idx[0]), int(test_idx[-1]) + 1
+
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[tr_lo:tr_hi])
+    X_test = scaler.transform(X[te_lo:te_hi])
+    y_train, y_test = np.asarray(y[tr_lo:tr_hi]), np.asarray(y[te_lo:te_hi])
+
+    model = RandomForestClassifier(**rf_params, n_jobs=1)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    joblib.dump({"model": model, "scaler": scaler, "feature_names": FEATURE_NAMES}, out_path)
+    return {
+        "fold": fold,
+        "train": [tr_lo, tr_hi],
+        "test": [te_lo, te_hi],
+        "accuracy": float(accuracy_score(y_test, y_pred)),
+        "report": classification_report(y_test, y_pred, output_dict=True, zero_division=0),
+        "feature_importance": dict(zip(FEATURE_NAMES, model.feature_importances_.round(6).tolist())),
+        "model_path": out_path,
+        "seconds": round(time.perf_counter() - t0, 2),
+    }
+
+
+def walk_forward_train(df: pd.DataFrame, n_splits: int = 5, n_jobs: int = None,
+                       forward_periods: int = 5, threshold: float = 0.02,
+                       rf_params: dict = None, out_dir: str = None) -> dict:
+    """
+    Entrena n_splits folds walk-forward en paralelo. Devuelve el resumen que también se
+    escribe en <out_dir>/<clave>/metrics.json (métricas por fold + medias).
+    """
+    data = build_dataset(df, forward_periods=forward_periods, threshold=threshold)
+    run_dir = os.path.join(out_dir or WALK_FORWARD_DIR, data["key"])
+    os.makedirs(run_dir, exist_ok=True)
+    rf_params = dict(RF_PARAMS, **(rf_params or {}))
+    n_jobs = ML_N_JOBS if n_jobs is None else n_jobs
+
+    # gap = forward_periods: las últimas etiquetas de train usan close.shift(-forward_periods),
+    # es decir, precios del tramo de test; se descartan para no filtrar el test en el train
+    splits = list(TimeSeriesSplit(n_splits=n_splits, gap=forward_periods).split(np.empty((data["n"], 1))))
+    print(f"🧠 Walk-forward: {len(splits)} folds sobre {data['n']} muestras "
+          f"(gap {forward_periods}, n_jobs={n_jobs})")
+
+    t0 = time.perf_counter()
+    folds = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(k, data["X_path"], data["y_path"], tr, te, rf_params,
+                           os.path.join(run_dir, f"fold_{k}.joblib"))
+        for k, (tr, te) in enumerate(splits)
+    )
+    ts = data["timestamps"]
+    for f in folds:
+        f["train_period"] = [str(pd.Timestamp(ts[f["train"][0]], tz="UTC")), str(pd.Timestamp(ts[f["train"][1] - 1], tz="UTC"))]
+        f["test_period"] = [str(pd.Timestamp(ts[f["test"][0]], tz="UTC")), str(pd.Timestamp(ts[f["test"][1] - 1], tz="UTC"))]
+        print(f"  fold {f['fold']}: train {f['train'][1] - f['train'][0]} · test {f['test'][1] - f['test'][0]} "
+              f"· acc {f['accuracy']:.3f} · {f['seconds']}s")
+
+    accs = [f["accuracy"] for f in folds]
+    summary = {
+        "key": data["key"],
+        "samples": data["n"],
+        "n_splits": n_splits,
+        "gap": forward_periods,
+        "rf_params": rf_params,
+        "mean_accuracy": float(np.mean(accs)),
+        "std_accuracy": float(np.std(accs)),
+        "latest_model": folds[-1]["model_path"],      # el fold más reciente = modelo para vivo
+        "seconds": round(time.perf_counter() - t0, 2),
+        "folds": folds,
+    }
+    with open(os.path.join(run_dir, "metrics.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"🎯 Precisión media walk-forward: {summary['mean_accuracy']:.3f} ± {summary['std_accuracy']:.3f} "
+          f"({summary['seconds']}s) → {run_dir}")
+    return summary
+
+
+def main():
+    from src.binance_api import get_historical_data
+
+    parser = argparse.ArgumentParser(description="Entrenamiento walk-forward del modelo ML")
+    parser.add_argument("--symbol", default="BTC/USDT")
+    parser.add_argument("--timeframe", default="1h")
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--splits", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    df = get_historical_data(symbol=args.symbol, timeframe=args.timeframe, limit=args.limit)
+    walk_forward_train(df, n_splits=args.splits, n_jobs=args.jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,45 +2,57 @@
 import pandas as pd
 import numpy as np
 from src.strategy.hybrid_strategy import (
-    hybrid_trading_strategy, 
-    scalping_strategy, 
-    momentum_breakout_strategy
+    hybrid_trading_arrays,
+    scalping_arrays,
+    momentum_breakout_arrays
 )
+from src.strategy.base import OHLCV
+from src.strategy.registry import get_strategy
 from src.risk_management import enhanced_backtest_with_risk_management
 from src.binance_api import get_historical_data
+from src.optimizer_checkpoint import GridCheckpoint
+from src.strategy.frames import BACKTEST_COLUMNS
+from src.profiling import profiled
 import os
+import sys
 from datetime import datetime
 from itertools import product
 import json
 
-def optimize_hybrid_strategy():
+def evaluate_cell(spec, data, params):
+    """Una celda del grid: estrategia sobre arrays + backtest con gestión de riesgo → (capital, métricas)."""
+    frame = spec.apply_arrays(data, params).frame(data, columns=BACKTEST_COLUMNS)
+    _, capital, metrics, _ = enhanced_backtest_with_risk_management(frame)
+    return capital, metrics
+
+def optimize_hybrid_strategy(resume=True):
     """
-    Optimización de la estrategia híbrida principal
+    Optimización de la estrategia híbrida principal.
+    Reanudable: cada celda se guarda en results/checkpoints/ al evaluarse.
     """
     print("🚀 OPTIMIZANDO ESTRATEGIA HÍBRIDA")
     print("=" * 50)
     
-    # Obtener datos
-    df = get_historical_data(symbol='BTC/USDT', timeframe='1h', limit=1000)
-    print(f"✅ Datos obtenidos: {len(df)} filas")
+    # Parámetros a optimizar: grid declarado en el registro de estrategias
+    spec = get_strategy('hybrid')
+    param_ranges = spec.grid()
     
-    # Parámetros a optimizar (optimizados para velocidad y eficiencia)
-    param_ranges = {
-        'macd_short': [6, 8, 10],
-        'macd_long': [20, 24],  # Reducido
-        'macd_signal': [5, 6],  # Reducido
-        'rsi_period': [12, 14],  # Reducido
-        'rsi_oversold': [35, 40],  # Reducido
-        'rsi_overbought': [60, 65],  # Reducido
-        'bb_period': [18, 20],  # Reducido
-        'bb_std': [1.8, 2.0],  # Reducido
-        'volume_threshold': [0.7, 0.9],  # Reducido
-        'trend_ema': [45, 55]  # Reducido
-    }
+    ckpt = GridCheckpoint(
+        'hybrid',
+        spec={'symbol': 'BTC/USDT', 'timeframe': '1h', 'limit': 1000, 'grid': param_ranges},
+        enabled=resume,
+    )
+    
+    # Obtener datos (o snapshot de una ejecución a medias)
+    df = ckpt.resume_data()
+    if df is None:
+        df = get_historical_data(symbol='BTC/USDT', timeframe='1h', limit=1000)
+    print(f"✅ Datos obtenidos: {len(df)} filas")
     
-    results = []
     total_combinations = np.prod([len(v) for v in param_ranges.values()])
     print(f"🧮 Probando {total_combinations} combinaciones...")
+    ckpt.start(df, total=int(total_combinations))
+    data = OHLCV.from_frame(df)  # arrays de solo lectura: sin copias por celda
     
     param_names = list(param_ranges.keys())
     param_values = list(param_ranges.values())
@@ -56,21 +68,19 @@ def optimize_hybrid_strategy():
         
         params = dict(zip(param_names, combination))
         
-        # Validar parámetros lógicos
-        if params['macd_short'] >= params['macd_long']:
+        # Validar parámetros lógicos (restricciones declaradas)
+        if not spec.is_valid(params):
             continue
-        if params['rsi_oversold'] >= params['rsi_overbought']:
+        if ckpt.is_done(params):
             continue
         
         try:
-            df_copy = df.copy()
-            df_copy = hybrid_trading_strategy(df_copy, **params)
-            
-            # Backtest
-            df_result, capital, metrics, trades_df = enhanced_backtest_with_risk_management(df_copy)
+            # Estrategia + backtest
+            capital, metrics = evaluate_cell(spec, data, params)
             
             # Filtrar resultados con pocas operaciones
             if metrics['total_trades'] < 3:
+                ckpt.record(params, None, status='skip')
                 continue
             
             result = {
@@ -88,7 +98,7 @@ def optimize_hybrid_strategy():
                 'timestamp': datetime.now().isoformat()
             }
             
-            results.append(result)
+            ckpt.record(params, result)
             
             # Tracking del mejor resultado
             if metrics['sharpe_ratio'] > best_sharpe and metrics['total_trades'] >= 5:
@@ -96,11 +106,16 @@ def optimize_hybrid_strategy():
                 best_params = params.copy()
                 print(f"🎯 Nuevo mejor resultado: Sharpe={best_sharpe:.3f}, Return={metrics['total_return']*100:.2f}%, Trades={metrics['total_trades']}")
         
+        except KeyboardInterrupt:
+            ckpt.close()
+            raise
         except Exception as e:
             print(f"❌ Error con parámetros {params}: {str(e)}")
+            ckpt.record(params, None, status='error')
             continue
     
-    return process_results(results, 'hybrid')
+    ckpt.finish()
+    return process_results(ckpt.results(), 'hybrid')
 
 def test_scalping_strategy():
     """
@@ -117,6 +132,7 @@ def test_scalping_strategy():
         print(f"\n📊 Timeframe: {tf}")
         try:
             df = get_historical_data(symbol='BTC/USDT', timeframe=tf, limit=1000)
+            data = OHLCV.from_frame(df)
             
             # Parámetros optimizados para scalping
             param_ranges = {
@@ -135,10 +151,9 @@ def test_scalping_strategy():
                             continue
                         
                         try:
-                            df_copy = df.copy()
-                            df_copy = scalping_strategy(df_copy, fast_ema, slow_ema, rsi_period)
+                            frame = scalping_arrays(data, fast_ema, slow_ema, rsi_period).frame(data, columns=BACKTEST_COLUMNS)
                             
-                            df_result, capital, metrics, trades_df = enhanced_backtest_with_risk_management(df_copy, timeframe=tf)
+                            df_result, capital, metrics, trades_df = enhanced_backtest_with_risk_management(frame, timeframe=tf)
                             
                             if metrics['total_trades'] >= 5 and metrics['sharpe_ratio'] > best_sharpe:
                                 best_sharpe = metrics['sharpe_ratio']
@@ -176,6 +191,7 @@ def test_momentum_breakout():
     print("=" * 50)
     
     df = get_historical_data(symbol='BTC/USDT', timeframe='1h', limit=1000)
+    data = OHLCV.from_frame(df)
     
     # Parámetros a probar
     lookback_periods = [15, 20, 25]
@@ -187,10 +203,9 @@ def test_momentum_breakout():
     for lookback in lookback_periods:
         for threshold in breakout_thresholds:
             try:
-                df_copy = df.copy()
-                df_copy = momentum_breakout_strategy(df_copy, lookback, threshold)
+                frame = momentum_breakout_arrays(data, lookback, threshold).frame(data, columns=BACKTEST_COLUMNS)
                 
-                df_result, capital, metrics, trades_df = enhanced_backtest_with_risk_management(df_copy)
+                df_result, capital, metrics, trades_df = enhanced_backtest_with_risk_management(frame)
                 
                 if metrics['total_trades'] >= 3 and metrics['sharpe_ratio'] > best_sharpe:
                     best_sharpe = metrics['sharpe_ratio']
@@ -247,19 +262,19 @@ def compare_all_strategies():
     print("=" * 60)
     
     df = get_historical_data(symbol='BTC/USDT', timeframe='1h', limit=1000)
+    data = OHLCV.from_frame(df)
     
     strategies_to_test = [
-        ("Híbrida", lambda d: hybrid_trading_strategy(d)),
-        ("Scalping", lambda d: scalping_strategy(d)),
-        ("Momentum", lambda d: momentum_breakout_strategy(d))
+        ("Híbrida", hybrid_trading_arrays),
+        ("Scalping", scalping_arrays),
+        ("Momentum", momentum_breakout_arrays)
     ]
     
     comparison_results = []
     
     for name, strategy_func in strategies_to_test:
         try:
-            df_copy = df.copy()
-            df_strategy = strategy_func(df_copy)
+            df_strategy = strategy_func(data).frame(data, columns=BACKTEST_COLUMNS)
             
             df_result, capital, metrics, trades_df = enhanced_backtest_with_risk_management(df_strategy)
             
@@ -291,7 +306,8 @@ def compare_all_strategies():
     
     return comparison_results
 
-if __name__ == "__main__":
+@profiled("optimize_hybrid_strategies")
+def main():
     print("🚀 INICIANDO OPTIMIZACIÓN RÁPIDA DE ESTRATEGIA HÍBRIDA")
     print("=" * 60)
     print("⚡ Modo optimizado: solo estrategia híbrida principal")
@@ -300,7 +316,7 @@ if __name__ == "__main__":
     
     # Solo optimizar estrategia híbrida principal
     start_time = datetime.now()
-    hybrid_result = optimize_hybrid_strategy()
+    hybrid_result = optimize_hybrid_strategy(resume='--no-resume' not in sys.argv)
     end_time = datetime.now()
     
     duration = (end_time - start_time).total_seconds() / 60
@@ -319,3 +335,7 @@ if __name__ == "__main__":
         print(f"🔄 Total Trades: {hybrid_result['total_trades']}")
     
     print("\n💡 TIP: Para probar otras estrategias, ejecuta las funciones individuales")
+
+
+if __name__ == "__main__":
+    main()
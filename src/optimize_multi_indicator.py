@@ -1,37 +1,44 @@
 # src/optimize_multi_indicator.py
 import pandas as pd
 import numpy as np
-from src.strategy.multi_indicator import multi_indicator_strategy, adaptive_multi_strategy
+from src.strategy.multi_indicator import multi_indicator_arrays, adaptive_multi_arrays
+from src.strategy.base import OHLCV
+from src.strategy.registry import get_strategy
 from src.risk_management import enhanced_backtest_with_risk_management
 from src.binance_api import get_historical_data
+from src.optimizer_checkpoint import GridCheckpoint
+from src.strategy.frames import BACKTEST_COLUMNS
+from src.profiling import profiled
 import os
+import sys
 from datetime import datetime
 from itertools import product
 import json
 
-def optimize_multi_indicator_strategy():
+def optimize_multi_indicator_strategy(resume=True):
     """
-    Optimización avanzada de la estrategia multi-indicador
+    Optimización avanzada de la estrategia multi-indicador.
+    Reanudable: cada celda se guarda en results/checkpoints/ al evaluarse.
     """
-    print("🔄 Obteniendo datos históricos...")
-    df = get_historical_data(symbol='BTC/USDT', timeframe='1h', limit=1000)
+    # Parámetros a optimizar: grid declarado en el registro de estrategias
+    spec = get_strategy('multi_indicator')
+    param_ranges = spec.grid()
     
-    # Reducir parámetros para optimización más rápida
-    param_ranges = {
-        'macd_short': [10, 12],
-        'macd_long': [24, 26],
-        'macd_signal': [7, 9],
-        'rsi_period': [14, 16],
-        'rsi_oversold': [25, 30],
-        'rsi_overbought': [70, 75],
-        'bb_period': [18, 20],
-        'bb_std': [1.8, 2.0],
-        'volume_threshold': [1.0, 1.2]
-    }
+    ckpt = GridCheckpoint(
+        'multi_indicator',
+        spec={'symbol': 'BTC/USDT', 'timeframe': '1h', 'limit': 1000, 'grid': param_ranges},
+        enabled=resume,
+    )
+    
+    print("🔄 Obteniendo datos históricos...")
+    df = ckpt.resume_data()
+    if df is None:
+        df = get_historical_data(symbol='BTC/USDT', timeframe='1h', limit=1000)
     
-    results = []
     total_combinations = np.prod([len(v) for v in param_ranges.values()])
     print(f"🧮 Probando {total_combinations} combinaciones...")
+    ckpt.start(df, total=int(total_combinations))
+    data = OHLCV.from_frame(df)  # arrays de solo lectura: sin copias por celda
     
     # Generar todas las combinaciones
     param_names = list(param_ranges.keys())
@@ -48,21 +55,21 @@ def optimize_multi_indicator_strategy():
         
         params = dict(zip(param_names, combination))
         
-        # Validar parámetros lógicos
-        if params['macd_short'] >= params['macd_long']:
+        # Validar parámetros lógicos (restricciones declaradas)
+        if not spec.is_valid(params):
             continue
-        if params['rsi_oversold'] >= params['rsi_overbought']:
+        if ckpt.is_done(params):
             continue
         
         try:
-            df_copy = df.copy()
-            df_copy = multi_indicator_strategy(df_copy, **params)
+            frame = spec.apply_arrays(data, params).frame(data, columns=BACKTEST_COLUMNS)
             
             # Backtest con gestión de riesgo
-            df_result, capital, metrics, trades_df = enhanced_backtest_with_risk_management(df_copy)
+            df_result, capital, metrics, trades_df = enhanced_backtest_with_risk_management(frame)
             
             # Filtrar resultados con pocas operaciones
             if metrics['total_trades'] < 5:
+                ckpt.record(params, None, status='skip')
                 continue
             
             result = {
@@ -80,7 +87,7 @@ def optimize_multi_indicator_strategy():
                 'timestamp': datetime.now().isoformat()
             }
             
-            results.append(result)
+            ckpt.record(params, result)
             
             # Tracking del mejor resultado
             if metrics['sharpe_ratio'] > best_sharpe and metrics['total_trades'] >= 10:
@@ -88,13 +95,19 @@ def optimize_multi_indicator_strategy():
                 best_params = params.copy()
                 print(f"🎯 Nuevo mejor resultado: Sharpe={best_sharpe:.3f}, Return={metrics['total_return']*100:.2f}%")
         
+        except KeyboardInterrupt:
+            ckpt.close()
+            raise
         except Exception as e:
             print(f"❌ Error con parámetros {params}: {str(e)}")
+            ckpt.record(params, None, status='error')
             continue
     
+    ckpt.finish()
+    
     # Guardar resultados
     os.makedirs('results', exist_ok=True)
-    results_df = pd.DataFrame(results)
+    results_df = pd.DataFrame(ckpt.results())
     
     if not results_df.empty:
         results_df = results_df.sort_values('sharpe_ratio', ascending=False)
@@ -125,14 +138,11 @@ def test_adaptive_strategy():
     """
     print("\n🧪 Probando estrategia adaptativa...")
     df = get_historical_data(symbol='BTC/USDT', timeframe='1h', limit=1000)
+    data = OHLCV.from_frame(df)
     
-    # Estrategia fija vs adaptativa
-    df_fixed = df.copy()
-    df_adaptive = df.copy()
-    
-    # Aplicar estrategias
-    df_fixed = multi_indicator_strategy(df_fixed)
-    df_adaptive = adaptive_multi_strategy(df_adaptive)
+    # Aplicar estrategias (fija vs adaptativa)
+    df_fixed = multi_indicator_arrays(data).frame(data, columns=BACKTEST_COLUMNS)
+    df_adaptive = adaptive_multi_arrays(data).frame(data, columns=BACKTEST_COLUMNS)
     
     # Backtest
     _, capital_fixed, metrics_fixed, _ = enhanced_backtest_with_risk_management(df_fixed)
@@ -147,12 +157,13 @@ def test_adaptive_strategy():
         'adaptive': metrics_adaptive
     }
 
-if __name__ == "__main__":
+@profiled("optimize_multi_indicator")
+def main():
     print("🚀 INICIANDO OPTIMIZACIÓN DE ESTRATEGIA MULTI-INDICADOR")
     print("=" * 60)
     
     # Optimizar estrategia
-    best_result = optimize_multi_indicator_strategy()
+    best_result = optimize_multi_indicator_strategy(resume='--no-resume' not in sys.argv)
     
     if best_result:
         print("\n" + "=" * 60)
@@ -161,3 +172,7 @@ if __name__ == "__main__":
         
         print("\n" + "=" * 60)
         print("✅ OPTIMIZACIÓN COMPLETADA")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@
 # - Guarda CSV en results/rsi_optimization_<TF>.csv
 # - Exporta best_params en results/best_rsi_<TF>.json (con metadata)
 # - Usa el mismo loader de datos que el bot y la misma estrategia viva
+# - Checkpoint incremental (results/checkpoints/): si se reinicia a mitad, reanuda
+# - --profile (o PROFILE=1): perfil de la ejecución en results/profiles/
 
 import os
 import argparse
@@ -12,11 +14,12 @@ import json
 from datetime import datetime
 
 import pandas as pd
-import matplotlib.pyplot as plt
 
 from src.binance_api import get_historical_data
-from src.strategy.rsi_sma import rsi_sma_strategy
-from src.backtest import backtest_signals
+from src.strategy.rsi_sma import rsi_sma_signals
+from src.backtest import backtest_arrays
+from src.optimizer_checkpoint import GridCheckpoint
+from src.profiling import profiled
 
 # ---------- helpers de parsing ----------
 
@@ -59,8 +62,92 @@ def parse_args():
     # opcional: escribir active_params_<SYMBOL>_<TF>.json directamente
     parser.add_argument("--write-active", action="store_true",
                         help="Escribe results/active_params_<SYMBOL>_<TF>.json con el BEST set")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Ignora checkpoints previos y no guarda progreso incremental")
     return parser.parse_args()
 
+# ---------- datos ----------
+
+def _load_data(symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+    df = get_historical_data(symbol, timeframe, limit).copy()
+    if df.empty:
+        raise RuntimeError(f"No se obtuvieron datos para {symbol} {timeframe}")
+
+    # Limpieza ligera por si hubiese huecos/duplicados
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
+    df = (
+        df.dropna(subset=["timestamp"])
+          .sort_values("timestamp")
+          .drop_duplicates(subset=["timestamp"], keep="last")
+          .reset_index(drop=True)
+    )
+    return df
+
+# ---------- grid ----------
+
+def run_grid(df: pd.DataFrame, grid: dict, timeframe: str, checkpoint: GridCheckpoint = None) -> list:
+    """
+    Evalúa el grid RSI+SMA(+LB) sobre df y devuelve la lista de filas de resultados.
+    Con `checkpoint`, cada celda se persiste al evaluarse y las ya hechas se saltan.
+    """
+    rsi_periods, sma_periods = grid["rsi_period"], grid["sma_period"]
+    rsi_buy_levels, rsi_sell_levels = grid["rsi_buy"], grid["rsi_sell"]
+    lb_values = grid["lookback_bars"]
+
+    total_loops = len(rsi_periods) * len(sma_periods) * len(rsi_buy_levels) * len(rsi_sell_levels) * len(lb_values)
+    print(f"▶️ Grid total: {total_loops} combinaciones "
+          f"(RSI={rsi_periods} | SMA={sma_periods} | BUY={rsi_buy_levels} | SELL={rsi_sell_levels} | LB={lb_values})")
+
+    if checkpoint is not None:
+        checkpoint.start(df, total=total_loops)
+
+    # Kernel NumPy: sin copias del DataFrame; RSI/SMA/EMA200 se calculan una vez por periodo
+    close = df["close"].to_numpy(dtype="float64")
+    cache = {}
+
+    results = []
+    loops = 0
+    try:
+        for rsi_p in rsi_periods:
+            for sma_p in sma_periods:
+                for rsi_buy in rsi_buy_levels:
+                    for rsi_sell in rsi_sell_levels:
+                        if rsi_buy >= rsi_sell:
+                            continue
+                        for lb in lb_values:
+                            loops += 1
+                            cell = dict(rsi_period=rsi_p, sma_period=sma_p,
+                                        rsi_buy=rsi_buy, rsi_sell=rsi_sell, lookback_bars=lb)
+                            if checkpoint is not None and checkpoint.is_done(cell):
+                                continue
+
+                            signal = rsi_sma_signals(close, **cell, cache=cache)
+                            _, capital, metrics = backtest_arrays(close, signal, timeframe=timeframe)
+
+                            row = {
+                                "strategy": "rsi_sma",
+                                **cell,
+                                "capital_final": round(capital, 2),
+                                "total_return": round(metrics["total_return"] * 100, 2),
+                                "sharpe_ratio": round(metrics["sharpe_ratio"], 2),
+                                "max_drawdown": round(metrics["max_drawdown"] * 100, 2),
+                                "timestamp": datetime.utcnow().isoformat()
+                            }
+                            results.append(row)
+                            if checkpoint is not None:
+                                checkpoint.record(cell, row)
+                            if loops % 50 == 0:
+                                print(f"  …{loops}/{total_loops} combinaciones evaluadas")
+    except BaseException:
+        if checkpoint is not None:
+            checkpoint.close()
+        raise
+
+    if checkpoint is not None:
+        checkpoint.finish()
+        return checkpoint.results()
+    return results
+
 # ---------- Gate (solo para imprimir resumen informativo) ----------
 def _gate_env():
     min_ret = float(os.getenv("REOPT_MIN_RETURN_PCT", "0.0"))
@@ -70,6 +157,7 @@ def _gate_env():
 
 # ---------- main ----------
 
+@profiled("optimize_rsi")
 def main():
     args = parse_args()
     os.makedirs("results", exist_ok=True)
@@ -81,64 +169,28 @@ def main():
     rsi_sell_levels = _parse_int_list(args.sell, _env_list("RSI_SELL_LEVELS",    [60, 65, 70]))
     lb_values       = _parse_int_list(args.lb,   _env_list("RSI_LOOKBACK_GRID",  [6, 8, 12]))
 
-    # === Descarga de datos ===
-    df = get_historical_data(args.symbol, args.timeframe, args.limit).copy()
-    if df.empty:
-        raise RuntimeError(f"No se obtuvieron datos para {args.symbol} {args.timeframe}")
-
-    # Limpieza ligera por si hubiese huecos/duplicados
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
-    df = (
-        df.dropna(subset=["timestamp"])
-          .sort_values("timestamp")
-          .drop_duplicates(subset=["timestamp"], keep="last")
-          .reset_index(drop=True)
+    grid = {
+        "rsi_period": rsi_periods,
+        "sma_period": sma_periods,
+        "rsi_buy": rsi_buy_levels,
+        "rsi_sell": rsi_sell_levels,
+        "lookback_bars": lb_values,
+    }
+    ckpt = GridCheckpoint(
+        "rsi_sma",
+        spec={"symbol": args.symbol, "timeframe": args.timeframe, "limit": args.limit, "grid": grid},
+        enabled=not args.no_resume,
     )
 
+    # === Descarga de datos (o snapshot de una ejecución a medias) ===
+    df = ckpt.resume_data()
+    if df is None:
+        df = _load_data(args.symbol, args.timeframe, args.limit)
+
     data_end = pd.to_datetime(df["timestamp"].iloc[-1])
 
     # === Grid search ===
-    results = []
-    total_loops = len(rsi_periods) * len(sma_periods) * len(rsi_buy_levels) * len(rsi_sell_levels) * len(lb_values)
-    print(f"▶️ Grid total: {total_loops} combinaciones "
-          f"(RSI={rsi_periods} | SMA={sma_periods} | BUY={rsi_buy_levels} | SELL={rsi_sell_levels} | LB={lb_values})")
-
-    loops = 0
-    for rsi_p in rsi_periods:
-        for sma_p in sma_periods:
-            for rsi_buy in rsi_buy_levels:
-                for rsi_sell in rsi_sell_levels:
-                    if rsi_buy >= rsi_sell:
-                        continue
-                    for lb in lb_values:
-                        loops += 1
-                        df_copy = df.copy()
-                        df_copy = rsi_sma_strategy(
-                            df_copy,
-                            rsi_period=rsi_p,
-                            sma_period=sma_p,
-                            rsi_buy=rsi_buy,
-                            rsi_sell=rsi_sell,
-                            lookback_bars=lb,
-                        )
-                        df_bt, capital, metrics = backtest_signals(df_copy, timeframe=args.timeframe)
-
-                        results.append({
-                            "strategy": "rsi_sma",
-                            "rsi_period": rsi_p,
-                            "sma_period": sma_p,
-                            "rsi_buy": rsi_buy,
-                            "rsi_sell": rsi_sell,
-                            "lookback_bars": lb,
-                            "capital_final": round(capital, 2),
-                            "total_return": round(metrics["total_return"] * 100, 2),
-                            "sharpe_ratio": round(metrics["sharpe_ratio"], 2),
-                            "max_drawdown": round(metrics["max_drawdown"] * 100, 2),
-                            "timestamp": datetime.utcnow().isoformat()
-                        })
-                        if loops % 50 == 0:
-                            print(f"  …{loops}/{total_loops} combinaciones evaluadas")
-
+    results = run_grid(df, grid, args.timeframe, checkpoint=ckpt)
     results_df = pd.DataFrame(results)
     out_csv = f"results/rsi_optimization_{args.timeframe}.csv"
     results_df.to_csv(out_csv, index=False)
@@ -206,19 +258,15 @@ def main():
 
     # Plot
     if args.plot:
-        plt.figure(figsize=(10, 5))
-        plt.bar(top5.index.astype(str), top5["total_return"])
-        plt.title(f"Top 5 RSI+SMA+LB ({args.symbol} {args.timeframe})")
-        plt.ylabel("Retorno (%)")
-        plt.xlabel("Fila en CSV")
-        for i, row in top5.iterrows():
-            label = f"RSI{int(row['rsi_period'])}/SMA{int(row['sma_period'])} | {int(row['rsi_buy'])}-{int(row['rsi_sell'])} | LB{int(row['lookback_bars'])}"
-            plt.text(i, row["total_return"] + 0.1, label, ha="center", fontsize=8, rotation=45)
-        # margen inferior para que quepan etiquetas
-        plt.gcf().subplots_adjust(bottom=0.25)
-        plt.tight_layout()
+        from src.charts import bar_chart
+        labels = [
+            f"RSI{int(row['rsi_period'])}/SMA{int(row['sma_period'])} | {int(row['rsi_buy'])}-{int(row['rsi_sell'])} | LB{int(row['lookback_bars'])}"
+            for _, row in top5.iterrows()
+        ]
         plot_path = f"results/rsi_top5_{args.timeframe}.png"
-        plt.savefig(plot_path)
+        bar_chart(plot_path, top5.index.astype(str), top5["total_return"], annotations=labels,
+                  title=f"Top 5 RSI+SMA+LB ({args.symbol} {args.timeframe})",
+                  xlabel="Fila en CSV", ylabel="Retorno (%)")
         print(f"📊 Gráfico guardado en: {plot_path}")
 
 if __name__ == "__main__":
@@ -0,0 +1,242 @@
+# src/optimizer_checkpoint.py
+# -*- coding: utf-8 -*-
+"""
+Checkpoints incrementales para los grid-search (optimize_rsi, optimize_hybrid_strategies,
+optimize_multi_indicator).
+
+Cada ejecución vive en results/checkpoints/<nombre>_<run_key>/ con:
+  - manifest.json     → grid, símbolo/TF, huella de los datos, estado (running/done)
+  - data.pkl          → snapshot OHLCV usado en la ejecución (para reanudar con los mismos datos)
+  - candidates.jsonl  → una línea por celda evaluada (se escribe y se hace flush al momento)
+
+Si PM2 reinicia el proceso a mitad de grid, la siguiente ejecución con el mismo grid
+reutiliza el snapshot de datos, salta las celdas ya evaluadas y continúa donde se quedó.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+CHECKPOINT_DIR      = os.getenv("OPT_CHECKPOINT_DIR", "results/checkpoints")
+# Una ejecución a medias más vieja que esto no se reanuda (los datos ya no son "los de ahora")
+RESUME_MAX_AGE_MIN  = float(os.getenv("OPT_RESUME_MAX_AGE_MIN", "180"))
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Huella estable del OHLCV: nº de filas + bytes de timestamp y OHLCV.
+    Dos descargas con las mismas velas producen la misma huella.
+    """
+    h = hashlib.sha1()
+    h.update(str(len(df)).encode())
+    if "timestamp" in df.columns:
+        ts = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
+        h.update(ts.astype("int64").to_numpy().tobytes())
+    for col in ("open", "high", "low", "close", "volume"):
+        if col in df.columns:
+            h.update(np.ascontiguousarray(df[col].to_numpy(dtype="float64")).tobytes())
+    return h.hexdigest()
+
+
+def _spec_key(name: str, spec: dict) -> str:
+    blob = json.dumps({"name": name, "spec": spec}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.md5(blob.encode()).hexdigest()[:12]
+
+
+def _cell_key(params: dict) -> str:
+    # clave canónica de una celda del grid (independiente del orden de los kwargs)
+    return json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _to_jsonable(v):
+    if isinstance(v, (np.integer,)):
+        return int(v)
+    if isinstance(v, (np.floating,)):
+        return float(v)
+    if isinstance(v, (np.bool_,)):
+        return bool(v)
+    return v
+
+
+class GridCheckpoint:
+    """
+    Checkpoint de un grid-search reanudable.
+
+    Uso típico:
+        ckpt = GridCheckpoint("rsi_sma", spec={...grid, symbol, timeframe, limit...})
+        df = ckpt.resume_data()              # snapshot si hay ejecución a medias
+        if df is None:
+            df = descargar(...)
+        ckpt.start(df)                       # valida huella / crea manifest
+        for params in grid:
+            if ckpt.is_done(params):
+                continue
+            ...
+            ckpt.record(params, fila)        # o ckpt.record(params, None, status="skip")
+        ckpt.finish()
+        filas = ckpt.results()               # incluye las recuperadas de ejecuciones previas
+    """
+
+    def __init__(self, name: str, spec: dict, base_dir: str = None, enabled: bool = True):
+        self.name     = name
+        self.spec     = spec
+        self.enabled  = enabled
+        self.run_key  = _spec_key(name, spec)
+        self.run_dir  = os.path.join(base_dir or CHECKPOINT_DIR, f"{name}_{self.run_key}")
+        self.manifest_path   = os.path.join(self.run_dir, "manifest.json")
+        self.data_path       = os.path.join(self.run_dir, "data.pkl")
+        self.candidates_path = os.path.join(self.run_dir, "candidates.jsonl")
+
+        self._done = {}        # cell_key → (status, result)
+        self._fh = None
+        self.resumed = 0       # nº de celdas recuperadas al arrancar
+
+    # ---------------- manifest ----------------
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _write_manifest(self, manifest: dict):
+        os.makedirs(self.run_dir, exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(tmp, self.manifest_path)
+
+    def _resumable_manifest(self):
+        manifest = self._read_manifest()
+        if not manifest or manifest.get("status") != "running":
+            return None
+        age_min = (time.time() - float(manifest.get("created_ts", 0))) / 60.0
+        if age_min > RESUME_MAX_AGE_MIN:
+            print(f"♻️ Checkpoint {self.run_dir} demasiado viejo ({age_min:.0f} min) → se descarta")
+            return None
+        return manifest
+
+    # ---------------- datos ----------------
+    def resume_data(self):
+        """
+        Devuelve el snapshot OHLCV de una ejecución a medias (mismo grid) o None.
+        """
+        if not self.enabled:
+            return None
+        manifest = self._resumable_manifest()
+        if manifest is None or not os.path.exists(self.data_path):
+            return None
+        try:
+            df = pd.read_pickle(self.data_path)
+        except Exception as e:
+            print(f"⚠️ Snapshot de datos ilegible ({e}); se empieza de cero")
+            return None
+        if data_fingerprint(df) != manifest.get("data_fingerprint"):
+            print("⚠️ Snapshot no coincide con la huella del manifest; se empieza de cero")
+            return None
+        return df
+
+    def start(self, df: pd.DataFrame, total: int = None):
+        """
+        Abre la ejecución: si existe una a medias con la misma huella de datos, carga
+        las celdas ya evaluadas; si no, la reinicia y guarda snapshot + manifest.
+        """
+        if not self.enabled:
+            return self
+
+        fingerprint = data_fingerprint(df)
+        manifest = self._resumable_manifest()
+
+        if manifest is not None and manifest.get("data_fingerprint") == fingerprint:
+            self._load_candidates()
+            self.resumed = len(self._done)
+            print(f"⏯️ Reanudando {self.name} ({self.run_key}): {self.resumed} celdas ya evaluadas")
+        else:
+            if os.path.isdir(self.run_dir):
+                shutil.rmtree(self.run_dir, ignore_errors=True)
+            os.makedirs(self.run_dir, exist_ok=True)
+            df.to_pickle(self.data_path)
+            self._write_manifest({
+                "name": self.name,
+                "run_key": self.run_key,
+                "spec": self.spec,
+                "data_fingerprint": fingerprint,
+                "rows": int(len(df)),
+                "data_end": str(df["timestamp"].iloc[-1]) if "timestamp" in df.columns and len(df) else None,
+                "total_cells": total,
+                "status": "running",
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "created_ts": time.time(),
+            })
+
+        self._fh = open(self.candidates_path, "a", buffering=1)  # line-buffered
+        return self
+
+    def _load_candidates(self):
+        self._done = {}
+        if not os.path.exists(self.candidates_path):
+            return
+        # descarta una última línea a medio escribir para que el siguiente append no la pise
+        with open(self.candidates_path, "rb+") as f:
+            blob = f.read()
+            if blob and not blob.endswith(b"\n"):
+                f.truncate(blob.rfind(b"\n") + 1)
+        with open(self.candidates_path, "r") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # última línea truncada por un kill -9
+                self._done[rec["key"]] = (rec.get("status", "ok"), rec.get("result"))
+
+    # ---------------- celdas ----------------
+    def is_done(self, params: dict) -> bool:
+        return self.enabled and _cell_key(params) in self._done
+
+    def record(self, params: dict, result, status: str = "ok"):
+        """
+        Persiste una celda evaluada. `result` es la fila de resultados (dict) o None
+        para celdas descartadas (pocas operaciones, error, etc.). Con el checkpoint
+        desactivado solo se acumula en memoria.
+        """
+        key = _cell_key(params)
+        clean = None if result is None else {k: _to_jsonable(v) for k, v in result.items()}
+        self._done[key] = (status, clean)
+        if self.enabled and self._fh is not None:
+            self._fh.write(json.dumps({"key": key, "status": status, "result": clean}, default=str) + "\n")
+
+    def results(self) -> list:
+        """Filas 'ok' (recuperadas + nuevas) en orden de evaluación."""
+        return [res for status, res in self._done.values() if status == "ok" and res is not None]
+
+    def finish(self):
+        """Marca la ejecución como completa: la próxima con el mismo grid empieza de cero."""
+        if not self.enabled:
+            return
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        manifest = self._read_manifest() or {}
+        manifest.update({
+            "status": "done",
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "evaluated_cells": len(self._done),
+        })
+        self._write_manifest(manifest)
+        # el snapshot ya no hace falta una vez terminado
+        try:
+            os.remove(self.data_path)
+        except OSError:
+            pass
+
+    def close(self):
+        """Cierra el fichero sin marcar como completa (p.ej. tras una excepción)."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
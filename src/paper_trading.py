@@ -1,11 +1,13 @@
 # src/paper_trading.py
 
 import os
-from binance.client import Client
 from dotenv import load_dotenv
 from src.utils import log_operation
 from src.balance_tracker import update_balance
 from src.alert import send_trade_email, send_trade_telegram
+from src.event_bus import publish
+from src.dashboard_data import journal_bot_key
+from src.metrics import track_api
 import pandas as pd
 
 load_dotenv()
@@ -13,15 +15,29 @@ load_dotenv()
 api_key = os.getenv("BINANCE_API_KEY")
 api_secret = os.getenv("BINANCE_API_SECRET")
 
-try:
-    # Si quieres usar el testnet, descomenta las siguientes dos líneas:
-    # client = Client(api_key, api_secret, testnet=True)
-    # client.API_URL = 'https://testnet.binance.vision/api'
-    client = Client(api_key, api_secret)
-    client.ping()
-except Exception as e:
-    print(f"❌ Binance API error al iniciar: {e}")
-    client = None
+_client = None
+_client_ready = False
+
+def get_client():
+    """
+    Cliente Binance creado (y comprobado con ping) en el primer uso, no al importar.
+    Si falla se devuelve None y las operaciones se omiten, como antes.
+    """
+    global _client, _client_ready
+    if not _client_ready:
+        _client_ready = True
+        try:
+            from binance.client import Client
+            # Si quieres usar el testnet, descomenta las siguientes dos líneas:
+            # _client = Client(api_key, api_secret, testnet=True)
+            # _client.API_URL = 'https://testnet.binance.vision/api'
+            _client = Client(api_key, api_secret)
+            with track_api("ping"):
+                _client.ping()
+        except Exception as e:
+            print(f"❌ Binance API error al iniciar: {e}")
+            _client = None
+    return _client
 
 quantity = 0.0002
 FEE_RATE = 0.001
@@ -30,13 +46,16 @@ SLIPPAGE = 0.0005
 symbol = os.getenv("TRADING_SYMBOL", "BTCUSDC")
 
 def get_price(symbol=symbol):
+    client = get_client()
     if client is None:
         print("⛔ No se puede obtener precio: Binance no disponible")
         return 0.0
-    ticker = client.get_symbol_ticker(symbol=symbol)
+    with track_api("get_symbol_ticker"):
+        ticker = client.get_symbol_ticker(symbol=symbol)
     return float(ticker['price'])
 
 def buy(symbol, price, strategy_name, params, trades_path, perf_path):
+    client = get_client()
     if client is None:
         print("⛔ No se puede ejecutar COMPRA: Binance no disponible")
         return None
@@ -55,6 +74,7 @@ def buy(symbol, price, strategy_name, params, trades_path, perf_path):
     
     with open(perf_path, "a") as f:
         f.write(f"{pd.Timestamp.utcnow().isoformat()},BUY,{slippage_price},{quantity},{slippage_price * quantity},SUCCESS\n")
+    publish("fill", source=journal_bot_key(trades_path, symbol), side="BUY", symbol=symbol, price=slippage_price, qty=quantity, strategy=strategy_name, mode="paper")
 
     return {
         "symbol": symbol,
@@ -65,6 +85,7 @@ def buy(symbol, price, strategy_name, params, trades_path, perf_path):
     }
 
 def sell(symbol, price, strategy_name, params, trades_path, perf_path):
+    client = get_client()
     if client is None:
         print("⛔ No se puede ejecutar VENTA: Binance no disponible")
         return None
@@ -82,6 +103,7 @@ def sell(symbol, price, strategy_name, params, trades_path, perf_path):
     
     with open(perf_path, "a") as f:
         f.write(f"{pd.Timestamp.utcnow().isoformat()},SELL,{slippage_price},{quantity},{slippage_price * quantity},SUCCESS\n")
+    publish("fill", source=journal_bot_key(trades_path, symbol), side="SELL", symbol=symbol, price=slippage_price, qty=quantity, strategy=strategy_name, mode="paper")
 
     return {
         "symbol": symbol,
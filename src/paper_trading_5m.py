@@ -2,7 +2,6 @@
 
 import os
 import pandas as pd
-from binance.client import Client
 from dotenv import load_dotenv
 from src.utils import log_operation
 from src.balance_tracker_5m import update_balance
@@ -13,13 +12,23 @@ load_dotenv()
 api_key = os.getenv("BINANCE_API_KEY")
 api_secret = os.getenv("BINANCE_API_SECRET")
 
-try:
-    client = Client(api_key, api_secret, testnet=True)
-    client.API_URL = 'https://testnet.binance.vision/api'
-    client.ping()
-except Exception as e:
-    print(f"❌ Binance API error al iniciar: {e}")
-    client = None
+_client = None
+_client_ready = False
+
+def get_client():
+    """Cliente Binance (testnet) creado en el primer uso, no al importar."""
+    global _client, _client_ready
+    if not _client_ready:
+        _client_ready = True
+        try:
+            from binance.client import Client
+            _client = Client(api_key, api_secret, testnet=True)
+            _client.API_URL = 'https://testnet.binance.vision/api'
+            _client.ping()
+        except Exception as e:
+            print(f"❌ Binance API error al iniciar: {e}")
+            _client = None
+    return _client
 
 quantity = 0.001
 FEE_RATE = 0.001
@@ -27,6 +36,7 @@ SLIPPAGE = 0.0005
 symbol = os.getenv("TRADING_SYMBOL", "BTCUSDC")
 
 def get_price(symbol=symbol):
+    client = get_client()
     if client is None:
         print("⛔ No se puede obtener precio: Binance no disponible")
         return 0.0
@@ -34,6 +44,7 @@ def get_price(symbol=symbol):
     return float(ticker['price'])
 
 def buy(symbol, price, strategy_name, params, trades_path, perf_path):
+    client = get_client()
     if client is None:
         print("⛔ No se puede ejecutar COMPRA: Binance no disponible")
         return None
@@ -60,6 +71,7 @@ def buy(symbol, price, strategy_name, params, trades_path, perf_path):
     }
 
 def sell(symbol, price, strategy_name, params, trades_path, perf_path):
+    client = get_client()
     if client is None:
         print("⛔ No se puede ejecutar VENTA: Binance no disponible")
         return None
@@ -0,0 +1,314 @@
+# src/profiling.py
+# -*- coding: utf-8 -*-
+"""
+Modo perfilado integrado, activable sin tocar código:
+
+    python -m src.optimize_rsi --profile ...        # flag en la línea de comandos
+    PROFILE=1 pm2 restart quant-bot --update-env    # o variable de entorno (apps PM2)
+    python -m src.profiling src.optimize_macd       # cualquier script, sin flag propio
+
+Modos (PROFILE_MODE):
+  - "sample" (por defecto): un hilo muestrea la pila del hilo principal cada
+    PROFILE_INTERVAL_MS ms. Coste casi nulo y pilas completas.
+  - "cprofile": perfil determinista con cProfile (tiempos exactos por función, más overhead).
+
+En bucles largos (live_trader, reoptimizer) solo se perfilan las primeras PROFILE_CYCLES
+iteraciones (sin la espera a la vela) y se escribe el resultado. En results/profiles/ queda:
+  <nombre>_<fecha>_<pid>.collapsed   pilas "a;b;c N" (flamegraph.pl, speedscope, inferno)
+  <nombre>_<fecha>_<pid>_top.txt     top-N por tiempo propio y acumulado
+  <nombre>_<fecha>_<pid>.pstats      (solo cprofile) para snakeviz / pstats
+"""
+
+import os
+import sys
+import time
+import atexit
+import runpy
+import threading
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR         = os.getenv("PROFILE_DIR", "results/profiles")
+PROFILE_MODE        = os.getenv("PROFILE_MODE", "sample").strip().lower()
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_CYCLES      = int(os.getenv("PROFILE_CYCLES", "5"))
+PROFILE_TOP         = int(os.getenv("PROFILE_TOP", "30"))
+
+_TRUE = ("1", "true", "yes", "on")
+_current = None      # sesión activa del proceso (no se anidan perfiles)
+
+
+def enabled() -> bool:
+    """
+    True si se pidió perfilado (--profile en argv o PROFILE=1). El flag se retira de
+    sys.argv (los argparse de los scripts no lo conocen) y se exporta PROFILE=1 para que
+    los subprocesos (p.ej. el optimizador que lanza el reoptimizer) también se perfilen.
+    """
+    if "--profile" in sys.argv[1:]:
+        sys.argv[:] = [a for a in sys.argv if a != "--profile"]
+        os.environ["PROFILE"] = "1"
+    return os.getenv("PROFILE", "").strip().lower() in _TRUE
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+# ---------------- motores ----------------
+class _Sampler:
+    """Muestreo de la pila de un hilo desde un hilo daemon."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()          # tupla raíz→hoja → nº de muestras
+        self._active = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.is_set():
+            if not self._active.wait(0.1):
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None and self.thread_id != me:
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+            del frame
+            time.sleep(self.interval)
+
+    def resume(self):
+        self._active.set()
+
+    def pause(self):
+        self._active.clear()
+
+    def close(self):
+        self._active.clear()
+        self._stop.set()
+
+
+class _Deterministic:
+    def __init__(self):
+        import cProfile
+        self.profile = cProfile.Profile()
+
+    def resume(self):
+        self.profile.enable()
+
+    def pause(self):
+        self.profile.disable()
+
+    def close(self):
+        self.profile.disable()
+
+
+# ---------------- sesión ----------------
+class Session:
+    """
+    Perfil de un proceso. Uso:
+        with Session("optimize_rsi"):            # todo el bloque
+            ...
+        prof = Session("live_trader", cycles=5)  # bucles: solo dentro de begin()/end()
+        prof.begin(); ...; prof.end()
+    """
+
+    def __init__(self, name: str, cycles: int = None, mode: str = None,
+                 interval_ms: float = None, out_dir: str = None):
+        self.name = name
+        self.cycles = cycles
+        self.mode = mode or PROFILE_MODE
+        self.interval = (interval_ms or PROFILE_INTERVAL_MS) / 1000.0
+        self.out_dir = out_dir or PROFILE_DIR
+        self.done = 0
+        self.seconds = 0.0
+        self.paths = []
+        self._t0 = None
+        if self.mode == "cprofile":
+            self._engine = _Deterministic()
+        else:
+            self.mode = "sample"
+            self._engine = _Sampler(threading.main_thread().ident, self.interval)
+        self._finished = False
+        global _current
+        _current = self
+        atexit.register(self.finish)     # Ctrl-C / kill de PM2: se guarda lo que haya
+        print(f"🔬 Perfilado '{name}' activo (modo {self.mode}"
+              f"{f', {cycles} ciclos' if cycles else ''}) → {self.out_dir}")
+
+    def begin(self):
+        if not self._finished:
+            self._t0 = time.perf_counter()
+            self._engine.resume()
+
+    def end(self):
+        if self._finished or self._t0 is None:
+            return
+        self._engine.pause()
+        self.seconds += time.perf_counter() - self._t0
+        self._t0 = None
+        self.done += 1
+        if self.cycles and self.done >= self.cycles:
+            self.finish()
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, *exc):
+        self.end()
+        self.finish()
+        return False
+
+    # ---------------- salida ----------------
+    def finish(self):
+        """Detiene el perfil y escribe los ficheros (solo la primera vez)."""
+        if self._finished:
+            return self.paths
+        if self._t0 is not None:
+            self._engine.pause()
+            self.seconds += time.perf_counter() - self._t0
+            self._t0 = None
+            self.done += 1
+        self._finished = True
+        self._engine.close()
+        global _current
+        if _current is self:
+            _current = None
+        try:
+            self.paths = self._write()
+            print(f"🔬 Perfil '{self.name}' guardado: {', '.join(self.paths)}")
+        except Exception as e:
+            print(f"⚠️ No se pudo escribir el perfil '{self.name}': {e}")
+        return self.paths
+
+    def _base(self) -> str:
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.out_dir, f"{self.name}_{stamp}_{os.getpid()}")
+
+    def _write(self) -> list:
+        base = self._base()
+        if self.mode == "cprofile":
+            stacks, self_t, total_t, unit = self._cprofile_tables(base)
+            paths = [base + ".pstats"]
+        else:
+            stacks = self._engine.stacks
+            self_t, total_t = Counter(), Counter()
+            for stack, n in stacks.items():
+                self_t[stack[-1]] += n
+                for label in set(stack):
+                    total_t[label] += n
+            unit = "muestras"
+            paths = []
+
+        with open(base + ".collapsed", "w") as f:
+            for stack, n in sorted(stacks.items()):
+                f.write(f"{';'.join(stack)} {n}\n")
+        paths.insert(0, base + ".collapsed")
+
+        total = sum(self_t.values())
+        grand = total or 1
+        lines = [
+            f"# {self.name} · modo {self.mode} · {self.done} ciclo(s) · {self.seconds:.2f}s perfilados"
+            f" · {total} {unit}",
+            "",
+            f"## Top {PROFILE_TOP} por tiempo propio",
+        ]
+        lines += [f"{n:>10} {100 * n / grand:6.2f}%  {label}" for label, n in self_t.most_common(PROFILE_TOP)]
+        lines += ["", f"## Top {PROFILE_TOP} por tiempo acumulado"]
+        lines += [f"{n:>10} {100 * n / grand:6.2f}%  {label}" for label, n in total_t.most_common(PROFILE_TOP)]
+        with open(base + "_top.txt", "w") as f:
+            f.write("\n".join(lines) + "\n")
+        paths.insert(1, base + "_top.txt")
+        return paths
+
+    def _cprofile_tables(self, base: str):
+        """
+        Desde cProfile: tiempos propios/acumulados por función (µs) y pilas de 2 niveles
+        llamador;función ponderadas por tiempo propio (aproximación para flamegraph).
+        """
+        import pstats
+
+        self._engine.profile.dump_stats(base + ".pstats")
+        stats = pstats.Stats(self._engine.profile).stats
+        label = lambda fn: f"{os.path.basename(fn[0])}:{fn[2]}"
+        self_t, total_t, stacks = Counter(), Counter(), Counter()
+        for fn, (cc, nc, tt, ct, callers) in stats.items():
+            self_t[label(fn)] += int(tt * 1e6)
+            total_t[label(fn)] += int(ct * 1e6)
+            own = sum(c[2] for c in callers.values()) or tt
+            for caller, (_, _, c_tt, _) in callers.items():
+                share = int(tt * (c_tt / own) * 1e6) if own else 0
+                if share:
+                    stacks[(label(caller), label(fn))] += share
+            if not callers and tt:
+                stacks[(label(fn),)] += int(tt * 1e6)
+        return stacks, self_t, total_t, "µs"
+
+
+class _NoSession:
+    """Sesión inactiva: mismas llamadas, sin coste."""
+
+    done = 0
+
+    def begin(self):
+        pass
+
+    def end(self):
+        pass
+
+    def finish(self):
+        return []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def session(name: str, cycles: int = None):
+    """Session si el perfilado está activo (y no hay otra en curso); si no, un objeto vacío."""
+    if not enabled() or _current is not None:
+        return _NoSession()
+    return Session(name, cycles=cycles)
+
+
+def cycles_session(name: str):
+    """Sesión para bucles: se limita a PROFILE_CYCLES iteraciones."""
+    return session(name, cycles=PROFILE_CYCLES)
+
+
+def profiled(name: str):
+    """Decorador para el main() de un script: perfila la ejecución completa si está activo."""
+    def decorator(fn):
+        def wrapper(*args, **kwargs):
+            with session(name):
+                return fn(*args, **kwargs)
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        return wrapper
+    return decorator
+
+
+def main():
+    """python -m src.profiling <módulo> [args...]: ejecuta el módulo como __main__ perfilado."""
+    if len(sys.argv) < 2 or sys.argv[1].startswith("-"):
+        print("Uso: python -m src.profiling <modulo> [args...]   (p.ej. src.optimize_macd)")
+        raise SystemExit(2)
+    module = sys.argv[1]
+    sys.argv[:] = [module] + sys.argv[2:]
+    os.environ["PROFILE"] = "1"
+    with Session(module.rsplit(".", 1)[-1]):
+        runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+
+if __name__ == "__main__":
+    main()
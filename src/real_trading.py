@@ -2,7 +2,6 @@
 import os
 import pandas as pd
 from decimal import Decimal, ROUND_DOWN
-from binance.client import Client
 from dotenv import load_dotenv
 
 from src.utils import (
@@ -12,6 +11,9 @@ from src.utils import (
 )
 from src.balance_tracker import update_balance
 from src.alert import send_trade_email, send_trade_telegram
+from src.event_bus import publish
+from src.dashboard_data import journal_bot_key
+from src.metrics import track_api
 
 load_dotenv()
 
@@ -19,15 +21,29 @@ api_key = os.getenv("BINANCE_API_KEY")
 api_secret = os.getenv("BINANCE_API_SECRET")
 USE_TESTNET = os.getenv("USE_BINANCE_TESTNET", "False") == "True"
 
-# Cliente Binance (con testnet opcional)
-try:
-    client = Client(api_key, api_secret, testnet=USE_TESTNET)
-    if USE_TESTNET:
-        client.API_URL = "https://testnet.binance.vision/api"
-    client.ping()
-except Exception as e:
-    print(f"❌ Binance API error al iniciar: {e}")
-    client = None
+# Cliente Binance (con testnet opcional), creado en el primer uso
+_client = None
+_client_ready = False
+
+def get_client():
+    """
+    Construye el cliente y hace ping la primera vez que se necesita; importar el
+    módulo no toca la red. Si falla devuelve None y las órdenes se omiten.
+    """
+    global _client, _client_ready
+    if not _client_ready:
+        _client_ready = True
+        try:
+            from binance.client import Client
+            _client = Client(api_key, api_secret, testnet=USE_TESTNET)
+            if USE_TESTNET:
+                _client.API_URL = "https://testnet.binance.vision/api"
+            with track_api("ping"):
+                _client.ping()
+        except Exception as e:
+            print(f"❌ Binance API error al iniciar: {e}")
+            _client = None
+    return _client
 
 # Parámetros por defecto (puedes moverlos a .env si quieres)
 DEFAULT_BUY_QTY = Decimal(os.getenv("REAL_BUY_QTY", "0.0002"))
@@ -35,7 +51,8 @@ FEE_RATE = Decimal(os.getenv("REAL_FEE_RATE", "0.001"))  # aprox/fallback
 
 def _get_symbol_filters(symbol: str):
     """Devuelve (step_size, min_qty, min_notional) como Decimal."""
-    info = client.get_symbol_info(symbol)
+    with track_api("get_symbol_info"):
+        info = get_client().get_symbol_info(symbol)
     lot = next(f for f in info["filters"] if f["filterType"] == "LOT_SIZE")
     step_size = Decimal(lot["stepSize"])
     min_qty = Decimal(lot["minQty"])
@@ -92,6 +109,7 @@ def buy(symbol, price, strategy_name, params, trades_path, perf_path):
     Lanza una orden de compra a mercado. Valida minNotional y LOT_SIZE.
     Usa VWAP real y comisiones reportadas por Binance si están disponibles.
     """
+    client = get_client()
     if client is None:
         print("⛔ No se puede ejecutar COMPRA: Binance no disponible")
         return None
@@ -100,7 +118,8 @@ def buy(symbol, price, strategy_name, params, trades_path, perf_path):
         step_size, min_qty, min_notional = _get_symbol_filters(symbol)
 
         # Precio actual para validar notional mínimo
-        ticker = client.get_symbol_ticker(symbol=symbol)
+        with track_api("get_symbol_ticker"):
+            ticker = client.get_symbol_ticker(symbol=symbol)
         last_px = Decimal(ticker["price"])
 
         qty = DEFAULT_BUY_QTY
@@ -123,7 +142,8 @@ def buy(symbol, price, strategy_name, params, trades_path, perf_path):
         qty_str = format_quantity_for_binance(qty, step_size)
 
         print(f"🟢 Ejecutando compra de {qty_str} {symbol}…")
-        order = client.order_market_buy(symbol=symbol, quantity=qty_str)
+        with track_api("order_market_buy"):
+            order = client.order_market_buy(symbol=symbol, quantity=qty_str)
 
         vwap, filled_qty, fee = _vwap_and_commission(
             order,
@@ -141,6 +161,7 @@ def buy(symbol, price, strategy_name, params, trades_path, perf_path):
         update_balance("BUY", filled_qty, vwap + (fee / max(filled_qty, 1e-12)))
         send_trade_email("BUY", vwap, filled_qty, strategy_name, symbol)
         send_trade_telegram("BUY", vwap, filled_qty, strategy_name, symbol)
+        publish("fill", source=journal_bot_key(trades_path, symbol), side="BUY", symbol=symbol, price=vwap, qty=filled_qty, fee=fee, strategy=strategy_name, mode="real")
 
         return order
 
@@ -158,6 +179,7 @@ def sell(symbol, price, strategy_name, params, trades_path, perf_path):
     Vende toda la cantidad vendible (respetando LOT_SIZE y minNotional).
     Usa VWAP real y comisiones reportadas por Binance si están disponibles.
     """
+    client = get_client()
     if client is None:
         print("⛔ No se puede ejecutar VENTA: Binance no disponible")
         return None
@@ -166,7 +188,8 @@ def sell(symbol, price, strategy_name, params, trades_path, perf_path):
         qty_decimal = get_sellable_quantity(symbol, client)
 
         if qty_decimal <= Decimal("0"):
-            free_btc = client.get_asset_balance(asset="BTC")["free"]
+            with track_api("get_asset_balance"):
+                free_btc = client.get_asset_balance(asset="BTC")["free"]
             print(f"❌ Saldo ({free_btc} BTC) insuficiente o no vendible.")
             with open(perf_path, "a") as f:
                 f.write(f"{pd.Timestamp.utcnow().isoformat()},SELL_SKIPPED,{price},{free_btc},0,BELOW_MIN_QTY\n")
@@ -177,10 +200,12 @@ def sell(symbol, price, strategy_name, params, trades_path, perf_path):
         qty_str = format_quantity_for_binance(qty_decimal, step_size)
         print(f"🔴 Ejecutando venta de {qty_str} {symbol}…")
 
-        order = client.order_market_sell(symbol=symbol, quantity=qty_str)
+        with track_api("order_market_sell"):
+            order = client.order_market_sell(symbol=symbol, quantity=qty_str)
 
         # Precio/qty/fee reales
-        ticker = client.get_symbol_ticker(symbol=symbol)
+        with track_api("get_symbol_ticker"):
+            ticker = client.get_symbol_ticker(symbol=symbol)
         last_px = Decimal(ticker["price"])
 
         vwap, filled_qty, fee = _vwap_and_commission(
@@ -196,6 +221,7 @@ def sell(symbol, price, strategy_name, params, trades_path, perf_path):
 
         with open(perf_path, "a") as f:
             f.write(f"{pd.Timestamp.utcnow().isoformat()},SELL,{vwap},{filled_qty},{vwap * filled_qty},SUCCESS\n")
+        publish("fill", source=journal_bot_key(trades_path, symbol), side="SELL", symbol=symbol, price=vwap, qty=filled_qty, fee=fee, strategy=strategy_name, mode="real")
 
         print(f"✅ Venta ejecutada VWAP {vwap:.2f} (qty {filled_qty:.6f}, fee≈ {fee:.4f})")
         return order
@@ -20,6 +20,9 @@ from datetime import datetime, timezone
 import pandas as pd
 from dotenv import load_dotenv
 
+from src.metrics import counter, gauge, histogram, start_http_server
+from src.profiling import cycles_session
+
 load_dotenv()
 
 # ===================== Config ===================== #
@@ -51,6 +54,14 @@ ACTIVE_HASH  = f"{ACTIVE_JSON}.hash"
 HISTORY_CSV  = f"results/active_params_history_{SYMBOL}_{TIMEFRAME}.csv"
 # ================================================== #
 
+# Métricas (GET /metrics en METRICS_PORT)
+CYCLES_TOTAL    = counter("reopt_cycles_total", "Ciclos del reoptimizer por resultado", ("result",))
+OPT_SECONDS     = histogram("reopt_optimizer_seconds", "Duración del subproceso de optimización",
+                            buckets=(10, 30, 60, 120, 300, 600, 900, 1800, 3600))
+OPT_RUNS_TOTAL  = counter("reopt_optimizer_runs_total", "Ejecuciones del optimizador", ("result",))
+COMBOS_PER_SEC  = gauge("reopt_optimizer_combos_per_second", "Combinaciones evaluadas por segundo en la última optimización")
+ACTIVE_RETURN   = gauge("reopt_active_total_return_pct", "Retorno del set de parámetros activo (%)")
+
 
 # -------------------- Utilidades -------------------- #
 def _ensure_dir_for_file(path: str):
@@ -86,11 +97,27 @@ def _run_optimizer():
         "--limit", str(REOPT_LIMIT),
     ]
     print(f"🚀 Lanzando optimización: {' '.join(cmd)}")
+    started = time.time()
     try:
         subprocess.run(cmd, cwd=os.getcwd(), check=True)
         print("✅ Optimización terminada")
+        OPT_RUNS_TOTAL.labels("ok").inc()
     except subprocess.CalledProcessError as e:
         print(f"⚠️ Optimización falló: {e}")
+        OPT_RUNS_TOTAL.labels("failed").inc()
+        return
+    finally:
+        OPT_SECONDS.observe(time.time() - started)
+    _record_combos_rate(started, time.time())
+
+def _record_combos_rate(started: float, finished: float):
+    """Combinaciones/s: filas del CSV con timestamp de esta ejecución entre su duración."""
+    try:
+        ts = pd.to_datetime(pd.read_csv(OPT_CSV, usecols=["timestamp"])["timestamp"], errors="coerce")
+        evaluated = int((ts >= pd.Timestamp(started, unit="s")).sum())   # timestamps utcnow() sin zona
+        COMBOS_PER_SEC.set(evaluated / max(finished - started, 1e-9))
+    except Exception:
+        pass
 
 def _pick_best_from_csv(path: str):
     """
@@ -232,7 +259,10 @@ def main_loop():
         except Exception:
             last_sig = None
 
+    start_http_server()
+    prof = cycles_session("reoptimizer")   # --profile / PROFILE=1 (el optimizador hijo hereda PROFILE)
     while True:
+        prof.begin()
         try:
             csv_age_min = _mtime_minutes(OPT_CSV)
             must_optimize = REOPT_FORCE or (not os.path.exists(OPT_CSV)) or (csv_age_min > CSV_STALE_MIN)
@@ -266,6 +296,7 @@ def main_loop():
 
             if not best:
                 print(f"👉 Sin candidato ({status}); se mantiene el activo.")
+                CYCLES_TOTAL.labels("kept").inc()
             else:
                 new_sig = _params_signature(best)
                 if new_sig != last_sig:
@@ -278,12 +309,17 @@ def main_loop():
                     last_sig = new_sig
                     _append_history(best)
                     print(f"✅ Actualizado {ACTIVE_JSON} → {best['best']['params']}  [{status}]")
+                    CYCLES_TOTAL.labels("promoted").inc()
+                    ACTIVE_RETURN.set(best["best"]["metrics"]["total_return_pct"])
                 else:
                     print("👍 Sin cambios en strategy/params; no se reescribe.")
+                    CYCLES_TOTAL.labels("unchanged").inc()
 
         except Exception as e:
             print(f"⚠️ Reoptimizer warning: {e}")
+            CYCLES_TOTAL.labels("error").inc()
 
+        prof.end()
         time.sleep(SLEEP_SECONDS)
 
 
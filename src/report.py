@@ -1,7 +1,5 @@
 # src/report.py
 
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
 from datetime import datetime
 import os
 
@@ -9,6 +7,10 @@ def generate_pdf_report(strategy_name, metrics, chart_path='results/equity_curve
     """
     Genera un informe en PDF con las métricas del backtest y un gráfico de equity.
     """
+    # reportlab solo se carga al generar el PDF
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
     os.makedirs('results', exist_ok=True)
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
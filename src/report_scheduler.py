@@ -1,37 +1,227 @@
 # src/report_scheduler.py
 
 import os
+import csv
+import json
 import time
-import hashlib
-from src.generate_summary_report import generate_summary_report
+from collections import deque
+
+import pandas as pd
+
+from src.generate_summary_report import generate_summary_report, OUTPUT_PATH
+from src.dashboard_data import JournalTail
+from src.metrics import counter, gauge, histogram, start_http_server
 
 TRADES_PATH = "logs/trades.csv"
-CHECK_INTERVAL = 300  # cada 5 minutos (300 segundos)
+STATE_PATH = "results/report_state.json"
+
+# Detección de cambios: stat() (tamaño/mtime/inode) cada REPORT_POLL_SEC, o inotify si está
+# disponible. Una ráfaga de operaciones se agrupa en una sola regeneración: se espera a que el
+# fichero lleve REPORT_DEBOUNCE_SEC sin crecer, como mucho REPORT_MAX_DELAY_SEC desde el primer cambio.
+POLL_SEC = float(os.getenv("REPORT_POLL_SEC", "5"))
+DEBOUNCE_SEC = float(os.getenv("REPORT_DEBOUNCE_SEC", "30"))
+MAX_DELAY_SEC = float(os.getenv("REPORT_MAX_DELAY_SEC", "300"))
+
+# Métricas (GET /metrics en METRICS_PORT)
+REPORTS_TOTAL   = counter("report_generations_total", "Regeneraciones del informe por resultado", ("result",))
+REPORT_SECONDS  = histogram("report_generation_seconds", "Duración de la generación del informe")
+NEW_TRADES      = counter("report_new_trades_total", "Operaciones nuevas leídas de trades.csv")
+PENDING         = gauge("report_pending", "1 si hay una regeneración esperando el debounce")
+
+# Celdas que pd.read_csv lee como NaN por defecto (compute_report_metrics descarta esas filas)
+CSV_NA_VALUES = frozenset((
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+))
+
+
+class IncrementalReportMetrics:
+    """
+    Métricas del informe (mismas definiciones que generate_summary_report) actualizadas
+    solo con las líneas nuevas de trades.csv. El estado (offset + agregados + precios aún
+    sin emparejar) se persiste para no releer el fichero al reiniciar.
+    """
+
+    def __init__(self, path: str):
+        self.tail = JournalTail(path)
+        self.reset()
+
+    def reset(self):
+        self.header = None
+        self.total = 0
+        self.buys = 0
+        self.sells = 0
+        self.profit = 0.0
+        self.pct = 0.0
+        self.open_buys = deque()     # precios BUY aún sin SELL (emparejado posicional)
+        self.open_sells = deque()
+
+    # ---------------- estado ----------------
+    def to_dict(self) -> dict:
+        return {
+            "path": self.tail.path, "offset": self.tail.offset, "inode": self.tail.inode,
+            "header": self.header, "total": self.total, "buys": self.buys, "sells": self.sells,
+            "profit": self.profit, "pct": self.pct,
+            "open_buys": list(self.open_buys), "open_sells": list(self.open_sells),
+        }
+
+    def load(self, state_path: str) -> bool:
+        """Restaura el estado si sigue siendo el mismo fichero y no se ha truncado."""
+        try:
+            with open(state_path, "r") as f:
+                state = json.load(f)
+            st = os.stat(self.tail.path)
+        except (OSError, ValueError):
+            return False
+        if state.get("path") != self.tail.path or state.get("inode") != st.st_ino or st.st_size < state.get("offset", 0):
+            return False
+        self.tail.offset = state["offset"]
+        self.tail.inode = state["inode"]
+        self.header = state.get("header")
+        for key in ("total", "buys", "sells", "profit", "pct"):
+            setattr(self, key, state[key])
+        self.open_buys = deque(state["open_buys"])
+        self.open_sells = deque(state["open_sells"])
+        return True
+
+    def save(self, state_path: str):
+        os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+        tmp = state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, state_path)
+
+    # ---------------- actualización ----------------
+    def update(self) -> int:
+        """Procesa lo añadido desde el último offset; devuelve nº de operaciones nuevas."""
+        lines, restarted = self.tail.read_new()
+        if restarted:
+            self.reset()
+        before = self.total
+        for row in csv.reader(lines):
+            if not row:
+                continue
+            if self.header is None:
+                self.header = row
+                continue
+            if row[0] == "timestamp":
+                continue
+            self._add(dict(zip(self.header, row)))
+        return self.total - before
+
+    def _add(self, row: dict):
+        # misma validación que compute_report_metrics: to_datetime(errors='coerce') +
+        # dropna(subset=['timestamp', 'price', 'action']) con los NaN por defecto de read_csv
+        action = row.get("action")
+        raw_price, raw_ts = row.get("price"), row.get("timestamp")
+        if any(v is None or v in CSV_NA_VALUES for v in (action, raw_price, raw_ts)):
+            return
+        try:
+            price = float(raw_price)
+        except ValueError:
+            return
+        if price != price or pd.isna(pd.to_datetime(raw_ts, errors="coerce")):
+            return
 
-def file_hash(filepath):
-    if not os.path.exists(filepath):
+        self.total += 1
+        if action == "BUY":
+            self.buys += 1
+            self.open_buys.append(price)
+        elif action == "SELL":
+            self.sells += 1
+            self.open_sells.append(price)
+
+        while self.open_buys and self.open_sells:
+            b = self.open_buys.popleft()
+            s = self.open_sells.popleft()
+            self.profit += s - b
+            self.pct += (s - b) / b * 100
+
+    def metrics(self) -> dict:
+        return {
+            'total_operaciones': self.total,
+            'buy': self.buys,
+            'sell': self.sells,
+            'retorno_total': round(self.profit, 2),
+            'porcentaje_total': round(self.pct, 2),
+        }
+
+
+def _inotify_waiter(path: str):
+    """
+    Devuelve wait(timeout) que bloquea hasta una escritura en el directorio del journal
+    (inotify_simple, opcional). Sin inotify devuelve None y se usa polling por stat().
+    """
+    try:
+        from inotify_simple import INotify, flags
+    except ImportError:
         return None
-    with open(filepath, 'rb') as f:
-        return hashlib.md5(f.read()).hexdigest()
+    try:
+        inotify = INotify()
+        inotify.add_watch(os.path.dirname(os.path.abspath(path)),
+                          flags.MODIFY | flags.CREATE | flags.MOVED_TO | flags.CLOSE_WRITE)
+    except OSError:
+        return None
+
+    def wait(timeout: float):
+        inotify.read(timeout=int(timeout * 1000))
+
+    return wait
+
 
 def main():
     print("📅 Iniciando monitor de generación de informes...")
-    last_hash = file_hash(TRADES_PATH)
+    tracker = IncrementalReportMetrics(TRADES_PATH)
+    resumed = tracker.load(STATE_PATH)
+    new_ops = tracker.update()
+    tracker.save(STATE_PATH)
+    print(f"📒 {'Estado reanudado' if resumed else 'Journal leído'}: {tracker.metrics()}")
+
+    start_http_server()
+    wait = _inotify_waiter(TRADES_PATH)
+    print(f"👀 Detección de cambios: {'inotify' if wait else f'stat cada {POLL_SEC:g}s'}")
+
+    # Si el journal creció mientras el proceso estaba parado (o no hay PDF), regenerar
+    pending_since = time.time() if (resumed and new_ops) or not os.path.exists(OUTPUT_PATH) else None
+    last_growth = pending_since
 
     while True:
-        time.sleep(CHECK_INTERVAL)
-        current_hash = file_hash(TRADES_PATH)
-
-        if current_hash and current_hash != last_hash:
-            print("📈 Cambios detectados en trades.csv. Generando nuevo resumen...")
-            try:
-                generate_summary_report()
-                print("✅ Resumen actualizado.")
-            except Exception as e:
-                print(f"❌ Error al generar el resumen: {e}")
-            last_hash = current_hash
+        if wait:
+            wait(POLL_SEC)
         else:
-            print("🕒 Sin cambios detectados. Esperando...")
+            time.sleep(POLL_SEC)
+
+        if tracker.tail.changed():
+            added = tracker.update()
+            tracker.save(STATE_PATH)
+            if added:
+                NEW_TRADES.inc(added)
+                PENDING.set(1)
+                now = time.time()
+                last_growth = now
+                if pending_since is None:
+                    pending_since = now
+                    print(f"📈 {added} operaciones nuevas en trades.csv; regeneración en espera ({DEBOUNCE_SEC:g}s)...")
+
+        if pending_since is None:
+            continue
+
+        now = time.time()
+        if now - last_growth < DEBOUNCE_SEC and now - pending_since < MAX_DELAY_SEC:
+            continue
+
+        print("📈 Cambios detectados en trades.csv. Generando nuevo resumen...")
+        try:
+            with REPORT_SECONDS.time():
+                generate_summary_report(metrics=tracker.metrics())
+            print("✅ Resumen actualizado.")
+            REPORTS_TOTAL.labels("ok").inc()
+        except Exception as e:
+            print(f"❌ Error al generar el resumen: {e}")
+            REPORTS_TOTAL.labels("failed").inc()
+        PENDING.set(0)
+        pending_since = None
+        last_growth = None
 
 if __name__ == "__main__":
     main()
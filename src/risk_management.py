@@ -1,7 +1,16 @@
 # src/risk_management.py
+import os
+from bisect import bisect_left, bisect_right
 import pandas as pd
 import numpy as np
 
+from src.strategy import kernels as K
+from src.backtest import ANNUALIZATION, equity_returns, equity_metrics
+from src.trade_ledger import TradeLedger, REASON_SIGNAL, REASON_STOP_LOSS, REASON_TAKE_PROFIT
+
+# "close": stop contra el cierre (histórico) · "intrabar": stop/target contra high/low de la vela
+RISK_STOP_MODE = os.getenv("RISK_STOP_MODE", "close")
+
 class DynamicRiskManager:
     def __init__(self, initial_capital=10000, max_risk_per_trade=0.02, 
                  max_portfolio_risk=0.15, atr_period=14):
@@ -72,144 +81,325 @@ class DynamicRiskManager:
             
         return df
 
-def enhanced_backtest_with_risk_management(df, initial_capital=10000, timeframe="1h"):
+FEE = 0.00075
+SLIPPAGE = 0.0004
+
+
+def _first_stop_hit(close, atr2, entry_price, lo, hi):
+    """
+    Primera vela j ∈ [lo, hi) con close[j] <= entry_price - 2·ATR[j] (-1 si no hay).
+    Escanea por tramos crecientes para no evaluar todo el resto de la serie en cada trade.
+    """
+    step = 64
+    while lo < hi:
+        top = min(hi, lo + step)
+        hit = np.flatnonzero(close[lo:top] <= entry_price - atr2[lo:top])
+        if hit.size:
+            return lo + int(hit[0])
+        lo = top
+        step *= 2
+    return -1
+
+
+class _EquityMarks:
+    """
+    Capital tras cada evento (entrada/salida) por vela, común a los dos modos de stop:
+    equity() lo convierte en la curva escalonada (capital inicial hasta el primer evento).
+    """
+
+    __slots__ = ("idx", "cap")
+
+    def __init__(self):
+        self.idx, self.cap = [], []
+
+    def mark(self, i, capital):
+        # capital al cierre de la vela i (si hay dos eventos en la misma vela, vale el último)
+        if self.idx and self.idx[-1] == i:
+            self.cap[-1] = capital
+        else:
+            self.idx.append(i)
+            self.cap.append(capital)
+
+    def equity(self, n, initial_capital):
+        equity = np.full(n, float(initial_capital))
+        if self.idx:
+            marks = np.zeros(n, dtype=np.intp)
+            marks[self.idx] = np.arange(1, len(self.idx) + 1)
+            np.maximum.accumulate(marks, out=marks)
+            equity = np.concatenate(([float(initial_capital)], self.cap))[marks]
+        return equity
+
+
+def _open_position(capital, entry_price, stop_distance, strength, max_risk_per_trade):
+    """Tamaño de posición (riesgo / distancia de stop, máx. 20% del capital) y capital tras la comisión."""
+    risk_amount = capital * max_risk_per_trade
+    position_size = min(
+        (risk_amount / stop_distance) * strength,
+        (capital * 0.2) / entry_price  # Max 20% of capital
+    )
+    return position_size, capital * (1 - FEE)
+
+
+def _close_position(capital, entry_price, exit_price, position_size):
+    """Capital tras cerrar la posición (PnL ponderado por tamaño + comisión) y PnL por unidad."""
+    pnl = (exit_price - entry_price) / entry_price
+    return capital * ((1 + pnl * position_size) * (1 - FEE)), pnl
+
+
+def _risk_backtest_core(close, atr, signal, strength, initial_capital, max_risk_per_trade):
+    """
+    Máquina de estados long-only de `enhanced_backtest_with_risk_management` sobre arrays.
+    El bucle Python solo recorre fronteras de operación (entrada → stop/señal de salida);
+    la búsqueda de la siguiente salida es vectorizada.
+    Devuelve (capital, equity ndarray, TradeLedger).
+    """
+    n = len(close)
+    atr2 = atr * 2
+    # índices de señales como listas: bisect sobre list es más barato que np.searchsorted escalar
+    buys  = np.flatnonzero(signal == 1).tolist()
+    sells = np.flatnonzero(signal == -1).tolist()
+
+    capital = initial_capital
+    ledger = TradeLedger(capacity=max(16, len(buys) // 2))
+    marks = _EquityMarks()
+
+    i = 0
+    while True:
+        # Nuevas señales: BUY en la siguiente vela con position == 1
+        k = bisect_left(buys, i)
+        if k >= len(buys):
+            break
+        e = buys[k]
+        price = close[e]
+        entry_price = price * (1 + SLIPPAGE)
+
+        # Calcular position size dinámico
+        position_size, capital = _open_position(capital, entry_price, atr2[e], strength[e], max_risk_per_trade)
+        marks.mark(e, capital)
+
+        # Salida: stop loss (se comprueba antes que la señal en la misma vela) o SELL
+        k = bisect_right(sells, e)
+        s = sells[k] if k < len(sells) else n
+        j = _first_stop_hit(close, atr2, entry_price, e + 1, min(s + 1, n))
+
+        if j >= 0:
+            stop_price = entry_price - atr2[j]
+            exit_price = stop_price * (1 - SLIPPAGE)
+            capital, pnl = _close_position(capital, entry_price, exit_price, position_size)
+            ledger.append(e, j, entry_price, exit_price, position_size, pnl, REASON_STOP_LOSS)
+            marks.mark(j, capital)
+            i = j  # ya sin posición: puede reentrar en la misma vela
+        elif s < n:
+            exit_price = close[s] * (1 - SLIPPAGE)
+            capital, pnl = _close_position(capital, entry_price, exit_price, position_size)
+            ledger.append(e, s, entry_price, exit_price, position_size, pnl, REASON_SIGNAL)
+            marks.mark(s, capital)
+            i = s + 1
+        else:
+            break  # posición abierta al final de la serie
+
+    return capital, marks.equity(n, initial_capital), ledger
+
+
+def load_fine_candles(source):
+    """
+    Velas de menor timeframe (p.ej. data/BTCUSDC_1m.csv) como arrays para resolver
+    stops dentro de la vela: (ts int64 ns, open, high, low), ordenadas por tiempo.
+    `source` puede ser una ruta CSV o un DataFrame con timestamp/open/high/low.
+    """
+    df = pd.read_csv(source) if isinstance(source, str) else source
+    ts = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
+    ok = ts.notna().to_numpy()
+    order = np.argsort(ts.to_numpy(dtype="datetime64[ns]")[ok].astype(np.int64), kind="stable")
+    pick = lambda c: df[c].to_numpy(dtype=np.float64)[ok][order]
+    return (ts.to_numpy(dtype="datetime64[ns]")[ok].astype(np.int64)[order],
+            pick("open"), pick("high"), pick("low"))
+
+
+def _first_touch(low, high, stop, target, lo, hi):
+    """Primera vela j ∈ [lo, hi) con low <= stop o high >= target (-1 si no hay)."""
+    step = 64
+    while lo < hi:
+        top = min(hi, lo + step)
+        hit = np.flatnonzero((low[lo:top] <= stop) | (high[lo:top] >= target))
+        if hit.size:
+            return lo + int(hit[0])
+        lo = top
+        step *= 2
+    return -1
+
+
+def _bar_fill(o, h, l, stop, target):
+    """
+    Resolución dentro de una vela sin más detalle: si abre más allá de un nivel se
+    rellena a la apertura (gap); si toca ambos, se asume el stop (pesimista).
+    Devuelve (precio, motivo) o None si no toca ninguno.
+    """
+    if o <= stop:
+        return o, REASON_STOP_LOSS
+    if o >= target:
+        return o, REASON_TAKE_PROFIT
+    if l <= stop:
+        return stop, REASON_STOP_LOSS
+    if h >= target:
+        return target, REASON_TAKE_PROFIT
+    return None
+
+
+def _resolve_touched_bar(j, o, h, l, stop, target, ts, fine):
+    """
+    Precio y motivo de salida en la vela j (ya sabemos que toca stop o target).
+    Con velas finas se recorre solo el tramo [ts[j], ts[j+1]) de esa vela.
+    """
+    if fine is not None and ts is not None:
+        f_ts, f_open, f_high, f_low = fine
+        start = ts[j]
+        end = ts[j + 1] if j + 1 < len(ts) else start + (ts[j] - ts[j - 1] if j > 0 else 0)
+        a = np.searchsorted(f_ts, start, side="left")
+        b = np.searchsorted(f_ts, end, side="left")
+        if b > a:
+            k = _first_touch(f_low, f_high, stop, target, a, b)
+            if k >= 0:
+                return _bar_fill(f_open[k], f_high[k], f_low[k], stop, target)
+    return _bar_fill(o[j], h[j], l[j], stop, target)
+
+
+def _risk_backtest_intrabar_core(open_, high, low, close, atr, signal, strength,
+                                 initial_capital, max_risk_per_trade,
+                                 take_profit_atr=None, ts=None, fine=None):
+    """
+    Variante de `_risk_backtest_core` que resuelve stop y take-profit dentro de cada vela:
+    - stop = entrada - 2·ATR(vela de entrada), fijo durante la operación
+    - target = entrada + take_profit_atr·ATR(vela de entrada) (sin target si es None)
+    - la vela que toca un nivel se resuelve con `_bar_fill` o, si hay velas finas,
+      con la primera vela fina que lo toca (solo se leen las de esa vela)
+    La señal SELL se ejecuta al cierre si ningún nivel se tocó antes.
+    """
+    n = len(close)
+    # índices de señales como listas: bisect sobre list es más barato que np.searchsorted escalar
+    buys  = np.flatnonzero(signal == 1).tolist()
+    sells = np.flatnonzero(signal == -1).tolist()
+
+    capital = initial_capital
+    ledger = TradeLedger(capacity=max(16, len(buys) // 2))
+    marks = _EquityMarks()
+
+    i = 0
+    while True:
+        k = bisect_left(buys, i)
+        if k >= len(buys):
+            break
+        e = buys[k]
+        entry_price = close[e] * (1 + SLIPPAGE)
+
+        stop_distance = atr[e] * 2
+        position_size, capital = _open_position(capital, entry_price, stop_distance, strength[e], max_risk_per_trade)
+        marks.mark(e, capital)
+
+        stop = entry_price - stop_distance
+        target = entry_price + take_profit_atr * atr[e] if take_profit_atr else np.inf
+
+        k = bisect_right(sells, e)
+        s = sells[k] if k < len(sells) else n
+        j = _first_touch(low, high, stop, target, e + 1, min(s + 1, n))
+
+        if j >= 0:
+            level, reason = _resolve_touched_bar(j, open_, high, low, stop, target, ts, fine)
+            exit_price = level * (1 - SLIPPAGE)
+            capital, pnl = _close_position(capital, entry_price, exit_price, position_size)
+            ledger.append(e, j, entry_price, exit_price, position_size, pnl, reason)
+            marks.mark(j, capital)
+            i = j  # ya sin posición: puede reentrar al cierre de la misma vela
+        elif s < n:
+            exit_price = close[s] * (1 - SLIPPAGE)
+            capital, pnl = _close_position(capital, entry_price, exit_price, position_size)
+            ledger.append(e, s, entry_price, exit_price, position_size, pnl, REASON_SIGNAL)
+            marks.mark(s, capital)
+            i = s + 1
+        else:
+            break
+
+    return capital, marks.equity(n, initial_capital), ledger
+
+
+def enhanced_backtest_with_risk_management(df, initial_capital=10000, timeframe="1h",
+                                           stop_mode=None, take_profit_atr=None, fine_candles=None):
     """
-    Backtest mejorado con gestión de riesgo dinámica
+    Backtest mejorado con gestión de riesgo dinámica:
+    - Stop loss a 2×ATR bajo la entrada (ATR de la vela evaluada), comprobado al cierre.
+    - Tamaño de posición: riesgo max_risk_per_trade del capital / distancia de stop,
+      ponderado por df['signal_strength'] si existe y limitado al 20% del capital.
+    Con stop_mode="intrabar" (o RISK_STOP_MODE) el stop se fija a la entrada y se evalúa contra
+    high/low, con take-profit opcional a take_profit_atr×ATR; `fine_candles` (ruta CSV o
+    DataFrame de 1m) afina solo las velas que tocan un nivel.
+    Devuelve (df, capital, metrics, ledger); ledger.to_frame() da el DataFrame de operaciones.
     """
     risk_manager = DynamicRiskManager(initial_capital)
     
-    capital = initial_capital
-    position = 0
-    entry_price = 0
-    position_size = 0
-    equity_curve = []
-    trades_log = []
+    close = df['close'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
     
-    FEE = 0.00075
-    SLIPPAGE = 0.0004
+    # ATR (mismo cálculo que DynamicRiskManager.calculate_atr, sin columnas intermedias)
+    true_range = K.true_range(high, low, close)
+    df['ATR'] = pd.Series(true_range, index=df.index).rolling(window=risk_manager.atr_period).mean()
+    atr = df['ATR'].to_numpy(dtype=np.float64)
     
-    # Calcular ATR y position sizes
-    df = risk_manager.calculate_atr(df)
+    signal = df['position'].to_numpy()
+    if 'signal_strength' in df.columns:
+        strength = df['signal_strength'].to_numpy(dtype=np.float64)
+    else:
+        strength = np.ones(len(df))
     
-    for i, row in df.iterrows():
-        price = row['close']
-        signal = row['position']
-        signal_strength = row.get('signal_strength', 1.0)
-        
-        # Salir por stop loss
-        if position != 0:
-            if position > 0:  # Long position
-                stop_price = entry_price - (row['ATR'] * 2)
-                if price <= stop_price:
-                    # Stop loss hit
-                    exit_price = stop_price * (1 - SLIPPAGE)
-                    pnl = (exit_price - entry_price) / entry_price
-                    capital *= (1 + pnl * position_size) * (1 - FEE)
-                    
-                    trades_log.append({
-                        'entry_price': entry_price,
-                        'exit_price': exit_price,
-                        'pnl': pnl,
-                        'reason': 'stop_loss',
-                        'position_size': position_size
-                    })
-                    
-                    position = 0
-                    position_size = 0
-            
-            elif position < 0:  # Short position
-                stop_price = entry_price + (row['ATR'] * 2)
-                if price >= stop_price:
-                    exit_price = stop_price * (1 + SLIPPAGE)
-                    pnl = (entry_price - exit_price) / entry_price
-                    capital *= (1 + pnl * abs(position_size)) * (1 - FEE)
-                    
-                    trades_log.append({
-                        'entry_price': entry_price,
-                        'exit_price': exit_price,
-                        'pnl': pnl,
-                        'reason': 'stop_loss',
-                        'position_size': abs(position_size)
-                    })
-                    
-                    position = 0
-                    position_size = 0
-        
-        # Nuevas señales
-        if signal == 1 and position == 0:  # BUY
-            entry_price = price * (1 + SLIPPAGE)
-            
-            # Calcular position size dinámico
-            stop_distance = row['ATR'] * 2
-            risk_amount = capital * risk_manager.max_risk_per_trade
-            position_size = min(
-                (risk_amount / stop_distance) * signal_strength,
-                (capital * 0.2) / entry_price  # Max 20% of capital
-            )
-            
-            position = 1
-            capital *= (1 - FEE)
-            
-        elif signal == -1 and position == 1:  # SELL
-            exit_price = price * (1 - SLIPPAGE)
-            pnl = (exit_price - entry_price) / entry_price
-            capital *= (1 + pnl * position_size) * (1 - FEE)
-            
-            trades_log.append({
-                'entry_price': entry_price,
-                'exit_price': exit_price,
-                'pnl': pnl,
-                'reason': 'signal',
-                'position_size': position_size
-            })
-            
-            position = 0
-            position_size = 0
-        
-        equity_curve.append(capital)
+    stop_mode = stop_mode or RISK_STOP_MODE
+    if stop_mode == "intrabar":
+        fine = load_fine_candles(fine_candles) if fine_candles is not None else None
+        ts = None
+        if fine is not None and 'timestamp' in df.columns:
+            ts = pd.to_datetime(df['timestamp'], utc=True).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        capital, equity_curve, ledger = _risk_backtest_intrabar_core(
+            df['open'].to_numpy(dtype=np.float64), high, low, close, atr, signal, strength,
+            initial_capital, risk_manager.max_risk_per_trade,
+            take_profit_atr=take_profit_atr, ts=ts, fine=fine
+        )
+    else:
+        capital, equity_curve, ledger = _risk_backtest_core(
+            close, atr, signal, strength, initial_capital, risk_manager.max_risk_per_trade
+        )
     
     df['equity'] = equity_curve
-    df['returns'] = df['equity'].pct_change().fillna(0)
-    
-    # Métricas mejoradas
-    mean_r = df['returns'].mean()
-    std_r = df['returns'].std()
-    
-    ANNUALIZATION = {
-        "1d": 252, "4h": 24*365/4, "1h": 24*365,
-        "30m": 24*2*365, "15m": 24*4*365, "5m": 24*12*365
-    }
-    
-    ann_factor = ANNUALIZATION.get(timeframe, 252)
-    sharpe_ratio = 0 if std_r == 0 else mean_r / std_r * np.sqrt(ann_factor)
-    
-    rolling_max = df['equity'].cummax()
-    max_drawdown = ((df['equity'] - rolling_max) / rolling_max).min()
-    total_return = df['equity'].iloc[-1] / initial_capital - 1
-    
-    # Métricas adicionales
-    trades_df = pd.DataFrame(trades_log)
-    
-    if len(trades_df) > 0:
-        win_rate = len(trades_df[trades_df['pnl'] > 0]) / len(trades_df)
-        avg_win = trades_df[trades_df['pnl'] > 0]['pnl'].mean() if len(trades_df[trades_df['pnl'] > 0]) > 0 else 0
-        avg_loss = trades_df[trades_df['pnl'] < 0]['pnl'].mean() if len(trades_df[trades_df['pnl'] < 0]) > 0 else 0
-        profit_factor = abs(avg_win / avg_loss) if avg_loss != 0 else float('inf') if avg_win > 0 else 0
+    if np.isfinite(equity_curve).all():
+        # caso normal: métricas sobre el array de equity (sin Series intermedias)
+        df['returns'] = equity_returns(equity_curve)
+        curve_metrics = equity_metrics(equity_curve, initial_capital, timeframe)
+        total_return = curve_metrics['total_return']
+        sharpe_ratio = curve_metrics['sharpe_ratio']
+        max_drawdown = curve_metrics['max_drawdown']
     else:
-        win_rate = 0
-        avg_win = 0
-        avg_loss = 0
-        profit_factor = 0
+        # equity con NaN (entrada antes de que exista el ATR): semántica pandas de siempre,
+        # pct_change/mean/std/cummax ignoran los NaN
+        df['returns'] = df['equity'].pct_change().fillna(0)
+        mean_r = df['returns'].mean()
+        std_r = df['returns'].std()
+        ann_factor = ANNUALIZATION.get(timeframe, 252)
+        sharpe_ratio = 0 if std_r == 0 else mean_r / std_r * np.sqrt(ann_factor)
+
+        rolling_max = df['equity'].cummax()
+        max_drawdown = ((df['equity'] - rolling_max) / rolling_max).min()
+        total_return = df['equity'].iloc[-1] / initial_capital - 1
+    
+    # Métricas adicionales (una pasada sobre el ledger)
+    trade_stats = ledger.stats()
     
     metrics = {
         'total_return': total_return,
         'sharpe_ratio': sharpe_ratio,
         'max_drawdown': max_drawdown,
-        'win_rate': win_rate,
-        'profit_factor': profit_factor,
-        'total_trades': len(trades_df),
-        'avg_win': avg_win,
-        'avg_loss': avg_loss
+        'win_rate': trade_stats['win_rate'],
+        'profit_factor': trade_stats['profit_factor'],
+        'total_trades': trade_stats['total_trades'],
+        'avg_win': trade_stats['avg_win'],
+        'avg_loss': trade_stats['avg_loss']
     }
     
-    return df, capital, metrics, trades_df
+    return df, capital, metrics, ledger
@@ -3,27 +3,18 @@
 from src.strategy_selector import select_best_strategy
 from src.backtest import backtest_signals
 from src.binance_api import get_historical_data
-from src.strategy import moving_average_crossover, rsi_sma_strategy, macd_strategy
-import matplotlib.pyplot as plt
-import os
+from src.strategy.registry import get_strategy
+from src.charts import equity_chart
 
 def run_best_strategy():
-    best = select_best_strategy()
-    strategy = best["strategy"]
-    params = best["params"]
+    strategy, _, params, _ = select_best_strategy()
+    spec = get_strategy(strategy)
 
     # Obtener datos reales
     df = get_historical_data(symbol='BTC/USDT', timeframe='1h', limit=500)
 
     # Aplicar estrategia con sus parámetros óptimos
-    if strategy == "moving_average":
-        df = moving_average_crossover(df, **params)
-    elif strategy == "rsi_sma":
-        df = rsi_sma_strategy(df, **params)
-    elif strategy == "macd":
-        df = macd_strategy(df, **params)
-    else:
-        raise ValueError(f"Estrategia no reconocida: {strategy}")
+    df = spec.apply(df, params)
 
     # Backtest
     df, final_capital, metrics = backtest_signals(df)
@@ -37,16 +28,8 @@ def run_best_strategy():
     print(f"⚖️ Sharpe Ratio: {metrics['sharpe_ratio']:.2f}")
 
     # Guardar gráfico
-    os.makedirs("results", exist_ok=True)
-    plt.figure(figsize=(12, 6))
-    plt.plot(df["timestamp"], df["equity"], label="Equity Curve")
-    plt.title(f"Backtest: {strategy}")
-    plt.xlabel("Fecha")
-    plt.ylabel("Capital ($)")
-    plt.legend()
-    plt.grid()
-    plt.tight_layout()
-    plt.savefig("results/run_best_equity_curve.png")
+    equity_chart("results/run_best_equity_curve.png", df["timestamp"], df["equity"],
+                 title=f"Backtest: {strategy}", label="Equity Curve", figsize=(12, 6))
     print("✅ Gráfico guardado en: results/run_best_equity_curve.png")
 
 if __name__ == "__main__":
@@ -1,16 +1,27 @@
 # src/strategy/__init__.py
+import numpy as np
 
-def moving_average_crossover(df, short_window=20, long_window=50):
-    df['SMA20'] = df['close'].rolling(window=short_window).mean()
-    df['SMA50'] = df['close'].rolling(window=long_window).mean()
-    
-    df['signal'] = 0
-    df.loc[df.index[short_window:], 'signal'] = (
-        df['SMA20'][short_window:] > df['SMA50'][short_window:]
-    ).astype(int)
-
-    df['position'] = df['signal'].diff()
-    return df
+from .frames import frame_output
+from .base import OHLCV, StrategyResult, requested, select_indicators, legacy_frame
+
+
+def moving_average_arrays(data: OHLCV, short_window=20, long_window=50, indicators=None):
+    sma20 = data.sma(short_window)
+    sma50 = data.sma(long_window)
+
+    signal = np.zeros(len(data), dtype=np.int8)
+    signal[short_window:] = sma20[short_window:] > sma50[short_window:]
+
+    position = np.zeros(len(data), dtype=np.int8)
+    position[1:] = np.diff(signal)
+    return StrategyResult(position, indicators=select_indicators(indicators, dict(
+        SMA20=sma20, SMA50=sma50, signal=signal)))
+
+
+@frame_output
+def moving_average_crossover(df, short_window=20, long_window=50, columns=None):
+    return legacy_frame(df, moving_average_arrays(OHLCV.from_frame(df), short_window, long_window,
+                                                  indicators=requested(columns)), columns)
 
 # 👇 Importa otras estrategias para exponerlas al paquete
 from .rsi_sma import rsi_sma_strategy
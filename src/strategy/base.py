@@ -0,0 +1,157 @@
+# src/strategy/base.py
+# -*- coding: utf-8 -*-
+"""
+Convención común de llamada de las estrategias (sin copias ni mutación del df del llamador):
+
+    data = OHLCV.from_frame(df)                        # una vez por dataset: arrays de solo lectura
+    res = hybrid_trading_arrays(data, **params)        # StrategyResult: position (+ indicadores)
+    frame = res.frame(data, columns=BACKTEST_COLUMNS)  # DataFrame nuevo solo si el backtest lo pide
+
+Las versiones `<estrategia>_arrays(data, ..., indicators=None)` leen arrays que no se pueden
+escribir y devuelven un StrategyResult nuevo; `indicators` elige qué indicadores adjuntar
+(None → ninguno, True → todos, o una lista de nombres). Los indicadores que solo dependen
+de un periodo (EMA, RSI, bandas...) se memorizan en `data.cache`, así que un grid sobre el
+mismo OHLCV los calcula una vez por periodo.
+
+Las funciones clásicas df → df (hybrid_trading_strategy, ...) son envoltorios sobre estas:
+devuelven un DataFrame nuevo con las columnas de siempre y ya no tocan el df recibido.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.strategy import kernels as K
+from src.strategy.frames import shape_frame
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def _readonly(values) -> np.ndarray:
+    arr = np.asarray(values)
+    if arr.flags.writeable:
+        arr = arr.view()
+        arr.flags.writeable = False
+    return arr
+
+
+def cached(cache: dict, key, compute) -> np.ndarray:
+    """cache[key] (calculándolo con compute() la primera vez) como array de solo lectura."""
+    value = cache.get(key)
+    if value is None:
+        value = cache[key] = _readonly(compute())
+    return value
+
+
+class OHLCV:
+    """Velas como arrays float64 de solo lectura + caché de indicadores por dataset."""
+
+    __slots__ = ("timestamp", "open", "high", "low", "close", "volume", "index", "cache")
+
+    def __init__(self, close, open=None, high=None, low=None, volume=None, timestamp=None, index=None):
+        self.close = _readonly(K.as_array(close))
+        n = len(self.close)
+        self.open = _readonly(K.as_array(open)) if open is not None else self.close
+        self.high = _readonly(K.as_array(high)) if high is not None else self.close
+        self.low = _readonly(K.as_array(low)) if low is not None else self.close
+        self.volume = _readonly(K.as_array(volume)) if volume is not None else _readonly(np.zeros(n))
+        self.timestamp = timestamp
+        self.index = index if index is not None else pd.RangeIndex(n)
+        self.cache = {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "OHLCV":
+        """Vistas de las columnas de df (sin copia si ya son float64); df no se modifica."""
+        cols = {c: df[c].to_numpy(dtype=np.float64) for c in PRICE_COLUMNS if c in df.columns}
+        ts = df["timestamp"].to_numpy() if "timestamp" in df.columns else None
+        return cls(timestamp=ts, index=df.index, **cols)
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def cached(self, key, compute) -> np.ndarray:
+        """Indicador memorizado por clave (p.ej. ("ema", 12, True)); se guarda de solo lectura."""
+        return cached(self.cache, key, compute)
+
+    # indicadores compartidos entre estrategias (misma semántica que el pandas original)
+    def ema(self, span: int, adjust: bool = True) -> np.ndarray:
+        return self.cached(("ema", span, adjust), lambda: K.ema(self.close, span, adjust=adjust))
+
+    def sma(self, window: int) -> np.ndarray:
+        return self.cached(("sma", window), lambda: K.rolling_mean(self.close, window))
+
+    def rsi(self, period: int) -> np.ndarray:
+        """RSI de medias simples con rs = gain / loss (loss == 0 → RSI 100, como Series / 0)."""
+        return self.cached(("rsi", period), lambda: K.rsi_sma_style(self.close, period, zero_loss_nan=False))
+
+    def volume_sma(self, window: int) -> np.ndarray:
+        return self.cached(("volume_sma", window), lambda: K.rolling_mean(self.volume, window))
+
+    def pct_change(self, periods: int = 1) -> np.ndarray:
+        def compute():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return self.close / K.shift(self.close, periods) - 1.0
+        return self.cached(("pct_change", periods), compute)
+
+
+class StrategyResult:
+    """Salida de una estrategia: position int8 (1/0/-1), signal_strength opcional e indicadores."""
+
+    __slots__ = ("position", "signal_strength", "indicators")
+
+    def __init__(self, position, signal_strength=None, indicators=None):
+        self.position = position
+        self.signal_strength = signal_strength
+        self.indicators = indicators or {}
+
+    def columns(self) -> dict:
+        out = dict(self.indicators)
+        out["position"] = self.position
+        if self.signal_strength is not None:
+            out["signal_strength"] = self.signal_strength
+        return out
+
+    def frame(self, data: OHLCV, columns=None, compact: bool = None, epoch: bool = None) -> pd.DataFrame:
+        """DataFrame nuevo con timestamp/OHLCV + resultado (solo `columns` si se indican)."""
+        cols = {}
+        if data.timestamp is not None:
+            cols["timestamp"] = data.timestamp
+        for c in PRICE_COLUMNS:
+            cols[c] = getattr(data, c)
+        cols.update(self.columns())
+        if columns is not None:
+            cols = {c: cols[c] for c in columns if c in cols}
+        return shape_frame(pd.DataFrame(cols, index=data.index), compact=compact, epoch=epoch)
+
+
+def requested(columns):
+    """`indicators` para las funciones *_arrays a partir del `columns` de frame_output."""
+    return True if columns is None else list(columns)
+
+
+def wants(indicators, name: str) -> bool:
+    """True si `indicators` (None / True / lista) pide el indicador `name`."""
+    return indicators is True or bool(indicators) and name in indicators
+
+
+def select_indicators(indicators, values: dict) -> dict:
+    """Filtra los indicadores calculados según el argumento `indicators` de las estrategias."""
+    if not indicators:
+        return {}
+    if indicators is True:
+        return dict(values)
+    return {k: values[k] for k in indicators if k in values}
+
+
+def legacy_frame(df: pd.DataFrame, result: StrategyResult, columns=None) -> pd.DataFrame:
+    """
+    Salida de las funciones df → df: df + columnas del resultado, en un DataFrame nuevo.
+    Con `columns` solo se copian esas columnas (de df o del resultado).
+    """
+    cols = result.columns()
+    cols["position"] = np.asarray(result.position, dtype=np.int64)
+    if columns is not None:
+        cols = {c: cols[c] for c in columns if c in cols}
+        df = df[[c for c in columns if c in df.columns and c not in cols]]
+    new = pd.DataFrame(cols, index=df.index)
+    keep = df.drop(columns=[c for c in cols if c in df.columns])
+    return pd.concat([keep, new], axis=1)
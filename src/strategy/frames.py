@@ -0,0 +1,128 @@
+# src/strategy/frames.py
+# -*- coding: utf-8 -*-
+"""
+Huella de memoria de los DataFrames de estrategia.
+
+Cada estrategia añade 10–30 columnas de indicadores (float64), booleanas y un 'reason'
+de texto al mismo DataFrame. En modo compacto (COMPACT_FRAMES=1 o compact=True):
+  - indicadores float64 → float32 (OHLCV y signal_strength siguen en float64: entran
+    en el cálculo de precios y tamaños del backtest y deben dar el mismo resultado)
+  - señales enteras (position, signal, ...) → int8 si caben
+  - texto repetido ('reason') → category
+  - timestamps de texto → datetime64[ns, UTC]; con epoch=True → int64 (ns desde epoch)
+
+Las estrategias decoradas con @frame_output aceptan además `columns=[...]` para devolver
+solo esas columnas (las que existan), p.ej. lo que necesita el backtest en un grid, y
+`epoch=True` (o FRAME_EPOCH=1) para devolver el timestamp como int64. Si la estrategia
+declara `columns` en su firma se le pasa tal cual, y los indicadores no pedidos (y los
+textos de 'reason') ni siquiera se construyen.
+"""
+
+import os
+import inspect
+import functools
+
+import numpy as np
+import pandas as pd
+
+COMPACT_FRAMES = os.getenv("COMPACT_FRAMES", "False").strip().lower() in ("1", "true", "yes", "on")
+FRAME_EPOCH    = os.getenv("FRAME_EPOCH", "False").strip().lower() in ("1", "true", "yes", "on")
+
+# columnas que se mantienen en float64 (precios/volumen y tamaño de posición)
+FLOAT64_COLUMNS = ("open", "high", "low", "close", "volume", "signal_strength")
+
+# lo mínimo que necesitan backtest_signals / enhanced_backtest_with_risk_management
+BACKTEST_COLUMNS = ("timestamp", "open", "high", "low", "close", "position", "signal_strength")
+
+
+def compact_frame(df: pd.DataFrame, epoch: bool = False, keep_float64=FLOAT64_COLUMNS) -> pd.DataFrame:
+    """Devuelve df con dtypes compactos (ver cabecera). No modifica df."""
+    if df is None or df.empty:
+        return df
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        dtype = s.dtype
+        if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+            out[col] = s
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            out[col] = _epoch(s) if epoch else s
+        elif pd.api.types.is_integer_dtype(dtype):
+            out[col] = s.astype(np.int8) if _fits_int8(s.to_numpy()) else s
+        elif pd.api.types.is_float_dtype(dtype):
+            if col in keep_float64:
+                out[col] = s
+            else:
+                values = s.to_numpy()
+                integral = np.isfinite(values).all() and np.array_equal(values, np.round(values))
+                out[col] = s.astype(np.int8) if integral and _fits_int8(values) else s.astype(np.float32)
+        elif col == "timestamp":
+            ts = pd.to_datetime(s, utc=True, errors="coerce")
+            out[col] = _epoch(ts) if epoch else ts
+        elif dtype == object and s.nunique(dropna=False) <= max(1, len(s) // 2):
+            out[col] = s.astype("category")
+        else:
+            out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def _fits_int8(values: np.ndarray) -> bool:
+    return len(values) == 0 or (values.min() >= -128 and values.max() <= 127)
+
+
+def _epoch(s: pd.Series) -> pd.Series:
+    """datetime64 → int64 ns desde epoch (NaT → mínimo de int64, como pandas)."""
+    if getattr(s.dt, "tz", None) is not None:
+        s = s.dt.tz_convert("UTC").dt.tz_localize(None)
+    return s.astype("int64")
+
+
+def epoch_timestamps(df: pd.DataFrame) -> pd.DataFrame:
+    """Columna 'timestamp' → int64 ns desde epoch (el resto de columnas sin tocar)."""
+    if df is None or "timestamp" not in df.columns or pd.api.types.is_integer_dtype(df["timestamp"].dtype):
+        return df
+    ts = df["timestamp"]
+    if not pd.api.types.is_datetime64_any_dtype(ts.dtype):
+        ts = pd.to_datetime(ts, utc=True, errors="coerce")
+    return df.assign(timestamp=_epoch(ts))
+
+
+def shape_frame(df: pd.DataFrame, columns=None, compact: bool = None, epoch: bool = None) -> pd.DataFrame:
+    """
+    Selección de columnas + compactación opcional (compact=None → COMPACT_FRAMES)
+    + timestamp int64 opcional (epoch=None → FRAME_EPOCH).
+    """
+    if df is None:
+        return df
+    epoch = FRAME_EPOCH if epoch is None else epoch
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    if COMPACT_FRAMES if compact is None else compact:
+        df = compact_frame(df, epoch=epoch)
+    elif epoch:
+        df = epoch_timestamps(df)
+    return df
+
+
+def frame_output(fn):
+    """
+    Decorador de estrategias df → df: añade los kwargs `columns`, `compact` y `epoch`.
+    Sin ellos (y con COMPACT_FRAMES/FRAME_EPOCH desactivados) la salida es la de siempre.
+    """
+    takes_columns = "columns" in inspect.signature(fn).parameters
+
+    @functools.wraps(fn)
+    def wrapper(df, *args, columns=None, compact=None, epoch=None, **kwargs):
+        if takes_columns:
+            kwargs["columns"] = columns
+        out = fn(df, *args, **kwargs)
+        if (columns is None and not (COMPACT_FRAMES if compact is None else compact)
+                and not (FRAME_EPOCH if epoch is None else epoch)):
+            return out
+        return shape_frame(out, columns=columns, compact=compact, epoch=epoch)
+    return wrapper
+
+
+def frame_memory(df: pd.DataFrame) -> int:
+    """Bytes del DataFrame (incluye el contenido de columnas object)."""
+    return int(df.memory_usage(deep=True).sum())
@@ -1,247 +1,239 @@
 # src/strategy/hybrid_strategy.py
 import pandas as pd
 import numpy as np
+from src.strategy import kernels as K
+from src.strategy.base import OHLCV, StrategyResult, requested, select_indicators, legacy_frame
+from src.strategy.frames import frame_output
 
-def hybrid_trading_strategy(df, 
+
+def hybrid_trading_arrays(data: OHLCV,
                           # Parámetros más agresivos para generar más señales
                           macd_short=8, macd_long=21, macd_signal=5,
                           rsi_period=12, rsi_oversold=40, rsi_overbought=60,
                           bb_period=18, bb_std=1.8,
                           volume_threshold=0.8,  # Menos restrictivo
-                          trend_ema=50):
+                          trend_ema=50,
+                          indicators=None):
     """
     Estrategia híbrida optimizada que combina múltiples indicadores
-    con parámetros más agresivos para generar más señales de trading
+    con parámetros más agresivos para generar más señales de trading.
+    Versión sobre arrays (ver strategy/base.py); devuelve un StrategyResult.
     """
-    df = df.copy()
-    
+    close = data.close
+
     # === MACD ===
-    df['ema_short'] = df['close'].ewm(span=macd_short).mean()
-    df['ema_long'] = df['close'].ewm(span=macd_long).mean()
-    df['macd'] = df['ema_short'] - df['ema_long']
-    df['macd_signal'] = df['macd'].ewm(span=macd_signal).mean()
-    df['macd_histogram'] = df['macd'] - df['macd_signal']
-    df['macd_bullish'] = df['macd'] > df['macd_signal']
-    df['macd_growing'] = df['macd_histogram'] > df['macd_histogram'].shift(1)
-    
+    ema_short = data.ema(macd_short)
+    ema_long = data.ema(macd_long)
+    macd = data.cached(("macd", macd_short, macd_long), lambda: ema_short - ema_long)
+    macd_sig = data.cached(("macd_signal", macd_short, macd_long, macd_signal),
+                           lambda: K.ema(macd, macd_signal, adjust=True))
+    macd_histogram = macd - macd_sig
+    macd_bullish = macd > macd_sig
+    macd_growing = macd_histogram > K.shift(macd_histogram)
+
     # === RSI ===
-    delta = df['close'].diff()
-    gain = delta.where(delta > 0, 0).rolling(window=rsi_period).mean()
-    loss = -delta.where(delta < 0, 0).rolling(window=rsi_period).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
-    
+    rsi = data.rsi(rsi_period)
+
     # === Bollinger Bands ===
-    df['bb_middle'] = df['close'].rolling(window=bb_period).mean()
-    df['bb_std'] = df['close'].rolling(window=bb_period).std()
-    df['bb_upper'] = df['bb_middle'] + (df['bb_std'] * bb_std)
-    df['bb_lower'] = df['bb_middle'] - (df['bb_std'] * bb_std)
-    df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
-    df['bb_squeeze'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle'] < 0.1  # Bandas estrechas
-    
+    bb_middle = data.sma(bb_period)
+    bb_dev = data.cached(("std", bb_period), lambda: K.rolling_std(close, bb_period))
+    bb_upper = bb_middle + (bb_dev * bb_std)
+    bb_lower = bb_middle - (bb_dev * bb_std)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bb_position = (close - bb_lower) / (bb_upper - bb_lower)
+        bb_squeeze = (bb_upper - bb_lower) / bb_middle < 0.1  # Bandas estrechas
+
     # === Trend Filter ===
-    df['trend_ema'] = df['close'].ewm(span=trend_ema).mean()
-    df['uptrend'] = df['close'] > df['trend_ema']
-    df['trend_strength'] = (df['close'] - df['trend_ema']) / df['trend_ema']
-    
+    trend = data.ema(trend_ema)
+    uptrend = close > trend
+    trend_strength = (close - trend) / trend
+
     # === Volume ===
-    df['volume_sma'] = df['volume'].rolling(window=20).mean()
-    df['volume_ratio'] = df['volume'] / df['volume_sma']
-    df['volume_surge'] = df['volume_ratio'] > volume_threshold
-    
+    volume_sma = data.volume_sma(20)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_ratio = data.volume / volume_sma
+    volume_surge = volume_ratio > volume_threshold
+
     # === Price Action ===
-    df['price_momentum'] = df['close'].pct_change(5)  # 5-period momentum
-    df['volatility'] = df['close'].pct_change().rolling(20).std()
-    
+    price_momentum = data.pct_change(5)  # 5-period momentum
+    volatility = data.cached(("volatility", 20), lambda: K.rolling_std(data.pct_change(1), 20))
+
     # === Señales de Compra (múltiples condiciones) ===
     # Condición 1: MACD bullish momentum
-    buy_condition_1 = (
-        df['macd_bullish'] & 
-        df['macd_growing'] & 
-        (df['rsi'] < rsi_overbought) &
-        df['uptrend']
-    )
-    
+    buy_condition_1 = macd_bullish & macd_growing & (rsi < rsi_overbought) & uptrend
+
     # Condición 2: Oversold bounce
     buy_condition_2 = (
-        (df['rsi'] < rsi_oversold + 5) &
-        (df['bb_position'] < 0.2) &
-        df['volume_surge'] &
-        (df['price_momentum'] > -0.02)  # No está cayendo fuertemente
+        (rsi < rsi_oversold + 5) &
+        (bb_position < 0.2) &
+        volume_surge &
+        (price_momentum > -0.02)  # No está cayendo fuertemente
     )
-    
+
     # Condición 3: Breakout pattern
     buy_condition_3 = (
-        (df['close'] > df['bb_upper'].shift(1)) &  # Rompe banda superior
-        df['volume_surge'] &
-        df['uptrend'] &
-        (df['rsi'] > 45) & (df['rsi'] < 75)
+        (close > K.shift(bb_upper)) &  # Rompe banda superior
+        volume_surge &
+        uptrend &
+        (rsi > 45) & (rsi < 75)
     )
-    
+
     # Condición 4: Trend continuation
     buy_condition_4 = (
-        df['uptrend'] &
-        (df['trend_strength'] > 0.02) &  # Fuerte tendencia alcista
-        (df['rsi'] > 35) & (df['rsi'] < 65) &
-        df['macd_bullish']
+        uptrend &
+        (trend_strength > 0.02) &  # Fuerte tendencia alcista
+        (rsi > 35) & (rsi < 65) &
+        macd_bullish
     )
-    
+
     # === Señales de Venta ===
     # Condición 1: MACD bearish
-    sell_condition_1 = (
-        ~df['macd_bullish'] &
-        (df['macd_histogram'] < df['macd_histogram'].shift(1))
-    )
-    
+    sell_condition_1 = ~macd_bullish & (macd_histogram < K.shift(macd_histogram))
+
     # Condición 2: Overbought
-    sell_condition_2 = (
-        (df['rsi'] > rsi_overbought) &
-        (df['bb_position'] > 0.8)
-    )
-    
+    sell_condition_2 = (rsi > rsi_overbought) & (bb_position > 0.8)
+
     # Condición 3: Trend reversal
-    sell_condition_3 = (
-        ~df['uptrend'] &
-        (df['trend_strength'] < -0.015)
-    )
-    
+    sell_condition_3 = ~uptrend & (trend_strength < -0.015)
+
     # Condición 4: Stop loss técnico
-    sell_condition_4 = (
-        (df['price_momentum'] < -0.03) &  # Caída fuerte
-        (df['rsi'] < 40)
-    )
-    
+    sell_condition_4 = (price_momentum < -0.03) & (rsi < 40)  # Caída fuerte
+
     # === Combinar señales ===
-    df['buy_signal'] = (
-        buy_condition_1 | buy_condition_2 | 
-        buy_condition_3 | buy_condition_4
-    )
-    
-    df['sell_signal'] = (
-        sell_condition_1 | sell_condition_2 | 
-        sell_condition_3 | sell_condition_4
-    )
-    
+    buy_signal = buy_condition_1 | buy_condition_2 | buy_condition_3 | buy_condition_4
+    sell_signal = sell_condition_1 | sell_condition_2 | sell_condition_3 | sell_condition_4
+
     # === Generar posiciones ===
-    df['position'] = 0
-    df.loc[df['buy_signal'], 'position'] = 1
-    df.loc[df['sell_signal'], 'position'] = -1
-    
+    position = np.zeros(len(close), dtype=np.int8)
+    position[buy_signal] = 1
+    position[sell_signal] = -1
+
     # === Score de confianza ===
-    df['signal_score'] = 0
-    
+    signal_score = np.zeros(len(close))
     # Para señales de compra
-    buy_mask = df['buy_signal']
-    df.loc[buy_mask, 'signal_score'] = (
-        df.loc[buy_mask, 'macd_bullish'].astype(int) * 0.25 +
-        (df.loc[buy_mask, 'rsi'] < rsi_overbought).astype(int) * 0.25 +
-        df.loc[buy_mask, 'uptrend'].astype(int) * 0.25 +
-        df.loc[buy_mask, 'volume_surge'].astype(int) * 0.25
-    )
-    
-    # Para señales de venta  
-    sell_mask = df['sell_signal']
-    df.loc[sell_mask, 'signal_score'] = (
-        (~df.loc[sell_mask, 'macd_bullish']).astype(int) * 0.3 +
-        (df.loc[sell_mask, 'rsi'] > rsi_overbought).astype(int) * 0.3 +
-        (~df.loc[sell_mask, 'uptrend']).astype(int) * 0.4
-    )
-    
+    buy_score = (macd_bullish * 0.25 + (rsi < rsi_overbought) * 0.25 +
+                 uptrend * 0.25 + volume_surge * 0.25)
+    signal_score[buy_signal] = buy_score[buy_signal]
+    # Para señales de venta
+    sell_score = (~macd_bullish) * 0.3 + (rsi > rsi_overbought) * 0.3 + (~uptrend) * 0.4
+    signal_score[sell_signal] = sell_score[sell_signal]
+
     # Filtrar señales de baja confianza
     confidence_threshold = 0.5
-    df.loc[df['signal_score'] < confidence_threshold, 'position'] = 0
-    
-    return df
+    position[signal_score < confidence_threshold] = 0
 
-def scalping_strategy(df, fast_ema=5, slow_ema=15, rsi_period=7):
+    return StrategyResult(position, indicators=select_indicators(indicators, dict(
+        ema_short=ema_short, ema_long=ema_long, macd=macd, macd_signal=macd_sig,
+        macd_histogram=macd_histogram, macd_bullish=macd_bullish, macd_growing=macd_growing,
+        rsi=rsi, bb_middle=bb_middle, bb_std=bb_dev, bb_upper=bb_upper, bb_lower=bb_lower,
+        bb_position=bb_position, bb_squeeze=bb_squeeze, trend_ema=trend, uptrend=uptrend,
+        trend_strength=trend_strength, volume_sma=volume_sma, volume_ratio=volume_ratio,
+        volume_surge=volume_surge, price_momentum=price_momentum, volatility=volatility,
+        buy_signal=buy_signal, sell_signal=sell_signal, signal_score=signal_score,
+    )))
+
+
+def scalping_arrays(data: OHLCV, fast_ema=5, slow_ema=15, rsi_period=7, indicators=None):
     """
-    Estrategia de scalping para timeframes más cortos
+    Estrategia de scalping para timeframes más cortos (versión sobre arrays)
     """
-    df = df.copy()
-    
     # EMAs rápidas
-    df['ema_fast'] = df['close'].ewm(span=fast_ema).mean()
-    df['ema_slow'] = df['close'].ewm(span=slow_ema).mean()
-    
+    ema_fast = data.ema(fast_ema)
+    ema_slow = data.ema(slow_ema)
+
     # RSI corto
-    delta = df['close'].diff()
-    gain = delta.where(delta > 0, 0).rolling(window=rsi_period).mean()
-    loss = -delta.where(delta < 0, 0).rolling(window=rsi_period).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
-    
+    rsi = data.rsi(rsi_period)
+
     # Volume
-    df['volume_sma'] = df['volume'].rolling(window=10).mean()
-    df['volume_spike'] = df['volume'] > df['volume_sma'] * 1.5
-    
+    volume_sma = data.volume_sma(10)
+    volume_spike = data.volume > volume_sma * 1.5
+
     # Momentum
-    df['momentum'] = df['close'].pct_change(3)
-    
-    # Señales
-    df['position'] = 0
-    
+    momentum = data.pct_change(3)
+
     # Buy: EMA cross up + RSI not overbought + volume
+    fast_prev, slow_prev = K.shift(ema_fast), K.shift(ema_slow)
     buy_signal = (
-        (df['ema_fast'] > df['ema_slow']) &
-        (df['ema_fast'].shift(1) <= df['ema_slow'].shift(1)) &  # Cross
-        (df['rsi'] < 70) &
-        df['volume_spike'] &
-        (df['momentum'] > 0)
+        (ema_fast > ema_slow) &
+        (fast_prev <= slow_prev) &  # Cross
+        (rsi < 70) &
+        volume_spike &
+        (momentum > 0)
     )
-    
+
     # Sell: EMA cross down or RSI overbought
     sell_signal = (
-        ((df['ema_fast'] < df['ema_slow']) &
-         (df['ema_fast'].shift(1) >= df['ema_slow'].shift(1))) |  # Cross
-        (df['rsi'] > 80) |
-        (df['momentum'] < -0.01)
+        ((ema_fast < ema_slow) & (fast_prev >= slow_prev)) |  # Cross
+        (rsi > 80) |
+        (momentum < -0.01)
     )
-    
-    df.loc[buy_signal, 'position'] = 1
-    df.loc[sell_signal, 'position'] = -1
-    
-    return df
 
-def momentum_breakout_strategy(df, lookback=20, breakout_threshold=0.02):
+    position = np.zeros(len(data), dtype=np.int8)
+    position[buy_signal] = 1
+    position[sell_signal] = -1
+
+    return StrategyResult(position, indicators=select_indicators(indicators, dict(
+        ema_fast=ema_fast, ema_slow=ema_slow, rsi=rsi, volume_sma=volume_sma,
+        volume_spike=volume_spike, momentum=momentum,
+    )))
+
+
+def momentum_breakout_arrays(data: OHLCV, lookback=20, breakout_threshold=0.02, indicators=None):
     """
-    Estrategia de momentum y breakouts
+    Estrategia de momentum y breakouts (versión sobre arrays)
     """
-    df = df.copy()
-    
+    close = data.close
+
     # Rolling high/low
-    df['rolling_high'] = df['high'].rolling(window=lookback).max()
-    df['rolling_low'] = df['low'].rolling(window=lookback).min()
-    
+    rolling_high = data.cached(("rolling_high", lookback), lambda: K.rolling_max(data.high, lookback))
+    rolling_low = data.cached(("rolling_low", lookback), lambda: -K.rolling_max(-data.low, lookback))
+
     # Breakout signals
-    df['breakout_up'] = df['close'] > df['rolling_high'].shift(1) * (1 + breakout_threshold)
-    df['breakout_down'] = df['close'] < df['rolling_low'].shift(1) * (1 - breakout_threshold)
-    
+    breakout_up = close > K.shift(rolling_high) * (1 + breakout_threshold)
+    breakout_down = close < K.shift(rolling_low) * (1 - breakout_threshold)
+
     # Volume confirmation
-    df['volume_sma'] = df['volume'].rolling(window=20).mean()
-    df['high_volume'] = df['volume'] > df['volume_sma'] * 1.2
-    
+    volume_sma = data.volume_sma(20)
+    high_volume = data.volume > volume_sma * 1.2
+
     # Momentum
-    df['momentum'] = df['close'].pct_change(5)
-    df['strong_momentum'] = abs(df['momentum']) > 0.015
-    
-    # Signals
-    df['position'] = 0
-    
+    momentum = data.pct_change(5)
+    strong_momentum = np.abs(momentum) > 0.015
+
     # Buy on upward breakout with volume and momentum
-    buy_signal = (
-        df['breakout_up'] &
-        df['high_volume'] &
-        df['strong_momentum'] &
-        (df['momentum'] > 0)
-    )
-    
+    buy_signal = breakout_up & high_volume & strong_momentum & (momentum > 0)
+
     # Sell on downward breakout or momentum reversal
-    sell_signal = (
-        df['breakout_down'] |
-        ((df['momentum'] < -0.02) & df['strong_momentum'])
-    )
-    
-    df.loc[buy_signal, 'position'] = 1
-    df.loc[sell_signal, 'position'] = -1
-    
-    return df
+    sell_signal = breakout_down | ((momentum < -0.02) & strong_momentum)
+
+    position = np.zeros(len(close), dtype=np.int8)
+    position[buy_signal] = 1
+    position[sell_signal] = -1
+
+    return StrategyResult(position, indicators=select_indicators(indicators, dict(
+        rolling_high=rolling_high, rolling_low=rolling_low, breakout_up=breakout_up,
+        breakout_down=breakout_down, volume_sma=volume_sma, high_volume=high_volume,
+        momentum=momentum, strong_momentum=strong_momentum,
+    )))
+
+
+# ---------------- API clásica df → df ----------------
+@frame_output
+def hybrid_trading_strategy(df, *args, columns=None, **params):
+    """Envoltorio de hybrid_trading_arrays: DataFrame nuevo con todos los indicadores (o solo `columns`)."""
+    result = hybrid_trading_arrays(OHLCV.from_frame(df), *args, indicators=requested(columns), **params)
+    return legacy_frame(df, result, columns)
+
+
+@frame_output
+def scalping_strategy(df, fast_ema=5, slow_ema=15, rsi_period=7, columns=None):
+    """Envoltorio de scalping_arrays."""
+    return legacy_frame(df, scalping_arrays(OHLCV.from_frame(df), fast_ema, slow_ema, rsi_period,
+                                            indicators=requested(columns)), columns)
+
+
+@frame_output
+def momentum_breakout_strategy(df, lookback=20, breakout_threshold=0.02, columns=None):
+    """Envoltorio de momentum_breakout_arrays."""
+    return legacy_frame(df, momentum_breakout_arrays(OHLCV.from_frame(df), lookback, breakout_threshold,
+                                                     indicators=requested(columns)), columns)
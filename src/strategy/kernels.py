@@ -0,0 +1,153 @@
+# src/strategy/kernels.py
+# -*- coding: utf-8 -*-
+"""
+Primitivas NumPy para indicadores sobre arrays 1-D (sin DataFrame).
+
+Replican la semántica de pandas que usan las estrategias:
+  - rolling_mean(x, w)          ≈ Series.rolling(w, min_periods=w).mean()
+  - rolling_min(x, w)           ≈ Series.rolling(w, min_periods=1).min()  (ignora NaN)
+  - ema(x, span, adjust=...)    ≈ Series.ewm(span=span, adjust=...).mean()
+  - true_range(high, low, close)≈ concat([h-l, |h-c₋₁|, |l-c₋₁|]).max(axis=1)
+
+Las diferencias con pandas son de redondeo (~1e-12 relativo).
+"""
+
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def as_array(x) -> np.ndarray:
+    """Vista float64 contigua (sin copia si ya lo es)."""
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def shift(x: np.ndarray, n: int = 1, fill=np.nan) -> np.ndarray:
+    out = np.empty_like(x, dtype=np.float64)
+    if n <= 0:
+        out[:] = x
+        return out
+    out[:n] = fill
+    out[n:] = x[:-n]
+    return out
+
+
+def diff(x: np.ndarray) -> np.ndarray:
+    out = np.empty_like(x, dtype=np.float64)
+    out[0] = np.nan
+    np.subtract(x[1:], x[:-1], out=out[1:])
+    return out
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Media móvil con min_periods=window (entrada sin NaN)."""
+    n = len(x)
+    out = np.full(n, np.nan)
+    if window <= 0 or n < window:
+        return out
+    out[window - 1:] = sliding_window_view(x, window).mean(axis=1)
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """Desviación típica móvil (ddof=1 como pandas) con min_periods=window."""
+    n = len(x)
+    out = np.full(n, np.nan)
+    if window <= ddof or n < window:
+        return out
+    out[window - 1:] = sliding_window_view(x, window).std(axis=1, ddof=ddof)
+    return out
+
+
+def rolling_min(x: np.ndarray, window: int) -> np.ndarray:
+    """Mínimo móvil con min_periods=1 ignorando NaN (NaN si la ventana es toda NaN)."""
+    n = len(x)
+    if n == 0:
+        return np.empty(0)
+    padded = np.empty(n + window - 1)
+    padded[:window - 1] = np.inf
+    padded[window - 1:] = np.where(np.isnan(x), np.inf, x)
+    out = sliding_window_view(padded, window).min(axis=1)
+    out[np.isinf(out)] = np.nan
+    return out
+
+
+def rolling_max(x: np.ndarray, window: int) -> np.ndarray:
+    """Máximo móvil con min_periods=window (entrada sin NaN)."""
+    n = len(x)
+    out = np.full(n, np.nan)
+    if window <= 0 or n < window:
+        return out
+    out[window - 1:] = sliding_window_view(x, window).max(axis=1)
+    return out
+
+
+def _linear_recurrence(b: np.ndarray, r: float, z0: float = 0.0) -> np.ndarray:
+    """
+    z_t = r·z_{t-1} + b_t  resuelto por bloques con potencias de r
+    (sin bucle Python por vela; un bucle por bloque de hasta 128 velas).
+    """
+    n = len(b)
+    out = np.empty(n)
+    if n == 0:
+        return out
+    if r <= 0.0:
+        out[:] = b
+        return out
+    # tamaño de bloque tal que r^-B no desborde ni pierda precisión
+    block = int(max(1, min(128, 300.0 / -math.log(r)))) if r < 1.0 else 128
+    k = np.arange(block)
+    pw = r ** (k + 1)        # r^(k+1)
+    inv = r ** -k            # r^(-k)
+    fwd = r ** k             # r^k
+    prev = z0
+    for start in range(0, n, block):
+        seg = b[start:start + block]
+        m = len(seg)
+        acc = np.cumsum(seg * inv[:m])
+        out[start:start + m] = pw[:m] * prev + fwd[:m] * acc
+        prev = out[start + m - 1]
+    return out
+
+
+def ema(x: np.ndarray, span: int, adjust: bool = False, min_periods: int = 0) -> np.ndarray:
+    """EMA con la misma definición que pandas.ewm(span=…, adjust=…) para series sin NaN."""
+    n = len(x)
+    if n == 0:
+        return np.empty(0)
+    alpha = 2.0 / (span + 1.0)
+    r = 1.0 - alpha
+    if adjust:
+        num = _linear_recurrence(x, r)
+        den = _linear_recurrence(np.ones(n), r)
+        out = num / den
+    else:
+        out = np.empty(n)
+        out[0] = x[0]
+        if n > 1:
+            out[1:] = _linear_recurrence(alpha * x[1:], r, z0=x[0])
+    if min_periods > 1:
+        out[:min(n, min_periods - 1)] = np.nan
+    return out
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev = shift(close)
+    tr = np.fmax(high - low, np.abs(high - prev))
+    return np.fmax(tr, np.abs(low - prev))
+
+
+def rsi_sma_style(close: np.ndarray, period: int, zero_loss_nan: bool = True) -> np.ndarray:
+    """
+    RSI con medias simples (como las estrategias del repo):
+    gain/loss = rolling(period).mean() de las subidas/bajadas, NaN si loss == 0
+    (con zero_loss_nan=False, división directa como `gain / loss`: RSI 100, o NaN si 0/0).
+    """
+    delta = diff(close)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain = rolling_mean(gain, period)
+    avg_loss = rolling_mean(loss, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / (np.where(avg_loss == 0, np.nan, avg_loss) if zero_loss_nan else avg_loss)
+        return 100.0 - (100.0 / (1.0 + rs))
@@ -1,15 +1,26 @@
 # src/strategy/macd.py
 
-import pandas as pd
+import numpy as np
+from src.strategy import kernels as K
+from src.strategy.base import OHLCV, StrategyResult, requested, select_indicators, legacy_frame
+from src.strategy.frames import frame_output
 
-def macd_strategy(df, short_ema=12, long_ema=26, signal_ema=9):
-    df['EMA12'] = df['close'].ewm(span=short_ema, adjust=False).mean()
-    df['EMA26'] = df['close'].ewm(span=long_ema, adjust=False).mean()
-    df['MACD'] = df['EMA12'] - df['EMA26']
-    df['Signal'] = df['MACD'].ewm(span=signal_ema, adjust=False).mean()
 
-    df['position'] = 0
-    df.loc[df['MACD'] > df['Signal'], 'position'] = 1
-    df.loc[df['MACD'] < df['Signal'], 'position'] = -1
+def macd_arrays(data: OHLCV, short_ema=12, long_ema=26, signal_ema=9, indicators=None):
+    ema12 = data.ema(short_ema, adjust=False)
+    ema26 = data.ema(long_ema, adjust=False)
+    macd = ema12 - ema26
+    signal = K.ema(macd, signal_ema, adjust=False)
 
-    return df
+    position = np.zeros(len(data), dtype=np.int8)
+    position[macd > signal] = 1
+    position[macd < signal] = -1
+
+    return StrategyResult(position, indicators=select_indicators(indicators, dict(
+        EMA12=ema12, EMA26=ema26, MACD=macd, Signal=signal)))
+
+
+@frame_output
+def macd_strategy(df, short_ema=12, long_ema=26, signal_ema=9, columns=None):
+    return legacy_frame(df, macd_arrays(OHLCV.from_frame(df), short_ema, long_ema, signal_ema,
+                                        indicators=requested(columns)), columns)
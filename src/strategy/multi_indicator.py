@@ -1,119 +1,133 @@
 # src/strategy/multi_indicator.py
 import pandas as pd
 import numpy as np
+from src.strategy import kernels as K
+from src.strategy.base import OHLCV, StrategyResult, requested, select_indicators, legacy_frame
+from src.strategy.frames import frame_output
 
-def multi_indicator_strategy(df, 
+
+def multi_indicator_arrays(data: OHLCV,
                            # MACD params
                            macd_short=12, macd_long=26, macd_signal=9,
-                           # RSI params  
+                           # RSI params
                            rsi_period=14, rsi_oversold=30, rsi_overbought=70,
                            # Bollinger Bands params
                            bb_period=20, bb_std=2,
                            # Volume filter
-                           volume_ma_period=20, volume_threshold=1.2):
+                           volume_ma_period=20, volume_threshold=1.2,
+                           indicators=None):
     """
     Estrategia híbrida que combina MACD, RSI, Bandas de Bollinger y filtro de volumen
-    
+    (versión sobre arrays, ver strategy/base.py; devuelve un StrategyResult)
+
     Señales de compra:
     - MACD > Signal line
     - RSI < 70 (no sobrecomprado)
     - Precio cerca del límite inferior de Bollinger
     - Volumen > promedio * threshold
-    
+
     Señales de venta:
     - MACD < Signal line
-    - RSI > 30 (no sobrevendido)  
+    - RSI > 30 (no sobrevendido)
     - Precio cerca del límite superior de Bollinger
     """
-    
+    close = data.close
+    n = len(close)
+
     # MACD Calculation
-    df['EMA_short'] = df['close'].ewm(span=macd_short).mean()
-    df['EMA_long'] = df['close'].ewm(span=macd_long).mean()
-    df['MACD'] = df['EMA_short'] - df['EMA_long']
-    df['MACD_signal'] = df['MACD'].ewm(span=macd_signal).mean()
-    df['MACD_histogram'] = df['MACD'] - df['MACD_signal']
-    
+    ema_short = data.ema(macd_short)
+    ema_long = data.ema(macd_long)
+    macd = data.cached(("macd", macd_short, macd_long), lambda: ema_short - ema_long)
+    macd_sig = data.cached(("macd_signal", macd_short, macd_long, macd_signal),
+                           lambda: K.ema(macd, macd_signal, adjust=True))
+    macd_histogram = macd - macd_sig
+
     # RSI Calculation
-    delta = df['close'].diff()
-    gain = delta.where(delta > 0, 0).rolling(window=rsi_period).mean()
-    loss = -delta.where(delta < 0, 0).rolling(window=rsi_period).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    
+    rsi = data.rsi(rsi_period)
+
     # Bollinger Bands
-    df['BB_middle'] = df['close'].rolling(window=bb_period).mean()
-    df['BB_std'] = df['close'].rolling(window=bb_period).std()
-    df['BB_upper'] = df['BB_middle'] + (df['BB_std'] * bb_std)
-    df['BB_lower'] = df['BB_middle'] - (df['BB_std'] * bb_std)
-    df['BB_position'] = (df['close'] - df['BB_lower']) / (df['BB_upper'] - df['BB_lower'])
-    
+    bb_middle = data.sma(bb_period)
+    bb_dev = data.cached(("std", bb_period), lambda: K.rolling_std(close, bb_period))
+    bb_upper = bb_middle + (bb_dev * bb_std)
+    bb_lower = bb_middle - (bb_dev * bb_std)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bb_position = (close - bb_lower) / (bb_upper - bb_lower)
+
     # Volume Filter
-    df['volume_ma'] = df['volume'].rolling(window=volume_ma_period).mean()
-    df['volume_ratio'] = df['volume'] / df['volume_ma']
-    
+    volume_ma = data.volume_sma(volume_ma_period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_ratio = data.volume / volume_ma
+
     # Signal Generation
-    df['position'] = 0
-    df['signal_strength'] = 0.0
-    
+    position = np.zeros(n, dtype=np.int8)
+    signal_strength = np.zeros(n)
+    values = dict(
+        EMA_short=ema_short, EMA_long=ema_long, MACD=macd, MACD_signal=macd_sig,
+        MACD_histogram=macd_histogram, RSI=rsi, BB_middle=bb_middle, BB_std=bb_dev,
+        BB_upper=bb_upper, BB_lower=bb_lower, BB_position=bb_position,
+        volume_ma=volume_ma, volume_ratio=volume_ratio,
+    )
+
     # Ensure we have enough data
-    if len(df) < max(bb_period, rsi_period, volume_ma_period) + 1:
-        return df
-    
+    if n < max(bb_period, rsi_period, volume_ma_period) + 1:
+        return StrategyResult(position, signal_strength, select_indicators(indicators, values))
+
+    valid = ~np.isnan(macd) & ~np.isnan(rsi) & ~np.isnan(bb_position)  # Asegurar datos válidos
+
     # Buy signals (estrategia menos restrictiva)
     buy_conditions = (
-        (df['MACD'] > df['MACD_signal']) &  # MACD bullish
-        (df['RSI'] < rsi_overbought) &      # No sobrecomprado
+        (macd > macd_sig) &            # MACD bullish
+        (rsi < rsi_overbought) &       # No sobrecomprado
         (
             # Al menos UNA de estas condiciones debe cumplirse:
-            (df['BB_position'] < 0.5) |     # Precio en mitad inferior de BB
-            (df['volume_ratio'] > volume_threshold) |  # Volumen alto
-            (df['MACD_histogram'] > df['MACD_histogram'].shift(1))  # MACD creciendo
+            (bb_position < 0.5) |      # Precio en mitad inferior de BB
+            (volume_ratio > volume_threshold) |  # Volumen alto
+            (macd_histogram > K.shift(macd_histogram))  # MACD creciendo
         ) &
-        (df['MACD'].notna()) &              # Asegurar datos válidos
-        (df['RSI'].notna()) &
-        (df['BB_position'].notna()) &
-        (df['volume_ratio'].notna())
+        valid &
+        ~np.isnan(volume_ratio)
     )
-    
+
     # Sell signals
     sell_conditions = (
-        (df['MACD'] < df['MACD_signal']) &  # MACD bearish
-        (df['RSI'] > rsi_oversold) &        # No sobrevendido
-        (df['BB_position'] > 0.7) &         # Cerca del límite superior BB
-        (df['MACD'].notna()) &              # Asegurar datos válidos
-        (df['RSI'].notna()) &
-        (df['BB_position'].notna())
+        (macd < macd_sig) &            # MACD bearish
+        (rsi > rsi_oversold) &         # No sobrevendido
+        (bb_position > 0.7) &          # Cerca del límite superior BB
+        valid
     )
-    
+
     # Apply signals only where conditions are met
-    df.loc[buy_conditions, 'position'] = 1
-    df.loc[sell_conditions, 'position'] = -1
-    
+    position[buy_conditions] = 1
+    position[sell_conditions] = -1
+
     # Añadir señales de confianza
     if buy_conditions.any():
-        signal_strength_values = (
-            abs(df.loc[buy_conditions, 'MACD'] - df.loc[buy_conditions, 'MACD_signal']) * 0.3 +
-            (rsi_overbought - df.loc[buy_conditions, 'RSI']) * 0.3 +
-            (0.3 - df.loc[buy_conditions, 'BB_position']) * 0.2 +
-            (df.loc[buy_conditions, 'volume_ratio'] - volume_threshold) * 0.2
+        b = buy_conditions
+        signal_strength[b] = (
+            np.abs(macd[b] - macd_sig[b]) * 0.3 +
+            (rsi_overbought - rsi[b]) * 0.3 +
+            (0.3 - bb_position[b]) * 0.2 +
+            (volume_ratio[b] - volume_threshold) * 0.2
         )
-        df.loc[buy_conditions, 'signal_strength'] = signal_strength_values
-    
-    return df
 
-def adaptive_multi_strategy(df, **kwargs):
+    return StrategyResult(position, signal_strength, select_indicators(indicators, values))
+
+
+def adaptive_params(data: OHLCV, **kwargs) -> tuple:
     """
-    Versión adaptativa que ajusta parámetros basándose en la volatilidad del mercado
+    Ajusta los parámetros de multi_indicator según la volatilidad reciente del mercado.
+    Devuelve (kwargs ajustados, returns, volatility).
     """
     # Calcular volatilidad
-    df['returns'] = df['close'].pct_change()
-    df['volatility'] = df['returns'].rolling(window=20).std()
-    volatility_percentile = df['volatility'].rolling(window=100).quantile(0.7)
-    
+    returns = data.pct_change(1)
+    volatility = pd.Series(returns).rolling(window=20).std()
+    volatility_percentile = volatility.rolling(window=100).quantile(0.7)
+
     # Ajustar parámetros según volatilidad
-    current_vol = df['volatility'].iloc[-20:].mean()
+    current_vol = volatility.iloc[-20:].mean()
     vol_threshold = volatility_percentile.iloc[-1] if not pd.isna(volatility_percentile.iloc[-1]) else current_vol
-    
+
+    kwargs = dict(kwargs)
     if current_vol > vol_threshold:  # Alta volatilidad
         kwargs.update({
             'rsi_oversold': 25,      # Más estricto
@@ -128,5 +142,31 @@ def adaptive_multi_strategy(df, **kwargs):
             'volume_threshold': 1.0,  # Menos volumen requerido
             'bb_std': 1.8            # Bandas más estrechas
         })
-    
-    return multi_indicator_strategy(df, **kwargs)
+    return kwargs, returns, volatility.to_numpy()
+
+
+def adaptive_multi_arrays(data: OHLCV, indicators=None, **kwargs):
+    """
+    Versión adaptativa que ajusta parámetros basándose en la volatilidad del mercado
+    """
+    params, returns, volatility = adaptive_params(data, **kwargs)
+    result = multi_indicator_arrays(data, indicators=indicators, **params)
+    if indicators:
+        extra = select_indicators(indicators, {"returns": returns, "volatility": volatility})
+        result.indicators = {**extra, **result.indicators}
+    return result
+
+
+# ---------------- API clásica df → df ----------------
+@frame_output
+def multi_indicator_strategy(df, *args, columns=None, **params):
+    """Envoltorio de multi_indicator_arrays: DataFrame nuevo con todos los indicadores (o solo `columns`)."""
+    result = multi_indicator_arrays(OHLCV.from_frame(df), *args, indicators=requested(columns), **params)
+    return legacy_frame(df, result, columns)
+
+
+@frame_output
+def adaptive_multi_strategy(df, columns=None, **kwargs):
+    """Envoltorio de adaptive_multi_arrays."""
+    return legacy_frame(df, adaptive_multi_arrays(OHLCV.from_frame(df), indicators=requested(columns),
+                                                  **kwargs), columns)
@@ -0,0 +1,311 @@
+# src/strategy/registry.py
+# -*- coding: utf-8 -*-
+"""
+Registro central de estrategias: cada una declara sus funciones, su espacio de parámetros
+tipado (valores por defecto, rangos, grid del optimizador y restricciones), los indicadores
+que muestra, la ventana de calentamiento y qué modos de cálculo tiene:
+
+  - "batch":      función clásica df → df (backtests, informes)
+  - "vectorized": versión sobre arrays OHLCV → StrategyResult (optimizadores, live con STRATEGY_KERNEL)
+  - "streaming":  actualización incremental por vela (ninguna estrategia de reglas la tiene aún)
+
+    from src.strategy.registry import get_strategy
+    spec = get_strategy("hybrid")
+    params = spec.coerce(blob["params"])          # tipos + defaults, ignora claves desconocidas
+    if spec.is_valid(params): df = spec.apply(df, params)
+
+strategy_selector, live_trader (recarga en caliente), run_best_strategy, run_backtest y los
+optimizadores despachan a través de este registro en lugar de mapas nombre → función propios.
+"""
+
+import os
+import math
+from itertools import product
+
+from src.strategy import moving_average_crossover, moving_average_arrays
+from src.strategy.rsi_sma import rsi_sma_strategy, rsi_sma_arrays
+from src.strategy.macd import macd_strategy, macd_arrays
+from src.strategy.hybrid_strategy import (
+    hybrid_trading_strategy, hybrid_trading_arrays,
+    scalping_strategy, scalping_arrays,
+    momentum_breakout_strategy, momentum_breakout_arrays,
+)
+from src.strategy.multi_indicator import multi_indicator_strategy, multi_indicator_arrays
+
+DEFAULT_STRATEGY = "rsi_sma"
+
+# Peso residual admitido del valor inicial de una EMA al terminar el calentamiento
+WARMUP_EMA_TOL = float(os.getenv("WARMUP_EMA_TOL", "0.01"))
+
+
+class Param:
+    """Parámetro tipado: default, límites opcionales [low, high] y valores del grid."""
+
+    __slots__ = ("name", "type", "default", "low", "high", "grid")
+
+    def __init__(self, name, type, default, low=None, high=None, grid=()):
+        self.name = name
+        self.type = type
+        self.default = default
+        self.low = low
+        self.high = high
+        self.grid = tuple(grid)
+
+    def cast(self, value):
+        if self.type is int:
+            return int(round(float(value)))
+        return self.type(value)
+
+    def in_bounds(self, value) -> bool:
+        return (self.low is None or value >= self.low) and (self.high is None or value <= self.high)
+
+
+class StrategySpec:
+    """
+    Declaración de una estrategia.
+    - batch / vectorized / streaming: implementaciones disponibles (None si no existe)
+    - constraints: [(descripción, fn(params) → bool)]
+    - indicators: columnas que se muestran en logs/informes
+    - warmup: fn(params) → nº de velas de calentamiento
+    - position_aware: acepta `in_position` (reglas que dependen de estar dentro)
+    """
+
+    def __init__(self, name, params, batch=None, vectorized=None, streaming=None,
+                 constraints=(), indicators=(), warmup=None, position_aware=False, results_csv=None):
+        self.name = name
+        self.params = tuple(params)
+        self.batch = batch
+        self.vectorized = vectorized
+        self.streaming = streaming
+        self.constraints = tuple(constraints)
+        self.indicators = tuple(indicators)
+        self._warmup = warmup
+        self.position_aware = position_aware
+        self.results_csv = results_csv
+
+    def __repr__(self):
+        return f"StrategySpec({self.name!r}, kernels={sorted(self.kernels)})"
+
+    @property
+    def kernels(self) -> set:
+        return {k for k in ("batch", "vectorized", "streaming") if getattr(self, k) is not None}
+
+    @property
+    def param_names(self) -> list:
+        return [p.name for p in self.params]
+
+    # ---------------- parámetros ----------------
+    def defaults(self) -> dict:
+        return {p.name: p.default for p in self.params}
+
+    def coerce(self, params: dict = None) -> dict:
+        """Defaults + valores de `params` convertidos al tipo declarado (claves desconocidas fuera)."""
+        out = self.defaults()
+        for p in self.params:
+            if params and params.get(p.name) is not None:
+                out[p.name] = p.cast(params[p.name])
+        return out
+
+    def violations(self, params: dict) -> list:
+        """Restricciones incumplidas (límites de cada parámetro + restricciones cruzadas)."""
+        bad = [f"{p.name}={params[p.name]} fuera de [{p.low}, {p.high}]"
+               for p in self.params if p.name in params and not p.in_bounds(params[p.name])]
+        return bad + [text for text, check in self.constraints if not check(params)]
+
+    def is_valid(self, params: dict) -> bool:
+        return not self.violations(params)
+
+    def grid(self) -> dict:
+        """nombre → valores a probar (solo parámetros con grid declarado)."""
+        return {p.name: list(p.grid) for p in self.params if p.grid}
+
+    def combinations(self, grid: dict = None):
+        """Combinaciones válidas del grid (resto de parámetros en su default)."""
+        grid = grid or self.grid()
+        names = list(grid)
+        base = self.defaults()
+        for values in product(*grid.values()):
+            params = {**base, **dict(zip(names, values))}
+            if self.is_valid(params):
+                yield params
+
+    def warmup(self, params: dict = None) -> int:
+        """Velas necesarias antes de que la señal sea válida con estos parámetros."""
+        if self._warmup is None:
+            return 0
+        return int(self._warmup(self.coerce(params)))
+
+    # ---------------- ejecución ----------------
+    def _kwargs(self, params: dict, in_position) -> dict:
+        kwargs = self.coerce(params)
+        if self.position_aware and in_position is not None:
+            kwargs["in_position"] = bool(in_position)
+        return kwargs
+
+    def apply(self, df, params: dict = None, in_position: bool = None, **frame_kwargs):
+        """Modo batch: df → df nuevo (frame_kwargs: columns/compact de frame_output)."""
+        return self.batch(df, **self._kwargs(params, in_position), **frame_kwargs)
+
+    def apply_arrays(self, data, params: dict = None, in_position: bool = None, indicators=None):
+        """Modo vectorizado: OHLCV → StrategyResult."""
+        return self.vectorized(data, indicators=indicators, **self._kwargs(params, in_position))
+
+
+# ---------------- calentamiento ----------------
+def ema_warmup(span: int, tol: float = None) -> int:
+    """
+    Velas n para que el valor inicial de una EMA pese menos que `tol` (WARMUP_EMA_TOL):
+    (1 - alpha)^n <= tol con alpha = 2 / (span + 1). Span 200 con tol 0.01 → 461 velas.
+    """
+    tol = WARMUP_EMA_TOL if tol is None else tol
+    decay = 1.0 - 2.0 / (span + 1.0)
+    if decay <= 0.0 or not 0.0 < tol < 1.0:
+        return int(span)
+    return int(math.ceil(math.log(tol) / math.log(decay)))
+
+
+# ---------------- registro ----------------
+REGISTRY = {}
+
+
+def register(spec: StrategySpec) -> StrategySpec:
+    REGISTRY[spec.name] = spec
+    return spec
+
+
+def get_strategy(name: str) -> StrategySpec:
+    try:
+        return REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"❌ Estrategia desconocida: {name} (registradas: {', '.join(REGISTRY)})") from None
+
+
+def strategy_names() -> list:
+    return list(REGISTRY)
+
+
+register(StrategySpec(
+    "rsi_sma",
+    params=[
+        Param("rsi_period", int, 21, 2, 100, grid=(10, 14, 21)),
+        Param("sma_period", int, 30, 2, 500, grid=(20, 30, 50)),
+        Param("rsi_buy", int, 40, 1, 99, grid=(30, 35, 40)),
+        Param("rsi_sell", int, 70, 1, 99, grid=(60, 65, 70)),
+        Param("lookback_bars", int, 8, 1, 200, grid=(6, 8)),
+    ],
+    batch=rsi_sma_strategy,
+    vectorized=rsi_sma_arrays,
+    constraints=[("rsi_buy < rsi_sell", lambda p: p["rsi_buy"] < p["rsi_sell"])],
+    indicators=("rsi", "sma", "ema200", "reason"),
+    warmup=lambda p: max(ema_warmup(200), 200, p["sma_period"],
+                         p["rsi_period"] + p["lookback_bars"] + 1, 15),
+    position_aware=True,
+    results_csv="results/rsi_optimization{suffix}.csv",
+))
+
+register(StrategySpec(
+    "moving_average",
+    params=[
+        Param("short_window", int, 20, 2, 500, grid=(10, 15, 20, 30)),
+        Param("long_window", int, 50, 3, 1000, grid=(50, 75, 100, 120)),
+    ],
+    batch=moving_average_crossover,
+    vectorized=moving_average_arrays,
+    constraints=[("short_window < long_window", lambda p: p["short_window"] < p["long_window"])],
+    indicators=("SMA20", "SMA50"),
+    warmup=lambda p: p["long_window"] + 1,
+    results_csv="results/sma_optimization.csv",
+))
+
+register(StrategySpec(
+    "macd",
+    params=[
+        Param("short_ema", int, 12, 2, 200, grid=(8, 12, 15)),
+        Param("long_ema", int, 26, 3, 400, grid=(20, 26, 30)),
+        Param("signal_ema", int, 9, 2, 100, grid=(5, 9, 12)),
+    ],
+    batch=macd_strategy,
+    vectorized=macd_arrays,
+    constraints=[("short_ema < long_ema", lambda p: p["short_ema"] < p["long_ema"])],
+    indicators=("MACD", "Signal"),
+    warmup=lambda p: ema_warmup(p["long_ema"]) + ema_warmup(p["signal_ema"]),
+    results_csv="results/macd_optimization.csv",
+))
+
+register(StrategySpec(
+    "hybrid",
+    params=[
+        Param("macd_short", int, 8, 2, 100, grid=(6, 8, 10)),
+        Param("macd_long", int, 21, 3, 200, grid=(20, 24)),
+        Param("macd_signal", int, 5, 2, 50, grid=(5, 6)),
+        Param("rsi_period", int, 12, 2, 100, grid=(12, 14)),
+        Param("rsi_oversold", int, 40, 1, 99, grid=(35, 40)),
+        Param("rsi_overbought", int, 60, 1, 99, grid=(60, 65)),
+        Param("bb_period", int, 18, 2, 200, grid=(18, 20)),
+        Param("bb_std", float, 1.8, 0.1, 5.0, grid=(1.8, 2.0)),
+        Param("volume_threshold", float, 0.8, 0.0, 10.0, grid=(0.7, 0.9)),
+        Param("trend_ema", int, 50, 2, 500, grid=(45, 55)),
+    ],
+    batch=hybrid_trading_strategy,
+    vectorized=hybrid_trading_arrays,
+    constraints=[
+        ("macd_short < macd_long", lambda p: p["macd_short"] < p["macd_long"]),
+        ("rsi_oversold < rsi_overbought", lambda p: p["rsi_oversold"] < p["rsi_overbought"]),
+    ],
+    indicators=("rsi", "macd", "macd_signal", "bb_position", "trend_ema", "signal_score"),
+    warmup=lambda p: max(ema_warmup(p["macd_long"]) + ema_warmup(p["macd_signal"]),
+                         ema_warmup(p["trend_ema"]), p["rsi_period"] + 1, p["bb_period"] + 1, 21),
+    results_csv="results/hybrid_optimization.csv",
+))
+
+register(StrategySpec(
+    "scalping",
+    params=[
+        Param("fast_ema", int, 5, 2, 100, grid=(3, 5, 7)),
+        Param("slow_ema", int, 15, 3, 200, grid=(12, 15, 18)),
+        Param("rsi_period", int, 7, 2, 100, grid=(5, 7, 9)),
+    ],
+    batch=scalping_strategy,
+    vectorized=scalping_arrays,
+    constraints=[("fast_ema < slow_ema", lambda p: p["fast_ema"] < p["slow_ema"])],
+    indicators=("ema_fast", "ema_slow", "rsi", "momentum"),
+    warmup=lambda p: max(ema_warmup(p["slow_ema"]), p["rsi_period"] + 1, 10),
+))
+
+register(StrategySpec(
+    "momentum_breakout",
+    params=[
+        Param("lookback", int, 20, 2, 500, grid=(15, 20, 25)),
+        Param("breakout_threshold", float, 0.02, 0.0, 0.5, grid=(0.015, 0.02, 0.025)),
+    ],
+    batch=momentum_breakout_strategy,
+    vectorized=momentum_breakout_arrays,
+    indicators=("rolling_high", "rolling_low", "momentum"),
+    warmup=lambda p: max(p["lookback"] + 1, 20),
+))
+
+register(StrategySpec(
+    "multi_indicator",
+    params=[
+        Param("macd_short", int, 12, 2, 100, grid=(10, 12)),
+        Param("macd_long", int, 26, 3, 200, grid=(24, 26)),
+        Param("macd_signal", int, 9, 2, 50, grid=(7, 9)),
+        Param("rsi_period", int, 14, 2, 100, grid=(14, 16)),
+        Param("rsi_oversold", int, 30, 1, 99, grid=(25, 30)),
+        Param("rsi_overbought", int, 70, 1, 99, grid=(70, 75)),
+        Param("bb_period", int, 20, 2, 200, grid=(18, 20)),
+        Param("bb_std", float, 2.0, 0.1, 5.0, grid=(1.8, 2.0)),
+        Param("volume_ma_period", int, 20, 2, 200),
+        Param("volume_threshold", float, 1.2, 0.0, 10.0, grid=(1.0, 1.2)),
+    ],
+    batch=multi_indicator_strategy,
+    vectorized=multi_indicator_arrays,
+    constraints=[
+        ("macd_short < macd_long", lambda p: p["macd_short"] < p["macd_long"]),
+        ("rsi_oversold < rsi_overbought", lambda p: p["rsi_oversold"] < p["rsi_overbought"]),
+    ],
+    indicators=("MACD", "MACD_signal", "RSI", "BB_position", "volume_ratio"),
+    warmup=lambda p: max(ema_warmup(p["macd_long"]) + ema_warmup(p["macd_signal"]),
+                         p["rsi_period"] + 1, p["bb_period"], p["volume_ma_period"]) + 1,
+    results_csv="results/multi_indicator_optimization.csv",
+))
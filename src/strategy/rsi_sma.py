@@ -2,6 +2,22 @@
 import pandas as pd
 import numpy as np
 
+from src.strategy import kernels as K
+from src.strategy.base import OHLCV, StrategyResult, cached, wants, select_indicators, legacy_frame
+from src.strategy.frames import frame_output
+
+# Códigos de motivo del kernel NumPy (int8) → texto del modo DataFrame
+REASON_HOLD, REASON_BUY_CROSS, REASON_BUY_RECOVERY, REASON_SELL = 0, 1, 2, 3
+REASONS = (
+    "HOLD",
+    "BUY:uptrend&cross",
+    "BUY:uptrend&recovery",
+    "SELL:rsi_high OR <sma OR stop_bar",
+)
+# columnas que solo calcula la versión pandas (el kernel no tiene ATR)
+PANDAS_ONLY_COLUMNS = ("atr", "atr_pct", "signal_raw")
+
+@frame_output
 def rsi_sma_strategy(
     df: pd.DataFrame,
     rsi_period: int = 21,
@@ -10,6 +26,7 @@ def rsi_sma_strategy(
     rsi_sell: int = 70,
     lookback_bars: int = 8,
     in_position: bool = False,
+    columns=None,
     **_,
 ):
     """
@@ -19,24 +36,31 @@ def rsi_sma_strategy(
       permitimos la ENTRADA aunque el cruce exacto ya ocurriera antes.
     - Salidas conservadoras: sobrecompra, pérdida de SMA (margen) o 'stop bar'.
 
-    Columnas devueltas clave:
+    Devuelve un DataFrame nuevo (df no se modifica). Columnas devueltas clave:
       - position:  1=BUY, -1=SELL, 0=HOLD (impulso de 1 vela)
       - signal_raw: igual que position (para debug)
       - reason: texto con motivo
       - rsi, sma, ema200, atr, atr_pct: indicadores auxiliares
+    Con `columns` sin columnas exclusivas de pandas (atr, ...) se usa el kernel NumPy
+    (mismas señales) y solo se construyen las columnas pedidas.
     """
     if df.empty:
         return df
+    if columns is not None and not set(columns) & set(PANDAS_ONLY_COLUMNS):
+        result = rsi_sma_arrays(OHLCV.from_frame(df), indicators=list(columns), rsi_period=rsi_period,
+                                sma_period=sma_period, rsi_buy=rsi_buy, rsi_sell=rsi_sell,
+                                lookback_bars=lookback_bars, in_position=in_position)
+        return legacy_frame(df, result, columns)
 
     # --- Indicadores base -----------------------------------------------------
     delta = df["close"].diff()
     gain  = delta.where(delta > 0, 0).rolling(rsi_period, min_periods=rsi_period).mean()
     loss  = -delta.where(delta < 0, 0).rolling(rsi_period, min_periods=rsi_period).mean()
     rs    = gain / loss.replace(0, np.nan)
-    df["rsi"] = 100 - (100 / (1 + rs))
+    rsi = 100 - (100 / (1 + rs))
 
-    df["sma"]    = df["close"].rolling(sma_period, min_periods=sma_period).mean()
-    df["ema200"] = df["close"].ewm(span=200, min_periods=200, adjust=False).mean()
+    sma    = df["close"].rolling(sma_period, min_periods=sma_period).mean()
+    ema200 = df["close"].ewm(span=200, min_periods=200, adjust=False).mean()
 
     tr = pd.concat(
         [
@@ -46,24 +70,24 @@ def rsi_sma_strategy(
         ],
         axis=1,
     ).max(axis=1)
-    df["atr"] = tr.rolling(14, min_periods=14).mean()
-    df["atr_pct"] = (df["atr"] / df["close"]).replace([np.inf, -np.inf], np.nan)
+    atr = tr.rolling(14, min_periods=14).mean()
+    atr_pct = (atr / df["close"]).replace([np.inf, -np.inf], np.nan)
 
     # --- Regímenes y condiciones auxiliares ----------------------------------
-    uptrend      = df["close"] >= df["ema200"]
-    above_sma    = df["close"] > df["sma"]
-    rsi_up_cross = (df["rsi"].shift(1) < rsi_buy) & (df["rsi"] >= rsi_buy)
-    rsi_rising   = df["rsi"].diff() > 0
+    uptrend      = df["close"] >= ema200
+    above_sma    = df["close"] > sma
+    rsi_up_cross = (rsi.shift(1) < rsi_buy) & (rsi >= rsi_buy)
+    rsi_rising   = rsi.diff() > 0
 
     # Oversold reciente en las últimas N velas (permite re-entrada aunque el cruce fuese antes)
-    recent_oversold = df["rsi"].rolling(lookback_bars, min_periods=1).min() < rsi_buy
+    recent_oversold = rsi.rolling(lookback_bars, min_periods=1).min() < rsi_buy
 
     # --- ENTRADA (dos vías, ambas requieren confirmación de tendencia) --------
     # 1) Cruce clásico en uptrend
     buy_classic = uptrend & above_sma & rsi_up_cross
 
     # 2) Recuperación de uptrend tras oversold reciente (más robusto en 15m)
-    buy_recovery = uptrend & above_sma & recent_oversold & (df["rsi"] >= rsi_buy) & rsi_rising
+    buy_recovery = uptrend & above_sma & recent_oversold & (rsi >= rsi_buy) & rsi_rising
 
     buy_condition = buy_classic | buy_recovery
 
@@ -71,17 +95,16 @@ def rsi_sma_strategy(
     # Sobrecompra fuerte, pérdida de SMA con margen, o 'stop bar' si ya estamos dentro.
     stop_bar = df["close"] < df["close"].shift() * 0.98  # -2% bar
     sell_condition = (
-        (df["rsi"] > rsi_sell)
-        | (df["close"] < df["sma"] * 0.995)
+        (rsi > rsi_sell)
+        | (df["close"] < sma * 0.995)
         | (in_position & stop_bar)
     )
 
     # --- Señal impulsional por vela ------------------------------------------
-    df["signal_raw"] = np.select([buy_condition, sell_condition], [1, -1], default=0)
-    df["position"]   = df["signal_raw"]
+    signal_raw = np.select([buy_condition, sell_condition], [1, -1], default=0)
 
     # --- Razón (debug amigable en logs) --------------------------------------
-    df["reason"] = np.where(
+    reason = np.where(
         buy_classic, "BUY:uptrend&cross",
         np.where(
             buy_recovery, "BUY:uptrend&recovery",
@@ -91,4 +114,102 @@ def rsi_sma_strategy(
         ),
     )
 
-    return df
+    return legacy_frame(df, StrategyResult(signal_raw, indicators=dict(
+        rsi=rsi, sma=sma, ema200=ema200, atr=atr, atr_pct=atr_pct, signal_raw=signal_raw, reason=reason,
+    )))
+
+
+def decode_reasons(codes) -> np.ndarray:
+    """Traduce los códigos int8 de `rsi_sma_signals` a los textos de 'reason'."""
+    return np.asarray(REASONS, dtype=object)[np.asarray(codes, dtype=np.intp)]
+
+
+def rsi_sma_signals(
+    close,
+    high=None,
+    low=None,
+    rsi_period: int = 21,
+    sma_period: int = 30,
+    rsi_buy: int = 40,
+    rsi_sell: int = 70,
+    lookback_bars: int = 8,
+    in_position: bool = False,
+    reasons: bool = False,
+    indicators: dict = None,
+    cache: dict = None,
+    **_,
+):
+    """
+    Kernel NumPy de `rsi_sma_strategy` para el optimizador y el live:
+    misma lógica, pero sobre arrays y sin crear columnas en ningún DataFrame.
+
+    - close/high/low: arrays 1-D (high/low no intervienen en la señal; se aceptan
+      para tener la misma firma que el resto de kernels OHLC).
+    - Devuelve `signal` int8 (1=BUY, -1=SELL, 0=HOLD); con reasons=True devuelve
+      (signal, reason_codes) con los códigos de REASONS (ver decode_reasons).
+    - indicators: dict opcional que se rellena con rsi/sma/ema200 (para logs).
+    - cache: dict opcional para reutilizar rsi/sma/ema200 entre llamadas sobre el
+      MISMO array close (grid search: RSI solo depende de rsi_period, etc.).
+    """
+    close = K.as_array(close)
+    n = len(close)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int8)
+        return (empty, empty.copy()) if reasons else empty
+
+    if cache is None:
+        cache = {}
+    # RSI con NaN si loss == 0: clave propia, distinta del ("rsi", p) de OHLCV.rsi (RSI 100)
+    rsi = cached(cache, ("rsi_nan0", rsi_period), lambda: K.rsi_sma_style(close, rsi_period))
+    sma = cached(cache, ("sma", sma_period), lambda: K.rolling_mean(close, sma_period))
+    ema200 = cached(cache, "ema200", lambda: K.ema(close, 200, adjust=False, min_periods=200))
+
+    with np.errstate(invalid="ignore"):
+        rsi_prev = K.shift(rsi)
+        uptrend      = close >= ema200
+        above_sma    = close > sma
+        trend_ok     = uptrend & above_sma
+        rsi_up_cross = (rsi_prev < rsi_buy) & (rsi >= rsi_buy)
+        rsi_rising   = (rsi - rsi_prev) > 0
+        recent_oversold = K.rolling_min(rsi, lookback_bars) < rsi_buy
+
+        buy_classic  = trend_ok & rsi_up_cross
+        buy_recovery = trend_ok & recent_oversold & (rsi >= rsi_buy) & rsi_rising
+        buy = buy_classic | buy_recovery
+
+        sell = (rsi > rsi_sell) | (close < sma * 0.995)
+        if in_position:
+            stop_bar = np.zeros(n, dtype=bool)
+            stop_bar[1:] = close[1:] < close[:-1] * 0.98
+            sell |= stop_bar
+
+    signal = np.zeros(n, dtype=np.int8)
+    signal[sell] = -1
+    signal[buy] = 1
+
+    if indicators is not None:
+        indicators.update(rsi=rsi, sma=sma, ema200=ema200)
+
+    if not reasons:
+        return signal
+    codes = np.full(n, REASON_HOLD, dtype=np.int8)
+    codes[sell] = REASON_SELL
+    codes[buy_recovery] = REASON_BUY_RECOVERY
+    codes[buy_classic] = REASON_BUY_CROSS
+    return signal, codes
+
+
+def rsi_sma_arrays(data: OHLCV, indicators=None, **params):
+    """
+    `rsi_sma_signals` con la convención de strategy/base.py: StrategyResult con
+    position int8 e indicadores rsi/sma/ema200 (+ 'reason' en texto) si se piden.
+    RSI/SMA/EMA200 se memorizan en data.cache entre llamadas.
+    """
+    values = {}
+    if wants(indicators, "reason"):
+        signal, codes = rsi_sma_signals(data.close, reasons=True, indicators=values,
+                                        cache=data.cache, **params)
+        values["reason"] = decode_reasons(codes)
+    else:
+        signal = rsi_sma_signals(data.close, indicators=values, cache=data.cache, **params)
+    return StrategyResult(signal, indicators=select_indicators(indicators, values))
@@ -1,7 +1,9 @@
 # src/strategy/rsi_sma_optimized.py
 import pandas as pd
 import numpy as np
+from src.strategy.frames import frame_output
 
+@frame_output
 def rsi_sma_optimized_strategy(df, rsi_period=14, sma_period=50, rsi_buy=25, rsi_sell=75, stop_loss_pct=0.02):
     """
     Estrategia RSI-SMA optimizada con gestión de riesgo mejorada
@@ -72,5 +74,6 @@ def rsi_sma_optimized_strategy(df, rsi_period=14, sma_period=50, rsi_buy=25, rsi
     return df
 
 # Función de compatibilidad con el sistema actual
+@frame_output
 def rsi_sma_strategy(df, rsi_period=14, sma_period=50, rsi_buy=25, rsi_sell=75):
     return rsi_sma_optimized_strategy(df, rsi_period, sma_period, rsi_buy, rsi_sell)
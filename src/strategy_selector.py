@@ -5,7 +5,7 @@ import json
 import pandas as pd
 from dotenv import load_dotenv
 
-from src.strategy.rsi_sma import rsi_sma_strategy
+from src.strategy.registry import REGISTRY, DEFAULT_STRATEGY, get_strategy
 
 load_dotenv()
 
@@ -36,11 +36,19 @@ def _read_active_params(symbol: str, tf: str):
         best    = blob.get("best", {})
         params  = best.get("params", {})
         metrics = best.get("metrics", {})
-        strat   = best.get("strategy", "rsi_sma")
+        strat   = best.get("strategy", DEFAULT_STRATEGY) or DEFAULT_STRATEGY
 
         if not _passes_gate(metrics):
             print(f"⚠️ ACTIVE_PARAMS no pasa el gate ({metrics}). Se ignora.")
             return None
+        if strat not in REGISTRY:
+            print(f"⚠️ ACTIVE_PARAMS con estrategia no registrada '{strat}'. Se ignora.")
+            return None
+        spec = get_strategy(strat)
+        params = spec.coerce(params)
+        if not spec.is_valid(params):
+            print(f"⚠️ ACTIVE_PARAMS inválidos para {strat}: {spec.violations(params)}. Se ignora.")
+            return None
 
         return dict(strategy=strat, params=params, metrics=metrics, source="ACTIVE_PARAMS_JSON", path=path)
     except Exception as e:
@@ -70,13 +78,8 @@ def _best_from_csv(path: str, strat: str, param_cols):
         return None
 
     best = df.sort_values("total_return", ascending=False).iloc[0]
-    params = {}
-    for k in param_cols:
-        v = best[k]
-        try:
-            params[k] = int(v)
-        except Exception:
-            params[k] = _num(v, v)
+    spec = get_strategy(strat)
+    params = spec.coerce({k: best[k] for k in param_cols if k in best.index and pd.notna(best[k])})
 
     metrics = dict(
         total_return=_num(best.get("total_return", 0)),
@@ -85,39 +88,37 @@ def _best_from_csv(path: str, strat: str, param_cols):
     )
     return dict(strategy=strat, params=params, metrics=metrics, source=path)
 
+def _announce(pick: dict):
+    print("\n🏆 Estrategia seleccionada")
+    print("   • Nombre     :", pick["strategy"])
+    print("   • Parámetros :", pick["params"])
+    print("   • Métricas   :", pick["metrics"])
+    print("   • Fuente     :", f"{pick['source']} ✅")
+
 def select_best_strategy(symbol: str = "BTCUSDC", tf: str = "15m"):
+    """
+    Devuelve (nombre, función df → df, params, métricas). La función y los parámetros
+    vienen del registro de estrategias (src/strategy/registry.py).
+    """
     # 1) Activo (si pasa el gate)
     active = _read_active_params(symbol, tf)
     if active:
-        strategy_name = "rsi_sma"
-        mapper = {"rsi_sma": rsi_sma_strategy}
-        print("\n🏆 Estrategia seleccionada")
-        print("   • Nombre     :", strategy_name)
-        print("   • Parámetros :", active["params"])
-        print("   • Métricas   :", active["metrics"])
-        print("   • Fuente     :", f"{active['source']} ✅")
-        return strategy_name, mapper[strategy_name], active["params"], active["metrics"]
-
-    # 2) CSV (si pasa el gate)
+        _announce(active)
+        return active["strategy"], get_strategy(active["strategy"]).batch, active["params"], active["metrics"]
+
+    # 2) CSV del optimizador RSI (si pasa el gate)
     suf = f"_{tf}" if tf else ""
-    rsi_csv = f"results/rsi_optimization{suf}.csv"
-    rsi_best = _best_from_csv(rsi_csv, "rsi_sma", ["rsi_period", "sma_period", "rsi_buy", "rsi_sell"])
+    rsi_spec = get_strategy(DEFAULT_STRATEGY)
+    rsi_csv = rsi_spec.results_csv.format(suffix=suf)
+    rsi_best = _best_from_csv(rsi_csv, rsi_spec.name, ["rsi_period", "sma_period", "rsi_buy", "rsi_sell"])
 
     if rsi_best:
-        mapper = {"rsi_sma": rsi_sma_strategy}
-        print("\n🏆 Estrategia seleccionada")
-        print("   • Nombre     :", rsi_best["strategy"])
-        print("   • Parámetros :", rsi_best["params"])
-        print("   • Métricas   :", rsi_best["metrics"])
-        print("   • Fuente     :", f"{rsi_best['source']} ✅")
-        return rsi_best["strategy"], mapper[rsi_best["strategy"]], rsi_best["params"], rsi_best["metrics"]
+        _announce(rsi_best)
+        return rsi_best["strategy"], rsi_spec.batch, rsi_best["params"], rsi_best["metrics"]
 
     # 3) Fallback seguro si nada pasa el gate
     fallback_params = {"rsi_period": 14, "sma_period": 50, "rsi_buy": 30, "rsi_sell": 70}
     fallback_metrics = {"total_return": 0.0, "sharpe_ratio": 0.0, "max_drawdown": 0.0, "score": 0.0}
-    print("\n🏆 Estrategia seleccionada")
-    print("   • Nombre     : rsi_sma")
-    print("   • Parámetros :", fallback_params)
-    print("   • Métricas   :", fallback_metrics)
-    print("   • Fuente     : FALLBACK_GENERIC ✅")
-    return "rsi_sma", rsi_sma_strategy, fallback_params, fallback_metrics
+    _announce(dict(strategy=rsi_spec.name, params=fallback_params, metrics=fallback_metrics,
+                   source="FALLBACK_GENERIC"))
+    return rsi_spec.name, rsi_spec.batch, fallback_params, fallback_metrics
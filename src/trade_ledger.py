@@ -0,0 +1,107 @@
+# src/trade_ledger.py
+# -*- coding: utf-8 -*-
+"""
+Registro de operaciones de un backtest como struct-of-arrays (NumPy structured array).
+
+Sustituye a la lista de dicts + pd.DataFrame(trades_log):
+  - buffer preasignado que crece por duplicación (append O(1) amortizado)
+  - estadísticas (win rate, medias, profit factor) en una sola pasada sobre `pnl`
+  - DataFrame solo bajo demanda (`to_frame()`) para informes
+"""
+
+import numpy as np
+import pandas as pd
+
+# Códigos de motivo de salida (campo `reason`, int8)
+REASON_SIGNAL      = 0
+REASON_STOP_LOSS   = 1
+REASON_TAKE_PROFIT = 2
+REASON_END         = 3
+REASONS = ("signal", "stop_loss", "take_profit", "end")
+
+TRADE_DTYPE = np.dtype([
+    ("entry_idx",   np.int64),
+    ("exit_idx",    np.int64),
+    ("entry_price", np.float64),
+    ("exit_price",  np.float64),
+    ("size",        np.float64),
+    ("pnl",         np.float64),
+    ("reason",      np.int8),
+])
+
+
+class TradeLedger:
+    """
+    Operaciones cerradas de un backtest.
+
+        ledger = TradeLedger(capacity=64)
+        ledger.append(e, j, entry_price, exit_price, size, pnl, REASON_STOP_LOSS)
+        ledger.stats()      → dict con win_rate, avg_win, avg_loss, profit_factor, total_trades
+        ledger.to_frame()   → DataFrame con las columnas de siempre (entry_price, exit_price,
+                              pnl, reason, position_size) + entry_idx / exit_idx
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._buf = np.zeros(max(1, int(capacity)), dtype=TRADE_DTYPE)
+        self._n = 0
+        self._frame = None
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def trades(self) -> np.ndarray:
+        """Vista (sin copia) de las operaciones registradas."""
+        return self._buf[:self._n]
+
+    def __getitem__(self, field):
+        return self.trades[field]
+
+    def append(self, entry_idx, exit_idx, entry_price, exit_price, size, pnl, reason=REASON_SIGNAL):
+        if self._n == len(self._buf):
+            grown = np.zeros(len(self._buf) * 2, dtype=TRADE_DTYPE)
+            grown[:self._n] = self._buf[:self._n]
+            self._buf = grown
+        self._buf[self._n] = (entry_idx, exit_idx, entry_price, exit_price, size, pnl, reason)
+        self._n += 1
+        self._frame = None
+
+    def stats(self) -> dict:
+        """
+        Estadísticas de las operaciones con las mismas definiciones que el backtest
+        con gestión de riesgo (profit_factor = |media ganadoras / media perdedoras|).
+        """
+        pnl = self.trades["pnl"]
+        n = len(pnl)
+        if n == 0:
+            return {"win_rate": 0, "avg_win": 0, "avg_loss": 0, "profit_factor": 0, "total_trades": 0}
+
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
+        win_rate = len(wins) / n
+        avg_win = wins.mean() if len(wins) > 0 else 0
+        avg_loss = losses.mean() if len(losses) > 0 else 0
+        profit_factor = abs(avg_win / avg_loss) if avg_loss != 0 else float('inf') if avg_win > 0 else 0
+
+        return {
+            "win_rate": win_rate,
+            "avg_win": avg_win,
+            "avg_loss": avg_loss,
+            "profit_factor": profit_factor,
+            "total_trades": n,
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame para informes (se construye una vez y se cachea hasta el próximo append)."""
+        if self._frame is None:
+            t = self.trades
+            self._frame = pd.DataFrame({
+                "entry_price": t["entry_price"],
+                "exit_price": t["exit_price"],
+                "pnl": t["pnl"],
+                "reason": np.asarray(REASONS, dtype=object)[t["reason"]] if len(t) else np.empty(0, dtype=object),
+                "position_size": t["size"],
+                "entry_idx": t["entry_idx"],
+                "exit_idx": t["exit_idx"],
+            })
+        return self._frame
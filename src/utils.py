@@ -3,10 +3,11 @@ import os
 import json
 import pandas as pd
 import numpy as np
-from binance.client import Client
 from datetime import datetime, timezone
 from decimal import Decimal, ROUND_DOWN
 
+from src.metrics import track_api
+
 TRADES_FILE = 'logs/trades.csv'
 PERFORMANCE_FILE = 'logs/performance_log.csv'
 
@@ -73,16 +74,18 @@ def convert_params(params):
         return str(v)
     return {k: sanitize(v) for k, v in params.items()}
 
-def get_sellable_quantity(symbol: str, client: Client) -> Decimal:
+def get_sellable_quantity(symbol: str, client) -> Decimal:
     """
     Calcula la cantidad vendible respetando LOT_SIZE y (MIN_)NOTIONAL.
     Devuelve Decimal("0.0") si no cumple mínimos.
     """
-    info = client.get_asset_balance(asset="BTC")
+    with track_api("get_asset_balance"):
+        info = client.get_asset_balance(asset="BTC")
     free_btc = Decimal(info["free"])
 
     # Filtros del símbolo
-    symbol_info = client.get_symbol_info(symbol)
+    with track_api("get_symbol_info"):
+        symbol_info = client.get_symbol_info(symbol)
     lot_filter = next(f for f in symbol_info["filters"] if f["filterType"] == "LOT_SIZE")
     step_size = Decimal(lot_filter["stepSize"])
     min_qty   = Decimal(lot_filter["minQty"])
@@ -106,7 +109,8 @@ def get_sellable_quantity(symbol: str, client: Client) -> Decimal:
         return Decimal("0.0")
 
     if min_notional > 0:
-        ticker = client.get_symbol_ticker(symbol=symbol)
+        with track_api("get_symbol_ticker"):
+            ticker = client.get_symbol_ticker(symbol=symbol)
         current_price = Decimal(ticker["price"])
         if qty * current_price < min_notional:
             print(f"❌ Valor {qty * current_price} < minNotional {min_notional}")
@@ -1,14 +1,61 @@
-from flask import Flask, jsonify, render_template_string, send_file
-import pandas as pd
+from flask import Flask, jsonify, render_template_string, send_file, request, Response, stream_with_context, make_response
+from datetime import datetime, timezone
+from functools import wraps
 import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+
+from src.dashboard_data import BotIndex, PORTFOLIO
+from src.downsample import lttb_indices
+from src.event_bus import EventHub, sse_stream
+from src.metrics import counter, histogram, render as render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 app = Flask(__name__)
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-TRADES_PATH = os.path.join(BASE_DIR, 'logs/trades.csv')
-PERF_PATH   = os.path.join(BASE_DIR, 'logs/performance_log.csv')
 REPORT_PATH = os.path.join(BASE_DIR, 'results/summary_report.pdf')
+BALANCE_PATH = os.path.join(BASE_DIR, 'logs/balance.json')
+EVENTS_PATH = os.path.join(BASE_DIR, os.getenv("EVENTS_PATH", "logs/events.jsonl"))
+
+SYMBOL      = os.getenv("TRADING_SYMBOL", "BTCUSDC").replace("/", "")
+TIMEFRAME   = os.getenv("TRADING_TIMEFRAME", "15m")
+
+# Límites de las APIs de series (la respuesta queda acotada sea cual sea el histórico)
+DEFAULT_POINTS = 1000
+MAX_POINTS     = 5000
+DEFAULT_PAGE   = 500
+MAX_PAGE       = 5000
+
+# Un índice de agregados incrementales por bot (logs/trades_<TF>.csv, performance_log_<TF>.csv…)
+BOTS = BotIndex(BASE_DIR, SYMBOL, TIMEFRAME)
+
+# Caché en proceso de respuestas ya renderizadas (por URL). Dentro del TTL no se toca
+# ni el disco; pasado el TTL se revalida contra los offsets de los journals.
+CACHE_TTL     = float(os.getenv("DASHBOARD_CACHE_TTL", "2"))
+CACHE_MAX     = int(os.getenv("DASHBOARD_CACHE_MAX", "512"))
+_ttl_cache = {}
+_ttl_lock = threading.Lock()
+
+# Métricas (GET /metrics). Con varios workers de gunicorn cada uno tiene las suyas.
+CACHE_REQUESTS = counter("dashboard_cache_requests_total",
+                         "Respuestas por resultado de la caché: hit (TTL), revalidated (journals sin cambios), miss",
+                         ("result",))
+RENDER_SECONDS = histogram("dashboard_render_seconds", "Tiempo de generar una respuesta no cacheada", ("endpoint",))
+
+# Un solo lector de logs/events.jsonl para todas las conexiones SSE (se arranca con la 1ª petición)
+_hub = None
+_hub_lock = threading.Lock()
+
+def get_hub() -> EventHub:
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = EventHub(EVENTS_PATH).start()
+        return _hub
 
 TEMPLATE = '''
 <!DOCTYPE html>
@@ -24,75 +71,277 @@ TEMPLATE = '''
   </style>
 </head>
 <body>
-  <h1>📊 QuantBot Dashboard</h1>
+  <h1>📊 QuantBot Dashboard — {{ title }}</h1>
+  <nav>
+    {% for key in bots %}<a href="/?bot={{ key }}">{{ key }}</a> · {% endfor %}
+    <a href="/?bot=portfolio">Cartera</a>
+  </nav>
   <canvas id="priceChart"></canvas>
+  <canvas id="equityChart"></canvas>
   <div class="info">
-    <p><strong>Total operaciones:</strong> {{ total_ops }} ({{ buys }} BUY, {{ sells }} SELL)</p>
-    <p><strong>Retorno acumulado:</strong> {{ total_profit }} USD</p>
-    <p><strong>Porcentaje acumulado:</strong> {{ profit_pct }}%</p>
+    <p><strong>Total operaciones:</strong> <span id="ops">{{ total_ops }} ({{ buys }} BUY, {{ sells }} SELL)</span></p>
+    <p><strong>Retorno acumulado:</strong> <span id="profit">{{ total_profit }}</span> USD</p>
+    <p><strong>Porcentaje acumulado:</strong> <span id="pct">{{ profit_pct }}</span>%</p>
+    <p><strong>En vivo:</strong> <span id="live">esperando eventos…</span></p>
+    <p><strong>Balance:</strong> <span id="balance">–</span></p>
     <a href="/download_report" class="button">📄 Descargar Informe PDF</a>
   </div>
   <script>
-    const labels = {{ timestamps|safe }};
-    const prices = {{ closes|safe }};
-    const buySignals = {{ buy_signals|safe }};
-    const sellSignals = {{ sell_signals|safe }};
-
-    const ctx = document.getElementById('priceChart');
-    new Chart(ctx, {
-      type: 'line',
-      data: {
-        labels: labels,
-        datasets: [
-          { label: 'BTCUSDC', data: prices, borderColor: 'blue', fill: false },
-          { label: 'BUY', data: buySignals, backgroundColor: 'green', type: 'scatter', pointStyle: 'triangle', pointRadius: 6 },
-          { label: 'SELL', data: sellSignals, backgroundColor: 'red', type: 'scatter', pointStyle: 'rectRot', pointRadius: 6 }
-        ]
-      },
-      options: { scales: { x: { display: false } } }
+    // Las series se piden a la API ya reducidas (LTTB) → payload acotado
+    const POINTS = Math.min(2000, Math.max(200, Math.floor(window.innerWidth * 1.5)));
+    const BOT = encodeURIComponent('{{ bot }}');
+    const PRICE_BOT = '{{ price_bot }}';   // bot cuyo precio se dibuja (en la cartera, el de por defecto)
+    const ofBot = (ev) => '{{ bot }}' === 'portfolio' || ev.source === '{{ bot }}';
+    let priceChart = null;
+    const toXY = (r) => r.t.map((t, i) => ({ x: t, y: r.y[i] }));
+    const timeAxis = { type: 'linear', ticks: { callback: (v) => new Date(v).toISOString().slice(0, 16).replace('T', ' ') } };
+
+    Promise.all([
+      fetch(`/api/price?bot=${BOT}&points=${POINTS}`).then(r => r.json()),
+      fetch(`/api/trades?bot=${BOT}&limit=500&order=desc`).then(r => r.json())
+    ]).then(([price, trades]) => {
+      const buys = [], sells = [];
+      trades.items.forEach(tr => (tr.action === 'BUY' ? buys : sells).push({ x: tr.t, y: tr.price }));
+      priceChart = new Chart(document.getElementById('priceChart'), {
+        type: 'line',
+        data: {
+          datasets: [
+            { label: '{{ symbol }}', data: toXY(price), borderColor: 'blue', fill: false, pointRadius: 0 },
+            { label: 'BUY', data: buys, backgroundColor: 'green', type: 'scatter', pointStyle: 'triangle', pointRadius: 6 },
+            { label: 'SELL', data: sells, backgroundColor: 'red', type: 'scatter', pointStyle: 'rectRot', pointRadius: 6 }
+          ]
+        },
+        options: { parsing: false, scales: { x: timeAxis } }
+      });
+    });
+
+    fetch(`/api/equity?bot=${BOT}&points=${POINTS}`).then(r => r.json()).then(eq => {
+      if (!eq.t.length) return;
+      new Chart(document.getElementById('equityChart'), {
+        type: 'line',
+        data: { datasets: [{ label: 'Equity', data: toXY(eq), borderColor: 'purple', fill: false, pointRadius: 0 }] },
+        options: { parsing: false, scales: { x: timeAxis } }
+      });
+    });
+
+    // Push en vivo (SSE): velas, señales, fills y balance sin recargar la página
+    const es = new EventSource(`/events?bot=${BOT}`);
+    const ms = (iso) => new Date(iso).getTime();
+    es.addEventListener('candle', (e) => {
+      const ev = JSON.parse(e.data);
+      if (priceChart && ev.source === PRICE_BOT) {
+        priceChart.data.datasets[0].data.push({ x: ms(ev.data.timestamp || ev.ts), y: ev.data.close });
+        priceChart.update('none');
+      }
+    });
+    es.addEventListener('signal', (e) => {
+      const ev = JSON.parse(e.data);
+      if (!ofBot(ev)) return;
+      document.getElementById('live').textContent =
+        `${ev.source} · ${ev.data.action} @ ${Number(ev.data.close).toFixed(2)} (${ev.ts.slice(0, 19)})`;
+    });
+    es.addEventListener('fill', (e) => {
+      const ev = JSON.parse(e.data);
+      if (!ofBot(ev)) return;
+      if (priceChart) {
+        const ds = priceChart.data.datasets[ev.data.side === 'BUY' ? 1 : 2];
+        ds.data.push({ x: ms(ev.ts), y: ev.data.price });
+        priceChart.update('none');
+      }
+      fetch(`/api/summary?bot=${BOT}`).then(r => r.json()).then(s => {
+        document.getElementById('ops').textContent = `${s.total_ops} (${s.buys} BUY, ${s.sells} SELL)`;
+        document.getElementById('profit').textContent = s.total_profit;
+        document.getElementById('pct').textContent = s.profit_pct;
+      });
+    });
+    es.addEventListener('balance', (e) => {
+      document.getElementById('balance').textContent = JSON.stringify(JSON.parse(e.data).data.balance);
     });
   </script>
 </body>
 </html>
 '''
 
+def _parse_time_arg(name):
+    """?start= / ?end= en epoch (s o ms) o ISO-8601 → epoch en segundos."""
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        v = float(raw)
+        return v / 1000.0 if v > 1e11 else v
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(raw.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+def _int_arg(name, default, upper):
+    try:
+        v = int(request.args.get(name, default))
+    except (TypeError, ValueError):
+        v = default
+    return max(0, min(v, upper))
+
+def _time_slice(ts):
+    """Rango [start, end] sobre una serie ordenada por tiempo."""
+    start, end = _parse_time_arg("start"), _parse_time_arg("end")
+    lo = np.searchsorted(ts, start, side="left") if start is not None else 0
+    hi = np.searchsorted(ts, end, side="right") if end is not None else len(ts)
+    return lo, hi
+
+def _series_response(ts, values):
+    lo, hi = _time_slice(ts)
+    ts, values = ts[lo:hi], values[lo:hi]
+    points = max(2, _int_arg("points", DEFAULT_POINTS, MAX_POINTS))
+    idx = lttb_indices(ts, values, points)
+    return jsonify({
+        "t": (ts[idx] * 1000).round().astype(np.int64).tolist(),   # epoch ms
+        "y": values[idx].tolist(),
+        "total": int(hi - lo),
+        "returned": int(len(idx)),
+    })
+
+def cached_view(fn=None, *, all_bots=False):
+    """
+    Respuestas con ETag/Last-Modified derivados de los offsets de los journals del bot
+    (304 si el navegador ya la tiene) y servidas desde la caché TTL mientras no crezcan.
+    Con all_bots=True el validador cubre los journals de todos los bots.
+    """
+    if fn is None:
+        return lambda f: cached_view(f, all_bots=all_bots)
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        url = request.full_path
+        now = time.time()
+        with _ttl_lock:
+            hit = _ttl_cache.get(url)
+        if hit is None or hit["expires"] <= now:
+            BOTS.refresh()
+            key = PORTFOLIO if all_bots else _selected_bot()[0]
+            tag, mtime = BOTS.validators(key)
+            etag = hashlib.md5(f"{url}|{tag}".encode()).hexdigest()
+            if hit is not None and hit["etag"] == etag:
+                CACHE_REQUESTS.labels("revalidated").inc()
+                hit = dict(hit, expires=now + CACHE_TTL)   # journals sin cambios: mismo cuerpo
+            else:
+                CACHE_REQUESTS.labels("miss").inc()
+                with RENDER_SECONDS.labels(request.endpoint).time():
+                    resp = make_response(fn(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+                hit = {"etag": etag, "mtime": mtime, "body": resp.get_data(),
+                       "mimetype": resp.mimetype, "expires": now + CACHE_TTL}
+            with _ttl_lock:
+                if len(_ttl_cache) >= CACHE_MAX:
+                    for k in [k for k, v in _ttl_cache.items() if v["expires"] <= now] or list(_ttl_cache):
+                        _ttl_cache.pop(k, None)
+                _ttl_cache[url] = hit
+        else:
+            CACHE_REQUESTS.labels("hit").inc()
+
+        resp = Response(hit["body"], mimetype=hit["mimetype"])
+        resp.set_etag(hit["etag"])
+        if hit["mtime"]:
+            resp.last_modified = datetime.fromtimestamp(hit["mtime"], tz=timezone.utc)
+        resp.cache_control.no_cache = True      # el navegador revalida siempre (barato: 304)
+        return resp.make_conditional(request)
+    return wrapper
+
+def _selected_bot():
+    """?bot=<SYMBOL_TF> | portfolio → (clave, DashboardData o None para la cartera)."""
+    key = request.args.get("bot") or BOTS.default_key()
+    if key == PORTFOLIO:
+        return PORTFOLIO, None
+    data = BOTS.get(key)
+    return (key if key in BOTS.keys() else BOTS.default_key()), data
+
+def _summary(key, data):
+    if data is None:
+        return BOTS.portfolio_summary()
+    data.refresh()
+    return data.summary()
+
+def _series(key, data, name):
+    if data is None:
+        if name == "price":   # la cartera no tiene un único precio: se muestra el del bot por defecto
+            data = BOTS.get()
+            if data is None:
+                return np.empty(0), np.empty(0)
+        else:
+            return BOTS.portfolio_series(name)
+    data.refresh()
+    return data.series(name)
+
 @app.route('/')
+@cached_view
 def dashboard():
-    if not os.path.exists(TRADES_PATH) or os.stat(TRADES_PATH).st_size == 0:
+    key, data = _selected_bot()
+    summary = _summary(key, data)
+    if not summary['total_ops']:
         return "⛔ Aún no hay operaciones registradas."
 
-    trades = pd.read_csv(TRADES_PATH)
-    trades['timestamp'] = pd.to_datetime(trades['timestamp'], utc=True, errors='coerce')
+    meta = BOTS.meta(key)
+    html = render_template_string(TEMPLATE,
+        bot=key,
+        price_bot=key if data is not None else BOTS.default_key(),
+        bots=BOTS.keys(),
+        title="Cartera" if data is None else key,
+        symbol=meta.get("symbol", SYMBOL),
+        total_ops=summary['total_ops'],
+        buys=summary['buys'],
+        sells=summary['sells'],
+        total_profit=summary['total_profit'],
+        profit_pct=summary['profit_pct']
+    )
+    return html
 
-    buy_trades = trades[trades['action'] == 'BUY']
-    sell_trades = trades[trades['action'] == 'SELL']
+@app.route("/api/bots")
+@cached_view(all_bots=True)
+def api_bots():
+    BOTS.refresh()
+    out = []
+    for key in BOTS.keys():
+        meta = BOTS.meta(key)
+        out.append({"bot": key, "symbol": meta.get("symbol"), "timeframe": meta.get("timeframe"),
+                    "summary": BOTS.get(key).summary()})
+    return jsonify({"bots": out, "portfolio": BOTS.portfolio_summary()})
 
-    # Curva de precios reconstruida desde las operaciones
-    timestamps = trades['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S').tolist()
-    closes = trades['price'].tolist()
+@app.route("/api/price")
+@cached_view
+def api_price():
+    key, data = _selected_bot()
+    ts, close = _series(key, data, "price")
+    return _series_response(ts, close)
 
-    buy_signals = [{'x': ts.strftime('%Y-%m-%d %H:%M:%S'), 'y': price} for ts, price in zip(buy_trades['timestamp'], buy_trades['price'])]
-    sell_signals = [{'x': ts.strftime('%Y-%m-%d %H:%M:%S'), 'y': price} for ts, price in zip(sell_trades['timestamp'], sell_trades['price'])]
+@app.route("/api/equity")
+@cached_view
+def api_equity():
+    key, data = _selected_bot()
+    ts, equity = _series(key, data, "equity")
+    return _series_response(ts, equity)
 
-    if len(buy_trades) == len(sell_trades):
-        profit_ops = (sell_trades['price'].values - buy_trades['price'].values)
-        total_profit = round(profit_ops.sum(), 2)
-        profit_pct = round((profit_ops / buy_trades['price'].values * 100).sum(), 2)
+@app.route("/api/trades")
+@cached_view
+def api_trades():
+    """Marcadores BUY/SELL paginados: ?bot&start&end&offset&limit&order=asc|desc."""
+    key, data = _selected_bot()
+    ts, price, action = _series(key, data, "trades")
+    lo, hi = _time_slice(ts)
+    offset = _int_arg("offset", 0, max(0, hi - lo))
+    limit = _int_arg("limit", DEFAULT_PAGE, MAX_PAGE)
+    if request.args.get("order", "asc") == "desc":
+        sel = np.arange(hi - 1 - offset, max(lo, hi - offset - limit) - 1, -1)
     else:
-        total_profit = '⚠️ Desbalance'
-        profit_pct = '⚠️'
-
-    return render_template_string(TEMPLATE,
-        timestamps=timestamps,
-        closes=closes,
-        buy_signals=buy_signals,
-        sell_signals=sell_signals,
-        total_ops=len(trades),
-        buys=len(buy_trades),
-        sells=len(sell_trades),
-        total_profit=total_profit,
-        profit_pct=profit_pct
-    )
+        sel = np.arange(lo + offset, min(hi, lo + offset + limit))
+    names = {1: "BUY", -1: "SELL"}
+    items = [
+        {"t": int(round(ts[i] * 1000)), "price": float(price[i]), "action": names.get(int(action[i]), "OTHER")}
+        for i in sel
+    ]
+    return jsonify({"items": items, "total": int(hi - lo), "offset": offset, "limit": limit})
 
 @app.route('/download_report')
 def download_report():
@@ -100,10 +349,43 @@ def download_report():
         return send_file(REPORT_PATH, as_attachment=True)
     return "No se ha generado el informe aún.", 404
 
+@app.route("/api/summary")
+@cached_view
+def api_summary():
+    key, data = _selected_bot()
+    return jsonify(_summary(key, data))
+
+@app.route("/events")
+def events():
+    """
+    Server-Sent Events: últimos valores al conectar y después candle/signal/fill/balance en vivo.
+    ?bot=<SYMBOL_TF> → solo los eventos de ese bot (+ balance); sin bot o ?bot=portfolio → todos.
+    """
+    bot = request.args.get("bot")
+    source = None if not bot or bot == PORTFOLIO else bot
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(sse_stream(get_hub(), source=source)),
+                    mimetype="text/event-stream", headers=headers)
+
 @app.route("/balance")
 def show_balance():
-    from src.balance_tracker import load_balance
-    return jsonify(load_balance())
+    # Último snapshot publicado por los traders (sin llamar a get_account de Binance)
+    event = get_hub().last("balance")
+    if event is not None:
+        return jsonify(event["data"].get("balance", {}))
+    if os.path.exists(BALANCE_PATH):
+        with open(BALANCE_PATH, "r") as f:
+            return jsonify(json.load(f))
+    return jsonify({}), 404
+
+@app.route("/metrics")
+def metrics():
+    """Métricas del proceso del dashboard en formato texto de Prometheus."""
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    # Servidor de desarrollo (reloader/debugger) solo con FLASK_ENV=development;
+    # en producción usar `python -m src.wsgi` (gunicorn/waitress).
+    debug = os.getenv("FLASK_ENV", "production") == "development"
+    app.run(host='0.0.0.0', port=int(os.getenv("DASHBOARD_PORT", "5001")),
+            debug=debug, use_reloader=debug, threaded=True)
@@ -0,0 +1,75 @@
+# src/wsgi.py
+# -*- coding: utf-8 -*-
+"""
+Punto de entrada de producción del dashboard.
+
+  - gunicorn:  gunicorn -c python:src.wsgi src.wsgi:application   (o `python -m src.wsgi`)
+  - fallback:  waitress si está instalado; si no, el servidor de Flask multihilo sin debug
+
+Workers con hilos (gthread): las conexiones SSE (/events) ocupan un hilo, no un worker entero.
+"""
+
+import os
+import sys
+
+from src.web_dashboard import app
+
+application = app
+
+HOST    = os.getenv("DASHBOARD_HOST", "0.0.0.0")
+PORT    = int(os.getenv("DASHBOARD_PORT", "5001"))
+WORKERS = int(os.getenv("DASHBOARD_WORKERS", "2"))
+THREADS = int(os.getenv("DASHBOARD_THREADS", "16"))
+
+# Configuración leída por gunicorn con `-c python:src.wsgi`
+bind = f"{HOST}:{PORT}"
+workers = WORKERS
+threads = THREADS
+worker_class = "gthread"
+timeout = 0              # /events es un stream largo; los workers no deben matarse por timeout
+keepalive = 5
+accesslog = "-"
+
+
+def _run_gunicorn() -> bool:
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        return False
+
+    class _App(BaseApplication):
+        def load_config(self):
+            for key, value in {"bind": bind, "workers": workers, "threads": threads,
+                               "worker_class": worker_class, "timeout": timeout,
+                               "keepalive": keepalive, "accesslog": accesslog}.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return application
+
+    print(f"🚀 Dashboard (gunicorn) en {bind} · {workers} workers × {threads} hilos")
+    _App().run()
+    return True
+
+
+def _run_waitress() -> bool:
+    try:
+        from waitress import serve
+    except ImportError:
+        return False
+    print(f"🚀 Dashboard (waitress) en {bind} · {THREADS} hilos")
+    serve(application, host=HOST, port=PORT, threads=THREADS)
+    return True
+
+
+def main():
+    if sys.platform != "win32" and _run_gunicorn():
+        return
+    if _run_waitress():
+        return
+    print(f"⚠️ gunicorn/waitress no disponibles; servidor Flask multihilo en {bind}")
+    application.run(host=HOST, port=PORT, debug=False, use_reloader=False, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
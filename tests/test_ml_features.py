@@ -0,0 +1,37 @@
+# tests/test_ml_features.py
+# -*- coding: utf-8 -*-
+"""Paridad de features ML: StreamingFeatures (vivo) frente a create_features (batch)."""
+
+import numpy as np
+import pytest
+
+from src.generate_fake_data import make_ohlcv
+from src.ml_features import check_parity
+
+
+@pytest.fixture(scope="module")
+def df():
+    return make_ohlcv(3000, seed=7, freq="5min")
+
+
+def test_streaming_features_match_batch(df):
+    report = check_parity(df)
+    assert report["rows"] == len(df)
+    assert report["mismatches"] == []
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["sklearn", "compact"])
+def test_predict_last_matches_predict_signals(df, tmp_path, compact):
+    pytest.importorskip("sklearn")
+    from src.ml_strategy import MLTradingStrategy
+
+    strategy = MLTradingStrategy()
+    strategy.train_model(df)
+    last_batch = strategy.predict_signals(df).iloc[-1]
+    if compact:
+        strategy.export_compact(str(tmp_path / "model.compact"))
+
+    last = strategy.predict_last(df)
+    assert last["ml_signal"] == last_batch["ml_signal"]
+    assert last["position"] == last_batch["position"]
+    assert np.isclose(last["ml_confidence"], last_batch["ml_confidence"], rtol=1e-9, atol=1e-12)